@@ -0,0 +1,77 @@
+"""Add attendance archives
+
+Revision ID: 2f7b4d9e6c13
+Revises: 9c1f6d3a8b47
+Create Date: 2026-10-16 19:41:52.306118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2f7b4d9e6c13'
+down_revision: Union[str, Sequence[str], None] = '9c1f6d3a8b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('attendance_archives',
+    sa.Column('partition_name', sa.String(length=63), nullable=False),
+    sa.Column('starts_on', sa.Date(), nullable=False),
+    sa.Column('ends_on', sa.Date(), nullable=False),
+    sa.Column('detached_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('partition_name')
+    )
+    op.create_table('attendance_archived_rollup',
+    sa.Column('student_id', sa.UUID(), nullable=False),
+    sa.Column('subject_id', sa.UUID(), nullable=False),
+    sa.Column('section_id', sa.UUID(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('present', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['section_id'], ['sections.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], ),
+    sa.PrimaryKeyConstraint('student_id', 'subject_id', 'section_id')
+    )
+    # Record partitions detached before this revision and the totals they took with them
+    op.execute(r"""
+        INSERT INTO attendance_archives (partition_name, starts_on, ends_on, detached_at)
+        SELECT c.relname,
+               to_date(substr(c.relname, 13), 'YYYY_MM'),
+               (to_date(substr(c.relname, 13), 'YYYY_MM') + interval '1 month')::date,
+               now()
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind = 'r'
+          AND n.nspname = current_schema()
+          AND c.relname ~ '^attendance_p[0-9]{4}_[0-9]{2}$'
+          AND NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid)
+    """)
+    op.execute("""
+        DO $$
+        DECLARE archived text;
+        BEGIN
+            FOR archived IN SELECT partition_name FROM attendance_archives LOOP
+                EXECUTE format(
+                    'INSERT INTO attendance_archived_rollup (student_id, subject_id, section_id, total, present) '
+                    'SELECT student_id, subject_id, section_id, COUNT(*), COUNT(*) FILTER (WHERE status = ''PRESENT'') '
+                    'FROM %I GROUP BY student_id, subject_id, section_id '
+                    'ON CONFLICT (student_id, subject_id, section_id) DO UPDATE '
+                    'SET total = attendance_archived_rollup.total + excluded.total, '
+                    'present = attendance_archived_rollup.present + excluded.present',
+                    archived
+                );
+            END LOOP;
+        END $$
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('attendance_archived_rollup')
+    op.drop_table('attendance_archives')
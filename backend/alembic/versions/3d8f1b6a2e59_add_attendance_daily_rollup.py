@@ -0,0 +1,52 @@
+"""Add attendance daily rollup
+
+Revision ID: 3d8f1b6a2e59
+Revises: a9c5e3f7b182
+Create Date: 2026-10-16 15:52:21.604318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d8f1b6a2e59'
+down_revision: Union[str, Sequence[str], None] = 'a9c5e3f7b182'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('attendance_daily_rollup',
+    sa.Column('section_id', sa.UUID(), nullable=False),
+    sa.Column('subject_id', sa.UUID(), nullable=False),
+    sa.Column('attendance_date', sa.Date(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('present', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['section_id'], ['sections.id'], ),
+    sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], ),
+    sa.PrimaryKeyConstraint('section_id', 'subject_id', 'attendance_date')
+    )
+    op.create_index('ix_attendance_daily_rollup_date', 'attendance_daily_rollup', ['attendance_date'], unique=False)
+    # Backfill from row storage; with ATTENDANCE_STORAGE=bitmap run `python -m app.manage rebuild-attendance-rollup`
+    op.execute("""
+        INSERT INTO attendance_daily_rollup (section_id, subject_id, attendance_date, total, present, updated_at)
+        SELECT section_id,
+               subject_id,
+               attendance_date,
+               COUNT(*),
+               COUNT(*) FILTER (WHERE status = 'PRESENT'),
+               now()
+        FROM attendance
+        GROUP BY section_id, subject_id, attendance_date
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_attendance_daily_rollup_date', table_name='attendance_daily_rollup')
+    op.drop_table('attendance_daily_rollup')
@@ -0,0 +1,52 @@
+"""Add branch performance rollup
+
+Revision ID: 4e1f7a2c9d10
+Revises: b54e06eb7a02
+Create Date: 2026-10-16 10:05:12.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e1f7a2c9d10'
+down_revision: Union[str, Sequence[str], None] = 'b54e06eb7a02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('branch_performance_rollup',
+    sa.Column('branch_id', sa.UUID(), nullable=False),
+    sa.Column('pct_sum', sa.Float(), nullable=False),
+    sa.Column('mark_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['branch_id'], ['branches.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('branch_id')
+    )
+    # Backfill from existing marks
+    op.execute("""
+        INSERT INTO branch_performance_rollup (branch_id, pct_sum, mark_count, updated_at)
+        SELECT u.branch_id,
+               SUM(m.marks_obtained * 100.0 / e.total_marks),
+               COUNT(m.marks_obtained),
+               now()
+        FROM exam_marks m
+        JOIN exams e ON m.exam_id = e.id
+        JOIN users u ON m.student_id = u.id
+        WHERE u.role = 'STUDENT'
+          AND u.branch_id IS NOT NULL
+          AND m.status <> 'REJECTED'
+          AND m.marks_obtained IS NOT NULL
+          AND e.total_marks > 0
+        GROUP BY u.branch_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('branch_performance_rollup')
@@ -0,0 +1,43 @@
+"""Add attendance sync keys
+
+Revision ID: 5b2e9c7d4a10
+Revises: 3d8f1b6a2e59
+Create Date: 2026-10-16 16:31:47.215093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2e9c7d4a10'
+down_revision: Union[str, Sequence[str], None] = '3d8f1b6a2e59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('attendance_sync_keys',
+    sa.Column('submitted_by', sa.UUID(), nullable=False),
+    sa.Column('key', sa.String(length=100), nullable=False),
+    sa.Column('section_id', sa.UUID(), nullable=False),
+    sa.Column('subject_id', sa.UUID(), nullable=False),
+    sa.Column('attendance_date', sa.Date(), nullable=False),
+    sa.Column('created', sa.Integer(), nullable=False),
+    sa.Column('updated', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['section_id'], ['sections.id'], ),
+    sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], ),
+    sa.ForeignKeyConstraint(['submitted_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('submitted_by', 'key')
+    )
+    op.create_index('ix_attendance_sync_keys_created_at', 'attendance_sync_keys', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_attendance_sync_keys_created_at', table_name='attendance_sync_keys')
+    op.drop_table('attendance_sync_keys')
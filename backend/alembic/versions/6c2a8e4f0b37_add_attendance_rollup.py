@@ -0,0 +1,53 @@
+"""Add attendance rollup
+
+Revision ID: 6c2a8e4f0b37
+Revises: 9b3d5e7f1a24
+Create Date: 2026-10-16 12:14:08.530417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c2a8e4f0b37'
+down_revision: Union[str, Sequence[str], None] = '9b3d5e7f1a24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('attendance_rollup',
+    sa.Column('student_id', sa.UUID(), nullable=False),
+    sa.Column('subject_id', sa.UUID(), nullable=False),
+    sa.Column('section_id', sa.UUID(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('present', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['section_id'], ['sections.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], ),
+    sa.PrimaryKeyConstraint('student_id', 'subject_id', 'section_id')
+    )
+    op.create_index('ix_attendance_rollup_section_subject', 'attendance_rollup', ['section_id', 'subject_id'], unique=False)
+    # Backfill from existing attendance
+    op.execute("""
+        INSERT INTO attendance_rollup (student_id, subject_id, section_id, total, present, updated_at)
+        SELECT student_id,
+               subject_id,
+               section_id,
+               COUNT(*),
+               COUNT(*) FILTER (WHERE status = 'PRESENT'),
+               now()
+        FROM attendance
+        GROUP BY student_id, subject_id, section_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_attendance_rollup_section_subject', table_name='attendance_rollup')
+    op.drop_table('attendance_rollup')
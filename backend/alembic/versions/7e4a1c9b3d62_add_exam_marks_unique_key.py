@@ -0,0 +1,68 @@
+"""Add exam marks unique key
+
+Revision ID: 7e4a1c9b3d62
+Revises: 5b2e9c7d4a10
+Create Date: 2026-10-16 17:02:11.480926
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e4a1c9b3d62'
+down_revision: Union[str, Sequence[str], None] = '5b2e9c7d4a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the most recently updated mark of each duplicate group
+    op.execute("""
+        DELETE FROM exam_marks m
+        USING (
+            SELECT id,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY exam_id, student_id
+                       ORDER BY updated_at DESC, id DESC
+                   ) AS rn
+            FROM exam_marks
+        ) d
+        WHERE m.id = d.id AND d.rn > 1
+    """)
+    # The rollup counted the removed duplicates; recompute it
+    op.execute("DELETE FROM branch_performance_rollup")
+    op.execute("""
+        INSERT INTO branch_performance_rollup (branch_id, pct_sum, mark_count, updated_at)
+        SELECT u.branch_id,
+               SUM(m.marks_obtained * 100.0 / e.total_marks),
+               COUNT(m.marks_obtained),
+               now()
+        FROM exam_marks m
+        JOIN exams e ON m.exam_id = e.id
+        JOIN users u ON m.student_id = u.id
+        WHERE u.role = 'STUDENT'
+          AND u.branch_id IS NOT NULL
+          AND m.status <> 'REJECTED'
+          AND m.marks_obtained IS NOT NULL
+          AND e.total_marks > 0
+        GROUP BY u.branch_id
+    """)
+    # The constraint's index covers the same lookups as the old non-unique one
+    # Written as SQL: create_unique_constraint cannot resolve INCLUDE columns outside the key
+    op.execute(
+        "ALTER TABLE exam_marks ADD CONSTRAINT uq_exam_marks_exam_student "
+        "UNIQUE (exam_id, student_id) INCLUDE (status, marks_obtained)"
+    )
+    op.drop_index('ix_exam_marks_exam_student', table_name='exam_marks', if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        'ix_exam_marks_exam_student', 'exam_marks', ['exam_id', 'student_id'],
+        unique=False, postgresql_include=['status', 'marks_obtained']
+    )
+    op.drop_constraint('uq_exam_marks_exam_student', 'exam_marks', type_='unique')
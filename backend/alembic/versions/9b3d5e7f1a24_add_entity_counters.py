@@ -0,0 +1,43 @@
+"""Add entity counters
+
+Revision ID: 9b3d5e7f1a24
+Revises: 4e1f7a2c9d10
+Create Date: 2026-10-16 11:31:47.062915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3d5e7f1a24'
+down_revision: Union[str, Sequence[str], None] = '4e1f7a2c9d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('entity_counters',
+    sa.Column('key', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    # Seed from current data
+    op.execute("""
+        INSERT INTO entity_counters (key, value, updated_at) VALUES
+            ('students', (SELECT COUNT(*) FROM users WHERE role = 'STUDENT' AND is_active), now()),
+            ('teachers', (SELECT COUNT(*) FROM users WHERE role = 'TEACHER' AND is_active), now()),
+            ('branches', (SELECT COUNT(*) FROM branches), now()),
+            ('sections', (SELECT COUNT(*) FROM sections), now()),
+            ('semesters', (SELECT COUNT(*) FROM semesters), now()),
+            ('pending_leaves', (SELECT COUNT(*) FROM leave_applications WHERE status = 'PENDING'), now())
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('entity_counters')
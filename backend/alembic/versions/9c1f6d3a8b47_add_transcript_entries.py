@@ -0,0 +1,56 @@
+"""Add transcript entries
+
+Revision ID: 9c1f6d3a8b47
+Revises: 7e4a1c9b3d62
+Create Date: 2026-10-16 18:24:37.215604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1f6d3a8b47'
+down_revision: Union[str, Sequence[str], None] = '7e4a1c9b3d62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('transcript_entries',
+    sa.Column('student_id', sa.UUID(), nullable=False),
+    sa.Column('exam_id', sa.UUID(), nullable=False),
+    sa.Column('mark_id', sa.UUID(), nullable=False),
+    sa.Column('exam_name', sa.String(length=100), nullable=False),
+    sa.Column('exam_date', sa.Date(), nullable=False),
+    sa.Column('subject_id', sa.UUID(), nullable=False),
+    sa.Column('subject_name', sa.String(length=100), nullable=False),
+    sa.Column('subject_code', sa.String(length=20), nullable=False),
+    sa.Column('section_id', sa.UUID(), nullable=False),
+    sa.Column('semester_id', sa.UUID(), nullable=False),
+    sa.Column('semester_number', sa.Integer(), nullable=False),
+    sa.Column('marks_obtained', sa.Integer(), nullable=True),
+    sa.Column('total_marks', sa.Integer(), nullable=False),
+    sa.Column('is_absent', sa.Boolean(), nullable=False),
+    sa.Column('percentage', sa.Float(), nullable=False),
+    sa.Column('grade', sa.String(length=5), nullable=False),
+    sa.Column('grade_point', sa.Float(), nullable=False),
+    sa.Column('published_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['student_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['mark_id'], ['exam_marks.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('student_id', 'exam_id'),
+    sa.UniqueConstraint('mark_id')
+    )
+    op.create_index('ix_transcript_entries_student_semester_date', 'transcript_entries', ['student_id', 'semester_number', 'exam_date'], unique=False)
+    # Grades depend on GRADE_BOUNDARIES, so existing approved marks are
+    # backfilled with `python -m app.manage rebuild-transcripts`
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transcript_entries_student_semester_date', table_name='transcript_entries')
+    op.drop_table('transcript_entries')
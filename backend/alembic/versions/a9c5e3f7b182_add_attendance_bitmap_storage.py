@@ -0,0 +1,64 @@
+"""Add attendance bitmap storage
+
+Revision ID: a9c5e3f7b182
+Revises: f2b7d9e1a456
+Create Date: 2026-10-16 15:10:37.918462
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9c5e3f7b182'
+down_revision: Union[str, Sequence[str], None] = 'f2b7d9e1a456'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('attendance_roster',
+    sa.Column('section_id', sa.UUID(), nullable=False),
+    sa.Column('student_id', sa.UUID(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['section_id'], ['sections.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('section_id', 'student_id'),
+    sa.UniqueConstraint('section_id', 'position', name='uq_attendance_roster_section_position')
+    )
+    op.create_table('attendance_sheets',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('section_id', sa.UUID(), nullable=False),
+    sa.Column('subject_id', sa.UUID(), nullable=False),
+    sa.Column('attendance_date', sa.Date(), nullable=False),
+    sa.Column('marked', sa.LargeBinary(), nullable=False),
+    sa.Column('present', sa.LargeBinary(), nullable=False),
+    sa.Column('marked_by', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['marked_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['section_id'], ['sections.id'], ),
+    sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('section_id', 'subject_id', 'attendance_date', name='uq_attendance_sheet_section_subject_date')
+    )
+    op.create_index(op.f('ix_attendance_sheets_attendance_date'), 'attendance_sheets', ['attendance_date'], unique=False)
+    op.create_table('attendance_sheet_remarks',
+    sa.Column('sheet_id', sa.UUID(), nullable=False),
+    sa.Column('student_id', sa.UUID(), nullable=False),
+    sa.Column('remarks', sa.String(length=255), nullable=False),
+    sa.ForeignKeyConstraint(['sheet_id'], ['attendance_sheets.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['student_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('sheet_id', 'student_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('attendance_sheet_remarks')
+    op.drop_index(op.f('ix_attendance_sheets_attendance_date'), table_name='attendance_sheets')
+    op.drop_table('attendance_sheets')
+    op.drop_table('attendance_roster')
@@ -0,0 +1,57 @@
+"""Add attendance unique key
+
+Revision ID: d71f3b9a5c28
+Revises: 6c2a8e4f0b37
+Create Date: 2026-10-16 13:02:44.871230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd71f3b9a5c28'
+down_revision: Union[str, Sequence[str], None] = '6c2a8e4f0b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the most recently created record of each duplicate group
+    op.execute("""
+        DELETE FROM attendance a
+        USING (
+            SELECT id,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY student_id, subject_id, section_id, attendance_date
+                       ORDER BY created_at DESC, id DESC
+                   ) AS rn
+            FROM attendance
+        ) d
+        WHERE a.id = d.id AND d.rn > 1
+    """)
+    # The rollup counted the removed duplicates; recompute it
+    op.execute("DELETE FROM attendance_rollup")
+    op.execute("""
+        INSERT INTO attendance_rollup (student_id, subject_id, section_id, total, present, updated_at)
+        SELECT student_id,
+               subject_id,
+               section_id,
+               COUNT(*),
+               COUNT(*) FILTER (WHERE status = 'PRESENT'),
+               now()
+        FROM attendance
+        GROUP BY student_id, subject_id, section_id
+    """)
+    op.create_unique_constraint(
+        'uq_attendance_student_subject_section_date',
+        'attendance',
+        ['student_id', 'subject_id', 'section_id', 'attendance_date']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_attendance_student_subject_section_date', 'attendance', type_='unique')
@@ -0,0 +1,49 @@
+"""Add composite indexes for hot queries
+
+Revision ID: e8a4c6d2f913
+Revises: d71f3b9a5c28
+Create Date: 2026-10-16 13:40:19.226581
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a4c6d2f913'
+down_revision: Union[str, Sequence[str], None] = 'd71f3b9a5c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, covering columns)
+INDEXES = [
+    ('ix_attendance_section_subject_date', 'attendance', ['section_id', 'subject_id', 'attendance_date'], ['student_id', 'status']),
+    ('ix_attendance_student_date', 'attendance', ['student_id', 'attendance_date'], []),
+    ('ix_exam_marks_exam_student', 'exam_marks', ['exam_id', 'student_id'], ['status', 'marks_obtained']),
+    ('ix_timetable_teacher_day_period', 'timetable', ['teacher_id', 'day', 'period'], []),
+    ('ix_timetable_section_day_period', 'timetable', ['section_id', 'day', 'period'], []),
+    ('ix_exams_section_subject_date', 'exams', ['section_id', 'subject_id', 'exam_date'], []),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, include in INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                postgresql_include=include,
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,101 @@
+"""Partition attendance by month
+
+Revision ID: f2b7d9e1a456
+Revises: e8a4c6d2f913
+Create Date: 2026-10-16 14:25:51.604318
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b7d9e1a456'
+down_revision: Union[str, Sequence[str], None] = 'e8a4c6d2f913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months created ahead of today so new attendance never lands in the default partition
+MONTHS_AHEAD = 3
+
+COLUMNS = "id, student_id, section_id, subject_id, attendance_date, status, remarks, marked_by, created_at"
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_attendance_table(name: str, partitioned: bool) -> None:
+    op.create_table(name,
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('student_id', sa.UUID(), nullable=False),
+    sa.Column('section_id', sa.UUID(), nullable=False),
+    sa.Column('subject_id', sa.UUID(), nullable=False),
+    sa.Column('attendance_date', sa.Date(), nullable=False),
+    sa.Column('status', postgresql.ENUM('PRESENT', 'ABSENT', name='attendancestatus', create_type=False), nullable=False),
+    sa.Column('remarks', sa.String(length=255), nullable=True),
+    sa.Column('marked_by', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['student_id'], ['users.id'], name='attendance_student_id_fkey'),
+    sa.ForeignKeyConstraint(['section_id'], ['sections.id'], name='attendance_section_id_fkey'),
+    sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], name='attendance_subject_id_fkey'),
+    sa.ForeignKeyConstraint(['marked_by'], ['users.id'], name='attendance_marked_by_fkey'),
+    sa.PrimaryKeyConstraint(*(['id', 'attendance_date'] if partitioned else ['id']), name=f'{name}_pkey'),
+    **({'postgresql_partition_by': 'RANGE (attendance_date)'} if partitioned else {})
+    )
+
+
+def _create_attendance_indexes() -> None:
+    op.create_unique_constraint(
+        'uq_attendance_student_subject_section_date',
+        'attendance',
+        ['student_id', 'subject_id', 'section_id', 'attendance_date']
+    )
+    op.create_index('ix_attendance_student_id', 'attendance', ['student_id'], unique=False)
+    op.create_index('ix_attendance_section_id', 'attendance', ['section_id'], unique=False)
+    op.create_index('ix_attendance_attendance_date', 'attendance', ['attendance_date'], unique=False)
+    op.create_index(
+        'ix_attendance_section_subject_date', 'attendance', ['section_id', 'subject_id', 'attendance_date'],
+        unique=False, postgresql_include=['student_id', 'status']
+    )
+    op.create_index('ix_attendance_student_date', 'attendance', ['student_id', 'attendance_date'], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _create_attendance_table('attendance_partitioned', partitioned=True)
+
+    # One partition per month from the oldest record through a few months ahead
+    oldest = op.get_bind().scalar(sa.text("SELECT MIN(attendance_date) FROM attendance"))
+    current = date.today().replace(day=1)
+    month = min(oldest.replace(day=1), current) if oldest else current
+    last = _add_months(current, MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE attendance_p{month:%Y_%m} PARTITION OF attendance_partitioned "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    op.execute("CREATE TABLE attendance_default PARTITION OF attendance_partitioned DEFAULT")
+
+    op.execute(f"INSERT INTO attendance_partitioned ({COLUMNS}) SELECT {COLUMNS} FROM attendance")
+    op.drop_table('attendance')
+    op.rename_table('attendance_partitioned', 'attendance')
+    op.execute("ALTER INDEX attendance_partitioned_pkey RENAME TO attendance_pkey")
+    _create_attendance_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _create_attendance_table('attendance_unpartitioned', partitioned=False)
+    op.execute(f"INSERT INTO attendance_unpartitioned ({COLUMNS}) SELECT {COLUMNS} FROM attendance")
+    # Dropping the parent drops every attached partition
+    op.drop_table('attendance')
+    op.rename_table('attendance_unpartitioned', 'attendance')
+    op.execute("ALTER INDEX attendance_unpartitioned_pkey RENAME TO attendance_pkey")
+    _create_attendance_indexes()
@@ -1,12 +1,21 @@
 from typing import List, Annotated, Optional
 from uuid import UUID
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, get_current_admin
+from app.core.jobs import jobs
+from app.models.attendance import AttendanceStatus
 from app.models.user import User, Role
-from app.repository.attendance import AttendanceRepository
+from app.repository.attendance import AttendanceRepository, ANALYTICS_BUCKETS
+from app.repository.attendance_partition import AttendancePartitionRepository, ArchivedAttendanceError
+from app.repository.attendance_sync import AttendanceSyncRepository
+from app.schemas.attendance import AttendanceSyncRequest, CheckInSessionCreate, CheckInRequest
+from app.services.attendance_checkin_service import AttendanceCheckInService
+from app.services.attendance_import_service import AttendanceImportService
+from app.services.attendance_export_service import AttendanceExportService, EXPORT_FORMATS, EXPORT_LAYOUTS, missing_dependency
 
 router = APIRouter(prefix="/attendance", tags=["Attendance"])
 
@@ -27,31 +36,44 @@ async def get_my_attendance_records(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
     skip: int = 0,
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=100),
+    include_total: bool = True,
     db: Annotated[AsyncSession, Depends(get_db)] = None,
     current_user: User = Depends(get_current_user)
 ):
-    """Get detailed attendance logs for current student."""
+    """
+    Get detailed attendance logs for current student, newest first.
+    Pass `next_cursor` from the previous page as `cursor` to continue without OFFSET;
+    set `include_total=false` to skip counting.
+    """
     if current_user.role != Role.STUDENT:
         raise HTTPException(status_code=403, detail="Only students can view their attendance records")
         
     repo = AttendanceRepository(db)
-    records = await repo.get_student_records(
-        current_user.id, 
-        start_date=start_date, 
-        end_date=end_date,
-        status=status,
-        skip=skip,
-        limit=limit
-    )
-    total = await repo.get_student_records_count(current_user.id, start_date, end_date, status)
+    try:
+        records, next_cursor = await repo.get_student_records(
+            current_user.id, 
+            start_date=start_date, 
+            end_date=end_date,
+            status=status,
+            cursor=cursor,
+            skip=skip,
+            limit=limit
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    total = None
+    if include_total:
+        total = await repo.get_student_records_count(current_user.id, start_date, end_date, status)
     
     return {
         "items": records,
         "total": total,
         "skip": skip,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": next_cursor
     }
 
 
@@ -125,14 +147,118 @@ async def mark_bulk_attendance(
         raise HTTPException(status_code=403, detail="Only teachers and admins can mark attendance")
     
     repo = AttendanceRepository(db)
-    count = await repo.bulk_mark_attendance(
-        section_id=UUID(data["section_id"]),
-        subject_id=UUID(data["subject_id"]),
-        attendance_date=date.fromisoformat(data["attendance_date"]),
-        entries=data["entries"],
-        marked_by=current_user.id
+    try:
+        counts = await repo.bulk_mark_attendance(
+            section_id=UUID(data["section_id"]),
+            subject_id=UUID(data["subject_id"]),
+            attendance_date=date.fromisoformat(data["attendance_date"]),
+            entries=data["entries"],
+            marked_by=current_user.id
+        )
+    except ArchivedAttendanceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    count = counts["created"] + counts["updated"]
+    return {
+        "message": f"Attendance marked for {count} students",
+        "count": count,
+        "created": counts["created"],
+        "updated": counts["updated"]
+    }
+
+
+@router.post("/sync")
+async def sync_attendance(
+    data: AttendanceSyncRequest,
+    db: Annotated[AsyncSession, Depends(get_db)] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Apply several offline-marked sheets in one transaction.
+
+    Each sheet carries an idempotency key. A sheet whose key was already
+    applied is skipped and reported as "already_applied" with its original
+    counts, so a batch can safely be retried after a timeout.
+    """
+    if current_user.role not in [Role.TEACHER, Role.ADMIN]:
+        raise HTTPException(status_code=403, detail="Only teachers and admins can mark attendance")
+    keys = [sheet.idempotency_key for sheet in data.sheets]
+    if len(set(keys)) != len(keys):
+        raise HTTPException(status_code=400, detail="Idempotency keys must be unique within a batch")
+    sessions = [(sheet.section_id, sheet.subject_id, sheet.attendance_date) for sheet in data.sheets]
+    if len(set(sessions)) != len(sessions):
+        raise HTTPException(status_code=400, detail="Each class session may appear only once per batch")
+
+    repo = AttendanceSyncRepository(db)
+    try:
+        results = await repo.sync([sheet.model_dump() for sheet in data.sheets], current_user.id)
+    except ArchivedAttendanceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"results": results}
+
+
+@router.post("/checkin/sessions", status_code=status.HTTP_201_CREATED)
+async def open_checkin_session(
+    data: CheckInSessionCreate,
+    db: Annotated[AsyncSession, Depends(get_db)] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Open a check-in code for a class; students of the section mark themselves present with it."""
+    if current_user.role not in [Role.TEACHER, Role.ADMIN]:
+        raise HTTPException(status_code=403, detail="Only teachers and admins can open check-in")
+    attendance_date = data.attendance_date or date.today()
+    try:
+        await AttendancePartitionRepository(db).ensure_writable([attendance_date])
+    except ArchivedAttendanceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    session = await AttendanceCheckInService.open_session(
+        data.section_id, data.subject_id, attendance_date,
+        current_user.id, data.duration_minutes
     )
-    return {"message": f"Attendance marked for {count} students", "count": count}
+    return {
+        "code": session["code"],
+        "attendance_date": session["attendance_date"].isoformat(),
+        "expires_at": session["expires_at"].isoformat()
+    }
+
+
+@router.delete("/checkin/sessions/{code}", status_code=status.HTTP_204_NO_CONTENT)
+async def close_checkin_session(
+    code: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Stop accepting check-ins before the code expires."""
+    session = await AttendanceCheckInService.get_session(code)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Check-in code not found or expired")
+    if current_user.role != Role.ADMIN and session["opened_by"] != current_user.id:
+        raise HTTPException(status_code=403, detail="Only the teacher who opened check-in can close it")
+    await AttendanceCheckInService.close_session(code)
+
+
+@router.post("/checkin")
+async def check_in(
+    data: CheckInRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Check in to a class with its code. Responds once the attendance is committed;
+    concurrent check-ins are written together in small batches. A mark the
+    teacher has already entered for the class is not overridden.
+    """
+    if current_user.role != Role.STUDENT:
+        raise HTTPException(status_code=403, detail="Only students can check in")
+    session = await AttendanceCheckInService.get_session(data.code)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Check-in code not found or expired")
+    if current_user.section_id != session["section_id"]:
+        raise HTTPException(status_code=403, detail="This check-in code is for another section")
+
+    await AttendanceCheckInService.check_in(session, current_user.id)
+    return {
+        "status": AttendanceStatus.PRESENT.value,
+        "subject_id": str(session["subject_id"]),
+        "attendance_date": session["attendance_date"].isoformat()
+    }
 
 
 @router.get("/history")
@@ -151,3 +277,98 @@ async def get_attendance_history(
     repo = AttendanceRepository(db)
     history = await repo.get_section_attendance_history(section_id, subject_id, start_date, end_date)
     return history
+
+
+@router.get("/analytics")
+async def get_attendance_analytics(
+    bucket: str = "week",
+    section_id: Optional[UUID] = None,
+    subject_id: Optional[UUID] = None,
+    student_id: Optional[UUID] = None,
+    branch_id: Optional[UUID] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Annotated[AsyncSession, Depends(get_db)] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Attendance totals bucketed by week, month or weekday, for heatmaps and trend charts.
+    Scope by any combination of section, subject, student and branch.
+    """
+    if current_user.role not in [Role.TEACHER, Role.ADMIN]:
+        raise HTTPException(status_code=403, detail="Only teachers and admins can access this")
+    if bucket not in ANALYTICS_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"Unsupported bucket. Use one of: {', '.join(ANALYTICS_BUCKETS)}")
+    if not any([section_id, subject_id, student_id, branch_id]):
+        raise HTTPException(status_code=400, detail="Provide at least one of section_id, subject_id, student_id or branch_id")
+
+    repo = AttendanceRepository(db)
+    return await repo.get_bucketed_stats(bucket, section_id, subject_id, student_id, branch_id, start_date, end_date)
+
+
+@router.get("/export")
+async def export_attendance_register(
+    section_id: UUID,
+    subject_id: UUID,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    format: str = "csv",
+    layout: str = "long",
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Stream the attendance register for a section/subject as CSV, XLSX or Parquet.
+    `layout=pivot` gives one row per student and one column per class date.
+    """
+    if current_user.role not in [Role.TEACHER, Role.ADMIN]:
+        raise HTTPException(status_code=403, detail="Only teachers and admins can export attendance")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format. Use one of: {', '.join(EXPORT_FORMATS)}")
+    if layout not in EXPORT_LAYOUTS:
+        raise HTTPException(status_code=400, detail=f"Unsupported layout. Use one of: {', '.join(EXPORT_LAYOUTS)}")
+    missing = missing_dependency(format)
+    if missing:
+        raise HTTPException(status_code=501, detail=f"{format} export requires the {missing} package")
+
+    media_type, extension, _ = EXPORT_FORMATS[format]
+    filename = f"attendance_{section_id}_{subject_id}_{layout}.{extension}"
+    return StreamingResponse(
+        AttendanceExportService.stream(format, section_id, subject_id, start_date, end_date, layout),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.post("/import", status_code=status.HTTP_202_ACCEPTED)
+async def import_attendance_csv(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_admin)
+):
+    """
+    Import historical attendance from a CSV with columns roll_no, subject_code, date, status.
+    Runs in the background; poll GET /attendance/import/{job_id} for progress and row errors.
+    """
+    content = await file.read()
+    try:
+        missing = AttendanceImportService.missing_headers(content)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded CSV")
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing required columns: {', '.join(missing)}")
+
+    job = jobs.create("attendance_import", started_by=current_user.email)
+    background_tasks.add_task(AttendanceImportService.run, job, content, current_user.id)
+    return {"job_id": job.id, "status": job.status}
+
+
+@router.get("/import/{job_id}")
+async def get_attendance_import(
+    job_id: str,
+    current_user: User = Depends(get_current_admin)
+):
+    """Progress, counts and per-row errors of an attendance import."""
+    job = jobs.get(job_id)
+    if job is None or job.kind != "attendance_import":
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job.to_dict()
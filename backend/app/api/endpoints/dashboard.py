@@ -1,8 +1,9 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import cache_stats
 from app.core.database import get_db
 from app.models.user import User, Role
 from app.core.dependencies import get_current_user
@@ -22,12 +23,28 @@ async def get_performance_stats(
 @router.get("/admin/defaulters")
 async def get_defaulters(
     threshold: float = 75.0,
+    branch_id: Optional[UUID] = None,
+    semester_id: Optional[UUID] = None,
+    section_id: Optional[UUID] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Get list of students with attendance percentage below the threshold.
-    """
-    return await DashboardService.get_defaulters(db, threshold)
+    Get students with attendance percentage below the threshold, lowest first.
+    Pass `next_cursor` from the previous page as `cursor` to continue.
+    """
+    try:
+        return await DashboardService.get_defaulters(
+            db, threshold,
+            branch_id=branch_id,
+            semester_id=semester_id,
+            section_id=section_id,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 @router.get("/admin/stats")
 async def get_admin_stats(db: AsyncSession = Depends(get_db)):
@@ -36,6 +53,13 @@ async def get_admin_stats(db: AsyncSession = Depends(get_db)):
     """
     return await DashboardService.get_admin_stats(db)
 
+@router.get("/admin/cache-stats")
+async def get_cache_stats():
+    """
+    Get hit/miss counters, size and evictions for each dashboard cache.
+    """
+    return await cache_stats()
+
 @router.get("/student")
 async def get_student_stats(
     db: AsyncSession = Depends(get_db),
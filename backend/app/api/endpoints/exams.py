@@ -1,7 +1,7 @@
 from typing import List, Annotated, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status, BackgroundTasks
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db
@@ -12,6 +12,8 @@ from app.schemas.exam import ExamCreate, ExamUpdate, ExamResponse
 
 router = APIRouter(prefix="/exams", tags=["Exams"])
 
+TRANSCRIPT_FIELDS = {"exam_name", "exam_date", "total_marks"}
+
 from app.schemas.base import PaginatedResponse
 
 @router.get("", response_model=PaginatedResponse[ExamResponse])
@@ -80,8 +82,17 @@ async def update_exam(
     if not exam:
         raise HTTPException(status_code=404, detail="Exam not found")
         
+    # A total_marks change moves the exam's share of the branch rollup in the same transaction
     updated_exam = await repo.update(exam, exam_in.model_dump(exclude_unset=True))
     
+    # Transcript rows copy the exam's name, date and total marks
+    if TRANSCRIPT_FIELDS & exam_in.model_fields_set:
+        from app.core.cache import invalidate_students
+        from app.repository.transcript import TranscriptRepository
+        student_ids = await TranscriptRepository(db).refresh_exams([exam_id])
+        await db.commit()
+        await invalidate_students(student_ids)
+    
     # Check if schedule changed
     schedule_changed = (
         (exam_in.date and exam_in.date != exam.date) or
@@ -138,8 +149,12 @@ async def delete_exam(
 
 # --- Exam Marks Endpoints ---
 
+from app.core.jobs import jobs
+from app.models.exam_marks import MarkStatus
 from app.schemas.exam_marks import ExamMarkResponse, ExamMarksBulkSubmit, ExamMarkReview
 from app.repository.exam_marks import ExamMarksRepository
+from app.services.result_notification_service import ResultNotificationService
+from app.services.exam_statistics_service import ExamStatisticsService
 
 @router.get("/{exam_id}/marks", response_model=List[ExamMarkResponse])
 async def get_exam_marks(
@@ -149,25 +164,7 @@ async def get_exam_marks(
 ):
     """Get all marks for an exam."""
     repo = ExamMarksRepository(db)
-    marks = await repo.get_marks_for_exam(exam_id)
-    
-    # Format response to include student name
-    formatted_marks = []
-    for mark in marks:
-        formatted_marks.append({
-            "id": mark.id,
-            "exam_id": mark.exam_id,
-            "student_id": mark.student_id,
-            "student_name": f"{mark.student.first_name} {mark.student.last_name}",
-            "marks_obtained": mark.marks_obtained,
-            "is_absent": mark.is_absent,
-            "status": mark.status,
-            "submitted_by": mark.submitted_by,
-            "approved_by": mark.approved_by,
-            "created_at": mark.created_at,
-            "updated_at": mark.updated_at
-        })
-    return formatted_marks
+    return await repo.get_marks_for_exam(exam_id)
 
 @router.post("/{exam_id}/marks", response_model=List[ExamMarkResponse])
 async def submit_exam_marks(
@@ -176,72 +173,89 @@ async def submit_exam_marks(
     db: Annotated[AsyncSession, Depends(get_db)] = None,
     current_user: User = Depends(get_current_teacher_or_admin)
 ):
-    """Bulk submit/update marks for an exam (sets status to PENDING)."""
+    """Bulk submit/update marks for an exam (sets status to PENDING). Returns the marks written."""
     repo = ExamMarksRepository(db)
-    marks = await repo.bulk_upsert_marks(
+    return await repo.bulk_upsert_marks(
         exam_id=exam_id,
         marks_data=[m.model_dump() for m in marks_in.marks],
         submitted_by=current_user.id
     )
-    return await get_exam_marks(exam_id, db=db, current_user=current_user)
 
 @router.patch("/{exam_id}/marks/review")
 async def review_exam_marks(
     exam_id: UUID,
     review_in: ExamMarkReview,
+    background_tasks: BackgroundTasks,
     db: Annotated[AsyncSession, Depends(get_db)] = None,
     current_user: User = Depends(get_current_admin)
 ):
-    """Admin review and approve/reject marks."""
+    """
+    Admin review and approve/reject marks.
+    Students whose marks become approved are emailed in the background;
+    poll GET /exams/notifications/{job_id} for progress.
+    """
     repo = ExamMarksRepository(db)
-    await repo.update_status(
+    changed = await repo.update_status(
         mark_ids=review_in.mark_ids,
         status=review_in.status,
         approved_by=current_user.id
     )
     
-    # Notify Students if Approved
-    if review_in.status == "APPROVED":
-        try:
-            from app.core.email import email_service
-            # We need to fetch the marks to get student info and exam info
-            # This might be heavy if approving 1000 marks. 
-            # Optimization: Fetch only necessary fields or rely on iteration.
-            
-            # Re-fetch the updated marks
-            # This is a list of mark objects
-            # To avoid N+1, we'd need a good query.
-            # For now, let's just iterate the IDs and fetch/notify.
-            # OR: Should we send ONE email saying "Results for Exam X Published"? 
-            # The prompt says "Report Card Published -> Notify Students".
-            # Usually users want to know their specific result or just a generic link.
-            # Generic link is safer/faster.
-            
-            # Let's send a generic "Your results for Exam X are out" + maybe specific marks.
-            # We first need the exam title.
-            # Let's fetch one mark to get the exam details.
-            if review_in.mark_ids:
-                 first_mark = await repo.get_by_id(review_in.mark_ids[0])
-                 if first_mark:
-                     exam = first_mark.exam
-                     exam_title = exam.title
-                     subject_name = exam.subject.name if exam.subject else "Subject"
-                     
-                     # Now we need the emails for these specific mark IDs
-                     # We can fetch marks with student loaded
-                     marks_list = await repo.get_by_ids(review_in.mark_ids) # Assuming exists or we iterate
-                     
-                     # Fallback: iterate (a bit slow but reliable for MVP)
-                     for mid in review_in.mark_ids:
-                         mark = await repo.get_by_id(mid)
-                         if mark and mark.student:
-                             details = {
-                                 "exam_title": exam_title,
-                                 "subject_name": subject_name,
-                                 "marks_obtained": f"{mark.marks_obtained}/{exam.total_marks}"
-                             }
-                             await email_service.send_report_card_published(mark.student.email, details)
-                             
-        except Exception as e:
-            print(f"Failed to send report card notifications: {e}")
-    return {"message": f"Successfully updated {len(review_in.mark_ids)} marks to {review_in.status}"}
+    job_id = None
+    if review_in.status == MarkStatus.APPROVED and changed:
+        job = jobs.create("result_notifications", started_by=current_user.email)
+        background_tasks.add_task(ResultNotificationService.publish, job, changed)
+        job_id = job.id
+    return {
+        "message": f"Successfully updated {len(review_in.mark_ids)} marks to {review_in.status}",
+        "job_id": job_id
+    }
+
+
+@router.get("/notifications/{job_id}")
+async def get_result_notifications(
+    job_id: str,
+    current_user: User = Depends(get_current_admin)
+):
+    """Progress and failed recipients of a result notification job."""
+    job = jobs.get(job_id)
+    if job is None or job.kind != "result_notifications":
+        raise HTTPException(status_code=404, detail="Notification job not found")
+    return job.to_dict()
+
+
+@router.get("/{exam_id}/statistics")
+async def get_exam_statistics(
+    exam_id: UUID,
+    bins: int = Query(10, ge=1, le=50),
+    db: Annotated[AsyncSession, Depends(get_db)] = None,
+    current_user: User = Depends(get_current_teacher_or_admin)
+):
+    """Mean, quartiles, standard deviation, score histogram and pass rate of an exam's approved marks."""
+    stats = await ExamStatisticsService.get_exam_statistics(db, exam_id, bins)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="Exam not found")
+    return stats
+
+
+# --- Results Endpoints ---
+
+from app.services.grading_service import GradingService
+
+@router.get("/results/section/{section_id}")
+async def get_section_results(
+    section_id: UUID,
+    db: Annotated[AsyncSession, Depends(get_db)] = None,
+    current_user: User = Depends(get_current_teacher_or_admin)
+):
+    """Grades, SGPA and CGPA for every student in a section."""
+    return await GradingService.compute_results(db, section_id=section_id)
+
+@router.get("/results/semester/{semester_id}")
+async def get_semester_results(
+    semester_id: UUID,
+    db: Annotated[AsyncSession, Depends(get_db)] = None,
+    current_user: User = Depends(get_current_admin)
+):
+    """Grades, SGPA and CGPA for every student currently in the semester's sections."""
+    return await GradingService.compute_results(db, semester_id=semester_id)
@@ -0,0 +1,378 @@
+import functools
+import pickle
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+from uuid import UUID
+
+from app.core.config import settings
+
+# Seconds an invalidation is remembered by the shared backend; a miss computed
+# over longer than this may still store a result the invalidation covered
+INVALIDATION_MEMORY = 3600
+
+
+class InMemoryBackend:
+    """
+    In-process LRU store where every entry expires after its TTL.
+
+    Holds at most `max_entries` entries; the least recently used one is
+    evicted when a new key would exceed the bound. Each entry remembers its
+    tags so the tag index shrinks with it on expiry, eviction or delete.
+
+    Every invalidation takes the next generation and stamps its tags with it.
+    A set made with the generation read before its value was computed is
+    dropped if one of its tags was invalidated since. Stamps are forgotten
+    past a bound by raising the floor every older generation is refused below.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple[float, Any, tuple]]" = OrderedDict()
+        self._tags: dict[str, set[Hashable]] = {}
+        self._generation = 0
+        self._floor = 0
+        self._invalidated: dict[str, int] = {}
+        self.evictions = 0
+
+    def _remove(self, key: Hashable) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+    async def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value, _ = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def generation(self) -> int:
+        return self._generation
+
+    async def set(self, key: Hashable, value: Any, ttl: float, tags: Iterable[str], generation: Optional[int] = None) -> bool:
+        tags = tuple(tags)
+        if generation is not None and (
+            generation < self._floor or any(self._invalidated.get(tag, 0) > generation for tag in tags)
+        ):
+            return False
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + ttl, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+        return True
+
+    async def delete(self, key: Hashable):
+        self._remove(key)
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        self._generation += 1
+        if len(self._invalidated) >= self.max_entries:
+            self._invalidated.clear()
+            self._floor = self._generation
+        removed = 0
+        for tag in tags:
+            self._invalidated[tag] = self._generation
+            for key in list(self._tags.get(tag, ())):
+                if self._remove(key):
+                    removed += 1
+        return removed
+
+    async def clear(self):
+        self._entries.clear()
+        self._tags.clear()
+        self._generation += 1
+        self._invalidated.clear()
+        self._floor = self._generation
+
+    async def size(self) -> int:
+        return len(self._entries)
+
+
+class RedisBackend:
+    """
+    Shared store in Redis so every worker sees the same entries and invalidations.
+
+    Keys are namespaced by cache name and tags are kept as Redis sets that
+    live as long as their longest-lived member. Uses the asyncio client of
+    the optional `redis` package (Redis 7+ for EXPIRE NX/GT).
+
+    Invalidations are stamped like the in-memory backend's, in keys that
+    outlive any reasonable computation (INVALIDATION_MEMORY seconds). The
+    stamp check and the write run in one script, so an invalidation cannot
+    land between them.
+    """
+
+    # Checks the tags' invalidation stamps against ARGV[1], then stores the entry
+    # and adds it to its tag sets. KEYS: entry, then each tag's set and its stamp.
+    _SET_SCRIPT = """
+        local generation = tonumber(ARGV[1])
+        local tags = (#KEYS - 1) / 2
+        if generation then
+            for i = 1, tags do
+                local stamp = redis.call('GET', KEYS[1 + tags + i])
+                if stamp and tonumber(stamp) > generation then
+                    return 0
+                end
+            end
+        end
+        redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+        for i = 1, tags do
+            redis.call('SADD', KEYS[1 + i], KEYS[1])
+            redis.call('EXPIRE', KEYS[1 + i], ARGV[3], 'NX')
+            redis.call('EXPIRE', KEYS[1 + i], ARGV[3], 'GT')
+        end
+        return 1
+    """
+
+    def __init__(self, url: str, namespace: str):
+        import redis.asyncio
+
+        self.client = redis.asyncio.Redis.from_url(url)
+        self.namespace = namespace
+        self.evictions = 0
+        self._set_script = self.client.register_script(self._SET_SCRIPT)
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.namespace}:{key!r}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.namespace}:tag:{tag}"
+
+    def _stamp_key(self, tag: str) -> str:
+        return f"{self.namespace}:invalidated:{tag}"
+
+    def _generation_key(self) -> str:
+        return f"{self.namespace}:generation"
+
+    async def get(self, key: Hashable) -> Optional[Any]:
+        raw = await self.client.get(self._key(key))
+        return pickle.loads(raw) if raw is not None else None
+
+    async def generation(self) -> int:
+        return int(await self.client.get(self._generation_key()) or 0)
+
+    async def set(self, key: Hashable, value: Any, ttl: float, tags: Iterable[str], generation: Optional[int] = None) -> bool:
+        tags = list(tags)
+        keys = [self._key(key), *map(self._tag_key, tags), *map(self._stamp_key, tags)]
+        # A new tag set gets this TTL; an existing one is only ever extended
+        stored = await self._set_script(
+            keys=keys, args=["" if generation is None else generation, pickle.dumps(value), max(int(ttl), 1)]
+        )
+        return bool(stored)
+
+    async def delete(self, key: Hashable):
+        await self.client.delete(self._key(key))
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        tags = list(tags)
+        generation = await self.client.incr(self._generation_key())
+        pipe = self.client.pipeline()
+        for tag in tags:
+            pipe.set(self._stamp_key(tag), generation, ex=INVALIDATION_MEMORY)
+        await pipe.execute()
+        removed = 0
+        for tag in tags:
+            keys = await self.client.smembers(self._tag_key(tag))
+            if keys:
+                removed += await self.client.delete(*keys)
+            await self.client.delete(self._tag_key(tag))
+        return removed
+
+    async def clear(self):
+        # The generation counter stays so in-flight sets are still checked against it
+        keys = [
+            key async for key in self.client.scan_iter(f"{self.namespace}:*")
+            if key != self._generation_key().encode()
+        ]
+        if keys:
+            await self.client.delete(*keys)
+
+    async def size(self) -> int:
+        return len([
+            key async for key in self.client.scan_iter(f"{self.namespace}:*")
+            if b":tag:" not in key and b":invalidated:" not in key and key != self._generation_key().encode()
+        ])
+
+
+def make_backend(name: str, max_entries: int):
+    """Backend selected by CACHE_BACKEND; "memory" unless a shared store is configured."""
+    if settings.CACHE_BACKEND == "redis":
+        return RedisBackend(settings.CACHE_REDIS_URL, namespace=f"cache:{name}")
+    return InMemoryBackend(max_entries=max_entries)
+
+
+class TTLCache:
+    """
+    Named key/value cache where every entry expires after `ttl` seconds.
+
+    Entries can carry tags (e.g. "student:<id>", "section:<id>") so that a
+    write path can drop everything derived from the data it changed.
+    Hits, misses and invalidations are counted for the metrics endpoint.
+
+    Usage:
+        cache = TTLCache("dashboard", ttl=300)
+        await cache.set(("section", "subject"), data, tags=["section:..."])
+        await cache.get(("section", "subject"))
+        await cache.invalidate_tags(["section:..."])
+    """
+
+    def __init__(self, name: str, ttl: float = 300, max_entries: int = 1024, backend=None):
+        self.name = name
+        self.ttl = ttl
+        self.backend = backend or make_backend(name, max_entries)
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        _registry[name] = self
+
+    async def get(self, key: Hashable) -> Optional[Any]:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            print(f"Cache {self.name} get failed: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def generation(self) -> Optional[int]:
+        """
+        Current invalidation generation; pass it to `set` to drop the value if
+        one of its tags is invalidated before it is stored.
+        """
+        try:
+            return await self.backend.generation()
+        except Exception as e:
+            print(f"Cache {self.name} generation failed: {e}")
+            return None
+
+    async def set(
+        self, key: Hashable, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = (),
+        generation: Optional[int] = None
+    ):
+        try:
+            await self.backend.set(key, value, ttl or self.ttl, list(tags), generation)
+        except Exception as e:
+            print(f"Cache {self.name} set failed: {e}")
+
+    async def delete(self, key: Hashable):
+        try:
+            await self.backend.delete(key)
+        except Exception as e:
+            print(f"Cache {self.name} delete failed: {e}")
+
+    async def invalidate_tags(self, tags: Iterable[str]):
+        try:
+            self.invalidations += await self.backend.invalidate_tags(tags)
+        except Exception as e:
+            print(f"Cache {self.name} invalidation failed: {e}")
+
+    async def clear(self):
+        try:
+            await self.backend.clear()
+        except Exception as e:
+            print(f"Cache {self.name} clear failed: {e}")
+
+    async def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "backend": type(self.backend).__name__,
+            "ttl": self.ttl,
+            "size": await self.backend.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0,
+            "evictions": self.backend.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+_registry: Dict[str, TTLCache] = {}
+
+
+async def cache_stats() -> list:
+    return [await cache.stats() for cache in _registry.values()]
+
+
+def cached(cache: TTLCache, key: Callable[..., tuple], tags: Callable[..., Iterable[str]] = lambda result, *args, **kwargs: ()):
+    """
+    Cache the result of an async function.
+
+    `key` receives the call's arguments and returns the parts that identify
+    the result; `tags` receives the result followed by the call's arguments.
+    Apply below @staticmethod:
+
+        @staticmethod
+        @cached(dashboard_cache, key=lambda db, student_id: (student_id,),
+                tags=lambda result, db, student_id: [tag("student", student_id)])
+        async def get_student_results(db, student_id): ...
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            cache_key = (func.__qualname__, *(str(part) for part in key(*args, **kwargs)))
+            result = await cache.get(cache_key)
+            if result is not None:
+                return result
+            # Read before computing, so a write invalidating meanwhile keeps the result out
+            generation = await cache.generation()
+            result = await func(*args, **kwargs)
+            if result is not None:
+                await cache.set(cache_key, result, tags=tags(result, *args, **kwargs), generation=generation)
+            return result
+        return wrapper
+    return decorator
+
+
+# Dashboard responses, tagged by the sections, students, exams and branches they read
+dashboard_cache = TTLCache("dashboard", ttl=300, max_entries=2048)
+
+
+def tag(kind: str, id: Any = None) -> str:
+    """
+    Cache tag for an entity; ids are normalised so str and UUID forms match.
+    Without an id, the tag covers results aggregated over every entity of that kind.
+    """
+    if id is None:
+        return f"{kind}:*"
+    return f"{kind}:{UUID(str(id))}"
+
+
+async def _invalidate(kind: str, ids: Iterable[Any]):
+    tags = [tag(kind, id) for id in ids if id]
+    if tags:
+        await dashboard_cache.invalidate_tags(tags + [tag(kind)])
+
+
+async def invalidate_students(student_ids: Iterable[Any]):
+    await _invalidate("student", student_ids)
+
+
+async def invalidate_sections(section_ids: Iterable[Any]):
+    await _invalidate("section", section_ids)
+
+
+async def invalidate_exams(exam_ids: Iterable[Any]):
+    await _invalidate("exam", exam_ids)
+
+
+async def invalidate_branches(branch_ids: Iterable[Any]):
+    await _invalidate("branch", branch_ids)
@@ -19,6 +19,25 @@ class Settings(BaseSettings):
     CLOUDINARY_API_KEY: str = ""
     CLOUDINARY_API_SECRET: str = ""
     
+    # Serve admin dashboard counts from the entity_counters table
+    ENTITY_COUNTERS_ENABLED: bool = False
+    
+    # Dashboard cache store: "memory" (per process) or "redis" (shared, needs the redis package)
+    CACHE_BACKEND: str = "memory"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    
+    # Attendance storage: "rows" (one row per student per session) or "bitmap" (one row per session)
+    ATTENDANCE_STORAGE: str = "rows"
+    
+    # Self check-in group commit: wait this long after the first check-in, or for this many, before writing
+    CHECKIN_FLUSH_INTERVAL_MS: int = 5
+    CHECKIN_MAX_BATCH: int = 2000
+    
+    # (min_percentage, grade, grade_point); anything below the lowest boundary is F / 0
+    GRADE_BOUNDARIES: list[tuple[float, str, float]] = [
+        (90, "O", 10), (80, "A+", 9), (70, "A", 8), (60, "B+", 7), (50, "B", 6), (40, "C", 5)
+    ]
+    
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=False, extra="ignore")
 
 
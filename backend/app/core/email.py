@@ -1,6 +1,6 @@
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from typing import List, Optional, Tuple
 import aiosmtplib
 from app.core.config import settings
 
@@ -19,6 +19,20 @@ class EmailService:
     def is_configured(self) -> bool:
         return bool(self.host and self.username and self.password)
     
+    def _build_message(
+        self, to_email: str, subject: str, html_content: str, text_content: Optional[str] = None
+    ) -> MIMEMultipart:
+        message = MIMEMultipart("alternative")
+        message["From"] = f"{self.from_name} <{self.from_email}>"
+        message["To"] = to_email
+        message["Subject"] = subject
+        
+        if text_content:
+            message.attach(MIMEText(text_content, "plain"))
+        
+        message.attach(MIMEText(html_content, "html"))
+        return message
+    
     async def send_email(
         self,
         to_email: str,
@@ -31,15 +45,7 @@ class EmailService:
             return False
         
         try:
-            message = MIMEMultipart("alternative")
-            message["From"] = f"{self.from_name} <{self.from_email}>"
-            message["To"] = to_email
-            message["Subject"] = subject
-            
-            if text_content:
-                message.attach(MIMEText(text_content, "plain"))
-            
-            message.attach(MIMEText(html_content, "html"))
+            message = self._build_message(to_email, subject, html_content, text_content)
             
             await aiosmtplib.send(
                 message,
@@ -57,6 +63,32 @@ class EmailService:
             print(f"Failed to send email to {to_email}: {str(e)}")
             return False
 
+    async def send_bulk(self, messages: List[Tuple[str, str, str]]) -> List[bool]:
+        """
+        Send (to_email, subject, html_content) messages over a single SMTP connection.
+        Returns whether each message was accepted, in order.
+        """
+        if not self.is_configured:
+            print(f"SMTP not configured. {len(messages)} emails not sent")
+            return [False] * len(messages)
+        
+        results = []
+        try:
+            smtp = aiosmtplib.SMTP(hostname=self.host, port=self.port, start_tls=True)
+            async with smtp:
+                await smtp.login(self.username, self.password)
+                for to_email, subject, html_content in messages:
+                    try:
+                        await smtp.send_message(self._build_message(to_email, subject, html_content))
+                        results.append(True)
+                    except aiosmtplib.SMTPResponseException as e:
+                        # Rejected recipient; the connection is still usable
+                        print(f"Failed to send email to {to_email}: {str(e)}")
+                        results.append(False)
+        except Exception as e:
+            print(f"Bulk email failed after {len(results)} of {len(messages)} messages: {str(e)}")
+        return results + [False] * (len(messages) - len(results))
+
     async def send_temporary_password_email(self, to_email: str, temp_password: str) -> bool:
         login_url = f"{self.frontend_url}/login"
         
@@ -100,8 +132,8 @@ class EmailService:
             text_content=text_content
         )
 
-    async def send_student_welcome_email(self, to_email: str, name: str, password: str, roll_no: str) -> bool:
-        """Send welcome email to new student with credentials."""
+    def student_welcome_message(self, to_email: str, name: str, password: str, roll_no: str) -> Tuple[str, str, str]:
+        """(to_email, subject, html_content) welcoming a new student with their credentials."""
         login_url = f"{self.frontend_url}/login"
         
         html_content = f"""
@@ -120,10 +152,16 @@ class EmailService:
         </body>
         </html>
         """
-        return await self.send_email(to_email, "Welcome to UniPortal - Your Account Details", html_content)
+        return to_email, "Welcome to UniPortal - Your Account Details", html_content
 
-    async def send_teacher_welcome_email(self, to_email: str, name: str, password: str, designation: str, department: str) -> bool:
-        """Send welcome email to new teacher with credentials."""
+    async def send_student_welcome_email(self, to_email: str, name: str, password: str, roll_no: str) -> bool:
+        """Send welcome email to new student with credentials."""
+        return await self.send_email(*self.student_welcome_message(to_email, name, password, roll_no))
+
+    def teacher_welcome_message(
+        self, to_email: str, name: str, password: str, designation: str, department: str
+    ) -> Tuple[str, str, str]:
+        """(to_email, subject, html_content) welcoming a new teacher with their credentials."""
         login_url = f"{self.frontend_url}/login"
         
         html_content = f"""
@@ -142,7 +180,11 @@ class EmailService:
         </body>
         </html>
         """
-        return await self.send_email(to_email, "Welcome Faculty - Your Account Details", html_content)
+        return to_email, "Welcome Faculty - Your Account Details", html_content
+
+    async def send_teacher_welcome_email(self, to_email: str, name: str, password: str, designation: str, department: str) -> bool:
+        """Send welcome email to new teacher with credentials."""
+        return await self.send_email(*self.teacher_welcome_message(to_email, name, password, designation, department))
 
     async def send_exam_schedule_update(self, to_emails: list[str], exam_details: dict) -> bool:
         """Notify students about exam schedule changes."""
@@ -171,8 +213,8 @@ class EmailService:
             await self.send_email(email, f"UPDATE: Exam Schedule - {exam_details.get('title')}", html_content)
         return True
 
-    async def send_report_card_published(self, to_email: str, result_details: dict) -> bool:
-        """Notify student that their results are published."""
+    def report_card_published_message(self, to_email: str, result_details: dict) -> Tuple[str, str, str]:
+        """(to_email, subject, html_content) telling a student their result is published."""
         html_content = f"""
         <!DOCTYPE html>
         <html>
@@ -188,7 +230,11 @@ class EmailService:
         </body>
         </html>
         """
-        return await self.send_email(to_email, "Results Published - UniPortal", html_content)
+        return to_email, "Results Published - UniPortal", html_content
+
+    async def send_report_card_published(self, to_email: str, result_details: dict) -> bool:
+        """Notify student that their results are published."""
+        return await self.send_email(*self.report_card_published_message(to_email, result_details))
 
     async def send_system_maintenance_alert(self, to_emails: list[str], maintenance_details: dict) -> bool:
         """Notify users about system maintenance."""
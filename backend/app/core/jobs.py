@@ -0,0 +1,91 @@
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Per-row errors kept on a job; the rest are only counted
+MAX_JOB_ERRORS = 1000
+
+
+class Job:
+    """Progress of a long-running background task, polled by the client that started it."""
+
+    def __init__(self, kind: str, started_by: Optional[str] = None):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.started_by = started_by
+        self.status = "pending"
+        self.phase: Optional[str] = None
+        self.total = 0
+        self.processed = 0
+        self.errors: List[str] = []
+        self.error_count = 0
+        self.result: Dict[str, Any] = {}
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+
+    def start(self, phase: str, total: Optional[int] = None):
+        self.status = "running"
+        self.phase = phase
+        if total is not None:
+            self.total = total
+
+    def advance(self, count: int = 1):
+        self.processed += count
+
+    def error(self, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_JOB_ERRORS:
+            self.errors.append(message)
+
+    def finish(self, **result):
+        self.status = "completed"
+        self.phase = None
+        self.result.update(result)
+        self.finished_at = datetime.utcnow()
+
+    def fail(self, message: str):
+        self.status = "failed"
+        self.result["detail"] = message
+        self.finished_at = datetime.utcnow()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "phase": self.phase,
+            "total": self.total,
+            "processed": self.processed,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "result": self.result,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class JobRegistry:
+    """
+    In-process registry of recent jobs, oldest dropped first.
+
+    Jobs live in the worker that runs them, so status polling assumes a
+    single worker (or sticky routing), the same as the in-memory cache.
+    """
+
+    def __init__(self, max_jobs: int = 200):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    def create(self, kind: str, started_by: Optional[str] = None) -> Job:
+        job = Job(kind, started_by)
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+
+jobs = JobRegistry()
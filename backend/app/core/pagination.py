@@ -0,0 +1,23 @@
+import base64
+from typing import Any, List
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque keyset cursor built from the sort key of the last row on a page."""
+    raw = "|".join(str(value) for value in values)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, parts: int) -> List[str]:
+    """
+    Split a cursor produced by encode_cursor back into its values.
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    if len(values) != parts:
+        raise ValueError("Invalid cursor")
+    return values
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import Optional, Any
+from typing import Optional, Any, List
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 from .config import settings
@@ -11,6 +11,11 @@ def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash a batch of passwords; runs in a worker process for bulk imports."""
+    return [pwd_context.hash(password) for password in passwords]
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -1,12 +1,26 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.router import api_router
+from app.services.attendance_checkin_service import start_checkin_buffer, stop_checkin_buffer
+from app.services.user_import_service import shutdown_password_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_checkin_buffer()
+    yield
+    await stop_checkin_buffer()
+    shutdown_password_pool()
+
 
 app = FastAPI(
     title="UniPortal API",
     description="University Management System API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS Configuration
@@ -0,0 +1,155 @@
+"""
+Maintenance commands.
+
+Usage:
+    python -m app.manage rebuild-branch-performance
+    python -m app.manage rebuild-counters
+    python -m app.manage rebuild-attendance-rollup
+    python -m app.manage verify-attendance-rollup
+    python -m app.manage create-attendance-partitions [--months-ahead 3]
+    python -m app.manage detach-attendance-partitions --before 2024-01-01
+    python -m app.manage convert-attendance-to-bitmap
+    python -m app.manage prune-attendance-sync-keys [--older-than-days 90]
+    python -m app.manage rebuild-transcripts
+"""
+import argparse
+import asyncio
+import sys
+from datetime import date
+
+from app.core.database import AsyncSessionLocal
+import app.models
+
+
+async def rebuild_branch_performance(args):
+    from app.repository.branch_performance import BranchPerformanceRepository
+    async with AsyncSessionLocal() as session:
+        count = await BranchPerformanceRepository(session).rebuild()
+    print(f"Branch performance rollup rebuilt for {count} branches")
+
+
+async def rebuild_counters(args):
+    from app.repository.entity_counter import EntityCounterRepository
+    async with AsyncSessionLocal() as session:
+        counts = await EntityCounterRepository(session).rebuild()
+    for key, value in counts.items():
+        print(f"{key}: {value}")
+
+
+async def rebuild_attendance_rollup(args):
+    from app.repository.attendance_rollup import AttendanceRollupRepository
+    async with AsyncSessionLocal() as session:
+        count = await AttendanceRollupRepository(session).rebuild()
+    print(f"Attendance rollups rebuilt with {count} student rows")
+
+
+async def verify_attendance_rollup(args):
+    from app.repository.attendance_rollup import AttendanceRollupRepository
+    async with AsyncSessionLocal() as session:
+        repo = AttendanceRollupRepository(session)
+        drift = await repo.verify()
+        daily_drift = await repo.verify_daily()
+    for row in drift:
+        print(
+            f"student={row['student_id']} subject={row['subject_id']} section={row['section_id']} "
+            f"expected={row['expected_present']}/{row['expected_total']} "
+            f"rollup={row['rollup_present']}/{row['rollup_total']}"
+        )
+    for row in daily_drift:
+        print(
+            f"section={row['section_id']} subject={row['subject_id']} date={row['attendance_date']} "
+            f"expected={row['expected_present']}/{row['expected_total']} "
+            f"rollup={row['rollup_present']}/{row['rollup_total']}"
+        )
+    if drift or daily_drift:
+        print(
+            f"{len(drift)} attendance rollup rows and {len(daily_drift)} daily rollup rows out of date; "
+            "run rebuild-attendance-rollup"
+        )
+        sys.exit(1)
+    print("Attendance rollups match attendance")
+
+
+async def create_attendance_partitions(args):
+    from app.repository.attendance_partition import AttendancePartitionRepository
+    async with AsyncSessionLocal() as session:
+        created = await AttendancePartitionRepository(session).ensure_months(args.months_ahead)
+    for name in created:
+        print(f"Created {name}")
+    print(f"{len(created)} attendance partitions created")
+
+
+async def detach_attendance_partitions(args):
+    from app.repository.attendance_partition import AttendancePartitionRepository
+    async with AsyncSessionLocal() as session:
+        detached = await AttendancePartitionRepository(session).detach_before(args.before)
+    for name in detached:
+        print(f"Detached {name}")
+    print(f"{len(detached)} attendance partitions detached")
+
+
+async def convert_attendance_to_bitmap(args):
+    from app.repository.attendance_bitmap import AttendanceBitmapRepository
+    async with AsyncSessionLocal() as source, AsyncSessionLocal() as target:
+        count = await AttendanceBitmapRepository(target).import_rows(source)
+    print(f"Wrote {count} attendance sheets; set ATTENDANCE_STORAGE=bitmap to serve from them")
+
+
+async def prune_attendance_sync_keys(args):
+    from app.repository.attendance_sync import AttendanceSyncRepository
+    async with AsyncSessionLocal() as db:
+        count = await AttendanceSyncRepository(db).prune(args.older_than_days)
+    print(f"Removed {count} attendance sync keys older than {args.older_than_days} days")
+
+
+async def rebuild_transcripts(args):
+    from app.repository.transcript import TranscriptRepository
+    async with AsyncSessionLocal() as db:
+        count = await TranscriptRepository(db).rebuild()
+    print(f"Transcripts rebuilt with {count} entries")
+
+
+COMMANDS = {
+    "rebuild-branch-performance": rebuild_branch_performance,
+    "rebuild-counters": rebuild_counters,
+    "rebuild-attendance-rollup": rebuild_attendance_rollup,
+    "verify-attendance-rollup": verify_attendance_rollup,
+    "create-attendance-partitions": create_attendance_partitions,
+    "detach-attendance-partitions": detach_attendance_partitions,
+    "convert-attendance-to-bitmap": convert_attendance_to_bitmap,
+    "prune-attendance-sync-keys": prune_attendance_sync_keys,
+    "rebuild-transcripts": rebuild_transcripts,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.manage")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("rebuild-branch-performance", help="Recompute branch_performance_rollup from exam_marks")
+    subparsers.add_parser("rebuild-counters", help="Recompute entity_counters from the source tables")
+    subparsers.add_parser("rebuild-attendance-rollup", help="Recompute attendance_rollup and attendance_daily_rollup from attendance")
+    subparsers.add_parser("verify-attendance-rollup", help="Compare attendance_rollup and attendance_daily_rollup with attendance and report drift")
+    create_partitions = subparsers.add_parser(
+        "create-attendance-partitions", help="Create monthly attendance partitions up to N months ahead"
+    )
+    create_partitions.add_argument("--months-ahead", type=int, default=3)
+    detach_partitions = subparsers.add_parser(
+        "detach-attendance-partitions",
+        help="Detach monthly attendance partitions that end on or before a date (kept as archive tables)"
+    )
+    detach_partitions.add_argument("--before", type=date.fromisoformat, required=True)
+    subparsers.add_parser("convert-attendance-to-bitmap", help="Copy attendance rows into bitmap sheets")
+    prune_sync_keys = subparsers.add_parser(
+        "prune-attendance-sync-keys", help="Delete attendance sync idempotency keys older than N days"
+    )
+    prune_sync_keys.add_argument("--older-than-days", type=int, default=90)
+    subparsers.add_parser(
+        "rebuild-transcripts", help="Recompute transcript_entries from approved exam marks and GRADE_BOUNDARIES"
+    )
+
+    args = parser.parse_args()
+    asyncio.run(COMMANDS[args.command](args))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,4 +13,10 @@ from .attendance import Attendance, AttendanceStatus
 from .student_elective import StudentElective
 from .user import User, Role
 from .announcement import Announcement
-
+from .branch_performance_rollup import BranchPerformanceRollup
+from .entity_counter import EntityCounter
+from .attendance_rollup import AttendanceRollup, AttendanceDailyRollup
+from .attendance_sheet import AttendanceRoster, AttendanceSheet, AttendanceSheetRemark
+from .attendance_sync import AttendanceSyncKey
+from .transcript_entry import TranscriptEntry
+from .attendance_archive import AttendanceArchive, AttendanceArchivedRollup
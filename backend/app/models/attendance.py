@@ -1,6 +1,6 @@
 from datetime import datetime, date
 from enum import Enum as PyEnum
-from sqlalchemy import Column, String, DateTime, Date, ForeignKey, Enum
+from sqlalchemy import Column, String, DateTime, Date, ForeignKey, Enum, UniqueConstraint, Index, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -14,12 +14,28 @@ class AttendanceStatus(str, PyEnum):
 
 class Attendance(Base):
     __tablename__ = "attendance"
+    __table_args__ = (
+        UniqueConstraint(
+            "student_id", "subject_id", "section_id", "attendance_date",
+            name="uq_attendance_student_subject_section_date"
+        ),
+        # Sheet lookups and per-date history for a section's subject
+        Index(
+            "ix_attendance_section_subject_date", "section_id", "subject_id", "attendance_date",
+            postgresql_include=["student_id", "status"]
+        ),
+        # A student's log, newest first
+        Index("ix_attendance_student_date", "student_id", "attendance_date"),
+        # Monthly range partitions, maintained by `python -m app.manage create-attendance-partitions`
+        {"postgresql_partition_by": "RANGE (attendance_date)"},
+    )
     
+    # The partition key has to be part of the primary key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     student_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
     section_id = Column(UUID(as_uuid=True), ForeignKey("sections.id"), nullable=False, index=True)
     subject_id = Column(UUID(as_uuid=True), ForeignKey("subjects.id"), nullable=False)
-    attendance_date = Column(Date, nullable=False, index=True)
+    attendance_date = Column(Date, primary_key=True, nullable=False, index=True)
     status = Column(Enum(AttendanceStatus), nullable=False)
     remarks = Column(String(255), nullable=True)
     marked_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
@@ -29,3 +45,11 @@ class Attendance(Base):
     section = relationship("Section", back_populates="attendance_records")
     subject = relationship("Subject", back_populates="attendance_records")
     marked_by_user = relationship("User", back_populates="marked_attendance", foreign_keys=[marked_by])
+
+
+# Tables created with create_all need somewhere to put rows before monthly partitions exist
+event.listen(
+    Attendance.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS attendance_default PARTITION OF attendance DEFAULT")
+)
@@ -0,0 +1,36 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, Date, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+
+class AttendanceArchive(Base):
+    """
+    A monthly attendance partition detached for archiving.
+
+    Attendance before the latest ends_on is no longer in the attendance table
+    and can no longer be written.
+    """
+    __tablename__ = "attendance_archives"
+
+    partition_name = Column(String(63), primary_key=True)
+    starts_on = Column(Date, nullable=False)
+    ends_on = Column(Date, nullable=False)
+    detached_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class AttendanceArchivedRollup(Base):
+    """
+    Attendance totals per student, subject and section taken out of the
+    attendance table by detached partitions.
+
+    attendance_rollup keeps counting them, so verify and rebuild add these
+    to what is still in attendance.
+    """
+    __tablename__ = "attendance_archived_rollup"
+
+    student_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    subject_id = Column(UUID(as_uuid=True), ForeignKey("subjects.id"), primary_key=True)
+    section_id = Column(UUID(as_uuid=True), ForeignKey("sections.id"), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    present = Column(Integer, nullable=False, default=0)
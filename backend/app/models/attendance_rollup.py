@@ -0,0 +1,43 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+
+class AttendanceRollup(Base):
+    """
+    Running attendance totals per student, subject and section.
+
+    Maintained by AttendanceRepository in the same transaction as the
+    attendance rows it summarises, so readers never aggregate raw attendance.
+    """
+    __tablename__ = "attendance_rollup"
+    __table_args__ = (
+        Index("ix_attendance_rollup_section_subject", "section_id", "subject_id"),
+    )
+
+    student_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    subject_id = Column(UUID(as_uuid=True), ForeignKey("subjects.id"), primary_key=True)
+    section_id = Column(UUID(as_uuid=True), ForeignKey("sections.id"), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    present = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class AttendanceDailyRollup(Base):
+    """
+    Totals per class session (section, subject, date), for bucketed trend charts.
+
+    Maintained alongside AttendanceRollup by AttendanceRepository.
+    """
+    __tablename__ = "attendance_daily_rollup"
+    __table_args__ = (
+        Index("ix_attendance_daily_rollup_date", "attendance_date"),
+    )
+
+    section_id = Column(UUID(as_uuid=True), ForeignKey("sections.id"), primary_key=True)
+    subject_id = Column(UUID(as_uuid=True), ForeignKey("subjects.id"), primary_key=True)
+    attendance_date = Column(Date, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    present = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
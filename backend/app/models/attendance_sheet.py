@@ -0,0 +1,55 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, LargeBinary, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from app.core.database import Base
+
+
+class AttendanceRoster(Base):
+    """
+    Stable bit position of each student within a section's attendance bitmaps.
+
+    Positions are only ever appended, so existing sheets stay aligned when
+    students join or leave the section.
+    """
+    __tablename__ = "attendance_roster"
+    __table_args__ = (
+        UniqueConstraint("section_id", "position", name="uq_attendance_roster_section_position"),
+    )
+
+    section_id = Column(UUID(as_uuid=True), ForeignKey("sections.id"), primary_key=True)
+    student_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    position = Column(Integer, nullable=False)
+
+
+class AttendanceSheet(Base):
+    """
+    One class session in bitmap storage (ATTENDANCE_STORAGE=bitmap).
+
+    Bit n of `marked` is set when the student at roster position n was marked,
+    and bit n of `present` when they were present (bytea bit order, as read by
+    PostgreSQL's get_bit).
+    """
+    __tablename__ = "attendance_sheets"
+    __table_args__ = (
+        UniqueConstraint("section_id", "subject_id", "attendance_date", name="uq_attendance_sheet_section_subject_date"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    section_id = Column(UUID(as_uuid=True), ForeignKey("sections.id"), nullable=False)
+    subject_id = Column(UUID(as_uuid=True), ForeignKey("subjects.id"), nullable=False)
+    attendance_date = Column(Date, nullable=False, index=True)
+    marked = Column(LargeBinary, nullable=False)
+    present = Column(LargeBinary, nullable=False)
+    marked_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+class AttendanceSheetRemark(Base):
+    """Remarks for the few students on a sheet that have one."""
+    __tablename__ = "attendance_sheet_remarks"
+
+    sheet_id = Column(UUID(as_uuid=True), ForeignKey("attendance_sheets.id", ondelete="CASCADE"), primary_key=True)
+    student_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    remarks = Column(String(255), nullable=False)
@@ -0,0 +1,26 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, Date, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+
+class AttendanceSyncKey(Base):
+    """
+    Idempotency keys of attendance sheets submitted through /attendance/sync.
+
+    A key is recorded in the same transaction as its sheet, so a replayed
+    sheet is answered from here instead of being written again.
+    """
+    __tablename__ = "attendance_sync_keys"
+    __table_args__ = (
+        Index("ix_attendance_sync_keys_created_at", "created_at"),
+    )
+
+    submitted_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    key = Column(String(100), primary_key=True)
+    section_id = Column(UUID(as_uuid=True), ForeignKey("sections.id"), nullable=False)
+    subject_id = Column(UUID(as_uuid=True), ForeignKey("subjects.id"), nullable=False)
+    attendance_date = Column(Date, nullable=False)
+    created = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
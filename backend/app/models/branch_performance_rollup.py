@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+
+class BranchPerformanceRollup(Base):
+    """
+    Running totals of exam percentages per branch.
+
+    Kept up to date by ExamMarksRepository so the admin performance chart
+    reads one row per branch instead of aggregating exam_marks.
+    Rejected marks are not counted.
+    """
+    __tablename__ = "branch_performance_rollup"
+
+    branch_id = Column(UUID(as_uuid=True), ForeignKey("branches.id", ondelete="CASCADE"), primary_key=True)
+    pct_sum = Column(Float, nullable=False, default=0)
+    mark_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    branch = relationship("Branch")
+
+    @property
+    def average(self) -> float:
+        return self.pct_sum / self.mark_count if self.mark_count else 0
@@ -0,0 +1,17 @@
+from datetime import datetime
+from sqlalchemy import Column, String, BigInteger, DateTime
+from app.core.database import Base
+
+
+class EntityCounter(Base):
+    """
+    Pre-computed row counts for the admin dashboard (e.g. "students", "pending_leaves").
+
+    Maintained by the repositories on create/deactivate/delete when
+    ENTITY_COUNTERS_ENABLED is set.
+    """
+    __tablename__ = "entity_counters"
+
+    key = Column(String(50), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
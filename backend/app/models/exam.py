@@ -1,5 +1,5 @@
 from datetime import datetime, date
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Date, ForeignKey
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -8,6 +8,9 @@ from app.core.database import Base
 
 class Exam(Base):
     __tablename__ = "exams"
+    __table_args__ = (
+        Index("ix_exams_section_subject_date", "section_id", "subject_id", "exam_date"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     exam_name = Column(String(100), nullable=False)
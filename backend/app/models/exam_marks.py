@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum as PyEnum
-from sqlalchemy import Column, Integer, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, Boolean, DateTime, ForeignKey, Enum, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -15,6 +15,14 @@ class MarkStatus(str, PyEnum):
 
 class ExamMarks(Base):
     __tablename__ = "exam_marks"
+    __table_args__ = (
+        # One mark per student per exam; also covers the exam/student lookups
+        UniqueConstraint(
+            "exam_id", "student_id",
+            name="uq_exam_marks_exam_student",
+            postgresql_include=["status", "marks_obtained"]
+        ),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     exam_id = Column(UUID(as_uuid=True), ForeignKey("exams.id"), nullable=False, index=True)
@@ -1,7 +1,7 @@
 from calendar import SATURDAY
 from datetime import datetime, time
 from enum import Enum as PyEnum
-from sqlalchemy import Column, String, Integer, DateTime, Time, ForeignKey, Enum
+from sqlalchemy import Column, String, Integer, DateTime, Time, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -19,6 +19,10 @@ class DayOfWeek(str, PyEnum):
 
 class Timetable(Base):
     __tablename__ = "timetable"
+    __table_args__ = (
+        Index("ix_timetable_teacher_day_period", "teacher_id", "day", "period"),
+        Index("ix_timetable_section_day_period", "section_id", "day", "period"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     section_id = Column(UUID(as_uuid=True), ForeignKey("sections.id"), nullable=False, index=True)
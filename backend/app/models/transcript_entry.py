@@ -0,0 +1,39 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, Float, Boolean, Date, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+
+class TranscriptEntry(Base):
+    """
+    A student's approved result for one exam, with everything the result
+    pages display (exam, subject, semester, percentage, grade) copied in.
+
+    Written when marks are approved and removed when they stop being
+    approved, so student result pages read one table instead of joining
+    marks, exams, subjects, sections and semesters.
+    """
+    __tablename__ = "transcript_entries"
+    __table_args__ = (
+        # A student's history, newest semester and exam first
+        Index("ix_transcript_entries_student_semester_date", "student_id", "semester_number", "exam_date"),
+    )
+
+    student_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    exam_id = Column(UUID(as_uuid=True), ForeignKey("exams.id", ondelete="CASCADE"), primary_key=True)
+    mark_id = Column(UUID(as_uuid=True), ForeignKey("exam_marks.id", ondelete="CASCADE"), nullable=False, unique=True)
+    exam_name = Column(String(100), nullable=False)
+    exam_date = Column(Date, nullable=False)
+    subject_id = Column(UUID(as_uuid=True), nullable=False)
+    subject_name = Column(String(100), nullable=False)
+    subject_code = Column(String(20), nullable=False)
+    section_id = Column(UUID(as_uuid=True), nullable=False)
+    semester_id = Column(UUID(as_uuid=True), nullable=False)
+    semester_number = Column(Integer, nullable=False)
+    marks_obtained = Column(Integer, nullable=True)
+    total_marks = Column(Integer, nullable=False)
+    is_absent = Column(Boolean, nullable=False, default=False)
+    percentage = Column(Float, nullable=False)
+    grade = Column(String(5), nullable=False)
+    grade_point = Column(Float, nullable=False)
+    published_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,31 +1,45 @@
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 from uuid import UUID
 from datetime import date
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, tuple_, cast, Date, DateTime
+from sqlalchemy.dialects.postgresql import insert
 from .base import BaseRepository
+from .attendance_rollup import AttendanceRollupRepository, AttendanceRollupDelta
+from .attendance_bitmap import AttendanceBitmapRepository
+from .attendance_partition import AttendancePartitionRepository
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import dashboard_cache, invalidate_students, tag
+from app.core.config import settings
+from app.core.pagination import encode_cursor, decode_cursor
 from app.models.attendance import Attendance, AttendanceStatus
+from app.models.attendance_rollup import AttendanceRollup, AttendanceDailyRollup
+from app.models.attendance_sheet import AttendanceSheet
+from app.models.section import Section
 from app.models.subject import Subject
 
+ANALYTICS_BUCKETS = ("week", "month", "weekday")
+WEEKDAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
 class AttendanceRepository(BaseRepository):
     def __init__(self, db: AsyncSession):
         super().__init__(Attendance, db)
+        self.bitmap = settings.ATTENDANCE_STORAGE == "bitmap"
+        self._bitmap = AttendanceBitmapRepository(db)
 
     async def get_student_summary(self, student_id: UUID) -> List[dict]:
         """
         Returns attendance percentage per subject for a specific student.
         """
-        # Get all subjects for the student (via attendance records or enrollment, but here we use records)
         stmt = (
             select(
                 Subject.id,
                 Subject.name,
                 Subject.code,
-                func.count(Attendance.id).label("total_classes"),
-                func.count(Attendance.id).filter(Attendance.status == AttendanceStatus.PRESENT).label("present_count")
+                func.sum(AttendanceRollup.total).label("total_classes"),
+                func.sum(AttendanceRollup.present).label("present_count")
             )
-            .join(Attendance, Subject.id == Attendance.subject_id)
-            .where(Attendance.student_id == student_id)
+            .join(AttendanceRollup, Subject.id == AttendanceRollup.subject_id)
+            .where(AttendanceRollup.student_id == student_id)
             .group_by(Subject.id, Subject.name, Subject.code)
         )
         
@@ -45,65 +59,104 @@ class AttendanceRepository(BaseRepository):
             })
         return summary
 
-    async def get_student_records(self, student_id: UUID, start_date: Optional[date] = None, end_date: Optional[date] = None, status: Optional[str] = None, **kwargs) -> List[dict]:
+    def _student_records(
+        self, student_id: UUID, start_date: Optional[date] = None,
+        end_date: Optional[date] = None, status: Optional[str] = None
+    ):
         """
-        Returns detailed attendance logs for a student with subject names.
+        A student's log as a subquery (id, attendance_date, subject_id, section_id,
+        subject_name, is_present, remarks) from the configured storage, plus the filters shared by
+        the log page and its count.
         """
-        stmt = (
-            select(Attendance, Subject.name)
-            .join(Subject, Attendance.subject_id == Subject.id)
-            .where(Attendance.student_id == student_id)
-        )
+        if self.bitmap:
+            source = self._bitmap.student_records_query(student_id)
+        else:
+            source = (
+                select(
+                    Attendance.id,
+                    Attendance.attendance_date,
+                    Attendance.subject_id,
+                    Attendance.section_id,
+                    Subject.name.label("subject_name"),
+                    (Attendance.status == AttendanceStatus.PRESENT).label("is_present"),
+                    Attendance.remarks
+                )
+                .join(Subject, Attendance.subject_id == Subject.id)
+                .where(Attendance.student_id == student_id)
+            )
+        records = source.subquery()
+
+        filters = []
         if start_date:
-            stmt = stmt.where(Attendance.attendance_date >= start_date)
+            filters.append(records.c.attendance_date >= start_date)
         if end_date:
-            stmt = stmt.where(Attendance.attendance_date <= end_date)
+            filters.append(records.c.attendance_date <= end_date)
         if status and status.lower() != 'all':
-            # Assuming status is passed as a string matching the enum value (e.g. 'present', 'absent')
+            # Status is passed as a string matching the enum value (e.g. 'present', 'absent')
             try:
-                status_enum = AttendanceStatus(status.lower())
-                stmt = stmt.where(Attendance.status == status_enum)
+                filters.append(records.c.is_present == (AttendanceStatus(status.lower()) == AttendanceStatus.PRESENT))
             except ValueError:
                 pass # Ignore invalid status
+        return records, filters
+
+    async def get_student_records(
+        self, student_id: UUID, start_date: Optional[date] = None, end_date: Optional[date] = None,
+        status: Optional[str] = None, cursor: Optional[str] = None, skip: int = 0, limit: int = 20
+    ) -> Tuple[List[dict], Optional[str]]:
+        """
+        Returns detailed attendance logs for a student with subject names, newest first,
+        and the cursor for the next page (None on the last page).
+
+        With a cursor the page starts right after the row it points at (keyset on
+        (attendance_date, id)); otherwise `skip` rows are skipped.
+        Raises ValueError for a malformed cursor.
+        """
+        records, filters = self._student_records(student_id, start_date, end_date, status)
+        stmt = (
+            select(records)
+            .where(*filters)
+            .order_by(records.c.attendance_date.desc(), records.c.id.desc())
+        )
+        if cursor:
+            cursor_date, cursor_id = decode_cursor(cursor, 2)
+            after = (date.fromisoformat(cursor_date), UUID(cursor_id))
+            stmt = stmt.where(tuple_(records.c.attendance_date, records.c.id) < tuple_(*after))
+        elif skip:
+            stmt = stmt.offset(skip)
+        stmt = stmt.limit(limit + 1)
         
-        stmt = stmt.order_by(Attendance.attendance_date.desc())
-        
-        # Add pagination
-        skip = kwargs.get('skip', 0)
-        limit = kwargs.get('limit', 20)
-        stmt = stmt.offset(skip).limit(limit)
-        
-        result = await self.db.execute(stmt)
+        result = (await self.db.execute(stmt)).all()
+        has_more = len(result) > limit
+        result = result[:limit]
         
-        records = []
-        for att, subj_name in result:
-            records.append({
-                "id": str(att.id),
-                "subject_id": str(att.subject_id),
-                "subject_name": subj_name,
-                "date": att.attendance_date.isoformat(),
-                "status": att.status.value,
-                "remarks": att.remarks
+        items = []
+        for row in result:
+            items.append({
+                "id": str(row.id),
+                "subject_id": str(row.subject_id),
+                "subject_name": row.subject_name,
+                "date": row.attendance_date.isoformat(),
+                "status": (AttendanceStatus.PRESENT if row.is_present else AttendanceStatus.ABSENT).value,
+                "remarks": row.remarks
             })
-        return records
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_cursor(result[-1].attendance_date.isoformat(), result[-1].id)
+        return items, next_cursor
 
     async def get_student_records_count(self, student_id: UUID, start_date: Optional[date] = None, end_date: Optional[date] = None, status: Optional[str] = None) -> int:
         """
         Returns total count of attendance records for a student.
+        Cached until the student's attendance changes.
         """
-        stmt = select(func.count(Attendance.id)).where(Attendance.student_id == student_id)
-        if start_date:
-            stmt = stmt.where(Attendance.attendance_date >= start_date)
-        if end_date:
-            stmt = stmt.where(Attendance.attendance_date <= end_date)
-        if status and status.lower() != 'all':
-             try:
-                status_enum = AttendanceStatus(status.lower())
-                stmt = stmt.where(Attendance.status == status_enum)
-             except ValueError:
-                pass
-
-        return await self.db.scalar(stmt) or 0
+        cache_key = ("student_records_count", str(student_id), str(start_date), str(end_date), str(status))
+        total = await dashboard_cache.get(cache_key)
+        if total is None:
+            generation = await dashboard_cache.generation()
+            records, filters = self._student_records(student_id, start_date, end_date, status)
+            total = await self.db.scalar(select(func.count()).select_from(records).where(*filters)) or 0
+            await dashboard_cache.set(cache_key, total, tags=[tag("student", student_id)], generation=generation)
+        return total
 
     async def get_students_for_section(self, section_id: UUID) -> List[dict]:
         """Get all students in a section for attendance marking."""
@@ -130,6 +183,8 @@ class AttendanceRepository(BaseRepository):
         self, section_id: UUID, subject_id: UUID, attendance_date: date
     ) -> List[dict]:
         """Get existing attendance records for a specific date."""
+        if self.bitmap:
+            return await self._bitmap.get_sheet(section_id, subject_id, attendance_date)
         from app.models.user import User
         stmt = (
             select(Attendance, User.first_name, User.last_name, User.roll_no)
@@ -156,70 +211,119 @@ class AttendanceRepository(BaseRepository):
     async def bulk_mark_attendance(
         self, section_id: UUID, subject_id: UUID, attendance_date: date,
         entries: List[dict], marked_by: UUID
-    ) -> int:
+    ) -> Dict[str, int]:
         """
-        Mark attendance for multiple students at once.
-        Returns the number of records created/updated.
+        Mark attendance for multiple students at once in the configured storage.
+        Returns the number of records created and updated.
         """
-        count = 0
+        # One row per student; a later entry for the same student wins
+        rows = {}
         for entry in entries:
-            # Check if record already exists
-            existing = await self.db.execute(
-                select(Attendance).where(
-                    and_(
-                        Attendance.student_id == entry["student_id"],
-                        Attendance.section_id == section_id,
-                        Attendance.subject_id == subject_id,
-                        Attendance.attendance_date == attendance_date
-                    )
-                )
+            student_id = UUID(str(entry["student_id"]))
+            rows[student_id] = {
+                "student_id": student_id,
+                "section_id": section_id,
+                "subject_id": subject_id,
+                "attendance_date": attendance_date,
+                "status": AttendanceStatus(entry["status"]),
+                "remarks": entry.get("remarks"),
+                "marked_by": marked_by,
+            }
+        if not rows:
+            return {"created": 0, "updated": 0}
+
+        # Detached months are archived; writing there would count the session in the rollups twice
+        await AttendancePartitionRepository(self.db).ensure_writable([attendance_date])
+
+        # Serialise concurrent submissions of the same sheet so each status change reaches the rollup once
+        sheet_key = f"attendance:{section_id}:{subject_id}:{attendance_date.isoformat()}"
+        await self.db.execute(select(func.pg_advisory_xact_lock(func.hashtextextended(sheet_key, 0))))
+
+        if self.bitmap:
+            created, updated, delta = await self._bitmap.write_sheet(
+                section_id, subject_id, attendance_date, rows, marked_by
             )
-            existing_record = existing.scalar_one_or_none()
-            
-            if existing_record:
-                # Update existing record
-                existing_record.status = AttendanceStatus(entry["status"])
-                existing_record.remarks = entry.get("remarks")
-                existing_record.marked_by = marked_by
-            else:
-                # Create new record
-                new_record = Attendance(
-                    student_id=entry["student_id"],
-                    section_id=section_id,
-                    subject_id=subject_id,
-                    attendance_date=attendance_date,
-                    status=AttendanceStatus(entry["status"]),
-                    remarks=entry.get("remarks"),
-                    marked_by=marked_by
-                )
-                self.db.add(new_record)
-            count += 1
-        
+        else:
+            created, updated, delta = await self._write_rows(section_id, subject_id, attendance_date, rows)
+
+        rollup_repo = AttendanceRollupRepository(self.db)
+        await rollup_repo.apply(delta)
+        await rollup_repo.apply_daily(section_id, subject_id, attendance_date, delta)
         await self.db.commit()
-        return count
+        await invalidate_students(rows)
+        return {"created": created, "updated": updated}
+
+    async def _write_rows(
+        self, section_id: UUID, subject_id: UUID, attendance_date: date, rows: Dict[UUID, dict]
+    ) -> Tuple[int, int, AttendanceRollupDelta]:
+        """Upsert one row per student. Returns created/updated counts and the rollup changes."""
+        previous = (
+            select(Attendance.student_id, Attendance.status)
+            .where(
+                Attendance.section_id == section_id,
+                Attendance.subject_id == subject_id,
+                Attendance.attendance_date == attendance_date,
+                Attendance.student_id.in_(list(rows))
+            )
+            .cte("previous")
+        )
+        upsert = insert(Attendance).values(list(rows.values()))
+        upsert = upsert.on_conflict_do_update(
+            constraint="uq_attendance_student_subject_section_date",
+            set_={
+                "status": upsert.excluded.status,
+                "remarks": upsert.excluded.remarks,
+                "marked_by": upsert.excluded.marked_by,
+            },
+        )
+        written = upsert.returning(Attendance.student_id, Attendance.status).cte("written")
+        result = await self.db.execute(
+            select(written.c.student_id, written.c.status, previous.c.status.label("previous_status"))
+            .select_from(written)
+            .outerjoin(previous, written.c.student_id == previous.c.student_id)
+        )
+
+        created = updated = 0
+        delta = AttendanceRollupDelta()
+        for row in result:
+            is_present = int(row.status == AttendanceStatus.PRESENT)
+            if row.previous_status is None:
+                created += 1
+                delta.add(row.student_id, subject_id, section_id, total=1, present=is_present)
+            else:
+                updated += 1
+                was_present = int(row.previous_status == AttendanceStatus.PRESENT)
+                delta.add(row.student_id, subject_id, section_id, present=is_present - was_present)
+        return created, updated, delta
 
     async def get_section_attendance_history(
         self, section_id: UUID, subject_id: UUID, 
         start_date: Optional[date] = None, end_date: Optional[date] = None
     ) -> List[dict]:
         """Get attendance history for a section/subject with date range filter."""
-        from app.models.user import User
-        stmt = (
-            select(
-                Attendance.attendance_date,
-                func.count(Attendance.id).label("total"),
-                func.count(Attendance.id).filter(Attendance.status == AttendanceStatus.PRESENT).label("present"),
-                func.count(Attendance.id).filter(Attendance.status == AttendanceStatus.ABSENT).label("absent")
+        if self.bitmap:
+            # One bitmap per date already, so the counts are popcounts rather than aggregates
+            stmt = self._bitmap.history_query(section_id, subject_id)
+            date_col = AttendanceSheet.attendance_date
+        else:
+            stmt = (
+                select(
+                    Attendance.attendance_date,
+                    func.count(Attendance.id).label("total"),
+                    func.count(Attendance.id).filter(Attendance.status == AttendanceStatus.PRESENT).label("present"),
+                    func.count(Attendance.id).filter(Attendance.status == AttendanceStatus.ABSENT).label("absent")
+                )
+                .where(Attendance.section_id == section_id)
+                .where(Attendance.subject_id == subject_id)
+                .group_by(Attendance.attendance_date)
             )
-            .where(Attendance.section_id == section_id)
-            .where(Attendance.subject_id == subject_id)
-        )
+            date_col = Attendance.attendance_date
         if start_date:
-            stmt = stmt.where(Attendance.attendance_date >= start_date)
+            stmt = stmt.where(date_col >= start_date)
         if end_date:
-            stmt = stmt.where(Attendance.attendance_date <= end_date)
+            stmt = stmt.where(date_col <= end_date)
         
-        stmt = stmt.group_by(Attendance.attendance_date).order_by(Attendance.attendance_date.desc())
+        stmt = stmt.order_by(date_col.desc())
         result = await self.db.execute(stmt)
         history = []
         for row in result:
@@ -230,3 +334,70 @@ class AttendanceRepository(BaseRepository):
                 "absent": row.absent
             })
         return history
+
+    async def get_bucketed_stats(
+        self, bucket: str, section_id: Optional[UUID] = None, subject_id: Optional[UUID] = None,
+        student_id: Optional[UUID] = None, branch_id: Optional[UUID] = None,
+        start_date: Optional[date] = None, end_date: Optional[date] = None
+    ) -> List[dict]:
+        """
+        Attendance totals per week, month or weekday for any combination of
+        section, subject, student and branch.
+
+        Section, subject and branch scopes read the daily rollup; a student
+        scope reads that student's own records, narrowed by the other scopes.
+        """
+        if student_id:
+            records, filters = self._student_records(student_id, start_date, end_date)
+            if subject_id:
+                filters.append(records.c.subject_id == subject_id)
+            if section_id:
+                filters.append(records.c.section_id == section_id)
+            date_col = records.c.attendance_date
+            total = func.count()
+            present = func.count().filter(records.c.is_present)
+            stmt = select().select_from(records).where(*filters)
+            if branch_id:
+                stmt = stmt.join(Section, records.c.section_id == Section.id).where(Section.branch_id == branch_id)
+        else:
+            date_col = AttendanceDailyRollup.attendance_date
+            total = func.sum(AttendanceDailyRollup.total)
+            present = func.sum(AttendanceDailyRollup.present)
+            stmt = select().select_from(AttendanceDailyRollup)
+            if branch_id:
+                stmt = stmt.join(Section, AttendanceDailyRollup.section_id == Section.id).where(Section.branch_id == branch_id)
+            if section_id:
+                stmt = stmt.where(AttendanceDailyRollup.section_id == section_id)
+            if subject_id:
+                stmt = stmt.where(AttendanceDailyRollup.subject_id == subject_id)
+            if start_date:
+                stmt = stmt.where(date_col >= start_date)
+            if end_date:
+                stmt = stmt.where(date_col <= end_date)
+
+        if bucket == "weekday":
+            key = func.extract("isodow", date_col)
+        else:
+            # Truncate as a timestamp, then back to a date so the session time zone cannot shift it
+            key = cast(func.date_trunc(bucket, cast(date_col, DateTime)), Date)
+        stmt = stmt.add_columns(key.label("bucket"), total.label("total"), present.label("present")).group_by(key).order_by(key)
+
+        result = await self.db.execute(stmt)
+        stats = []
+        for row in result:
+            if bucket == "weekday":
+                label = WEEKDAY_NAMES[int(row.bucket) - 1]
+            elif bucket == "month":
+                label = row.bucket.strftime("%Y-%m")
+            else:
+                label = row.bucket.isoformat()
+            total_count = int(row.total or 0)
+            present_count = int(row.present or 0)
+            stats.append({
+                "bucket": label,
+                "total": total_count,
+                "present": present_count,
+                "absent": total_count - present_count,
+                "percentage": round(present_count / total_count * 100, 1) if total_count else 0
+            })
+        return stats
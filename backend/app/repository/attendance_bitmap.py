@@ -0,0 +1,320 @@
+import uuid
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+from sqlalchemy import select, delete, func, case, and_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.attendance import Attendance, AttendanceStatus
+from app.models.attendance_sheet import AttendanceRoster, AttendanceSheet, AttendanceSheetRemark
+from app.models.subject import Subject
+from app.models.user import User
+from .attendance_rollup import AttendanceRollupDelta
+
+
+def pack(positions: Iterable[int]) -> bytes:
+    """Bitmap with the given positions set, in the bit order PostgreSQL's get_bit uses for bytea."""
+    positions = list(positions)
+    bits = bytearray(max(positions) // 8 + 1 if positions else 0)
+    for position in positions:
+        bits[position // 8] |= 1 << (position % 8)
+    return bytes(bits)
+
+
+def unpack(bits: Optional[bytes]) -> Set[int]:
+    if not bits:
+        return set()
+    return {
+        index * 8 + offset
+        for index, byte in enumerate(bits) if byte
+        for offset in range(8) if byte >> offset & 1
+    }
+
+
+def bit_at(bits, position):
+    """SQL bit lookup that reads 0 past the end of a bitmap written before the roster grew."""
+    return case((func.length(bits) * 8 > position, func.get_bit(bits, position)), else_=0)
+
+
+class AttendanceBitmapRepository:
+    """
+    Attendance stored as one bitmap row per class session (ATTENDANCE_STORAGE=bitmap).
+
+    AttendanceRepository delegates here so its callers do not see the difference.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_positions(self, section_id: UUID, student_ids: List[UUID]) -> Dict[UUID, int]:
+        """Roster positions for the students, appending any that are new to the section."""
+        result = await self.db.execute(
+            select(AttendanceRoster.student_id, AttendanceRoster.position)
+            .where(AttendanceRoster.section_id == section_id)
+            .where(AttendanceRoster.student_id.in_(student_ids))
+        )
+        positions = {row.student_id: row.position for row in result}
+        missing = [student_id for student_id in student_ids if student_id not in positions]
+        if missing:
+            # Appends to one section's roster are serialised so positions stay unique
+            await self.db.execute(
+                select(func.pg_advisory_xact_lock(func.hashtextextended(f"attendance_roster:{section_id}", 0)))
+            )
+            next_position = await self.db.scalar(
+                select(func.coalesce(func.max(AttendanceRoster.position) + 1, 0))
+                .where(AttendanceRoster.section_id == section_id)
+            )
+            rows = [
+                {"section_id": section_id, "student_id": student_id, "position": next_position + offset}
+                for offset, student_id in enumerate(missing)
+            ]
+            await self.db.execute(insert(AttendanceRoster).values(rows).on_conflict_do_nothing())
+            # Re-read in case another transaction placed some of them first
+            result = await self.db.execute(
+                select(AttendanceRoster.student_id, AttendanceRoster.position)
+                .where(AttendanceRoster.section_id == section_id)
+                .where(AttendanceRoster.student_id.in_(missing))
+            )
+            positions.update({row.student_id: row.position for row in result})
+        return positions
+
+    async def write_sheet(
+        self, section_id: UUID, subject_id: UUID, attendance_date: date,
+        rows: Dict[UUID, dict], marked_by: UUID, insert_only: bool = False
+    ) -> Tuple[int, int, AttendanceRollupDelta]:
+        """
+        Merge the entries into the session's bitmap row. With insert_only,
+        students already marked keep their mark, remarks and the sheet's marker.
+        Returns created/updated counts and the rollup changes. Does not commit.
+        """
+        positions = await self.get_positions(section_id, list(rows))
+        sheet = (await self.db.execute(
+            select(AttendanceSheet)
+            .where(
+                AttendanceSheet.section_id == section_id,
+                AttendanceSheet.subject_id == subject_id,
+                AttendanceSheet.attendance_date == attendance_date
+            )
+            .with_for_update()
+        )).scalar_one_or_none()
+        if sheet is None:
+            sheet = AttendanceSheet(
+                id=uuid.uuid4(),
+                section_id=section_id,
+                subject_id=subject_id,
+                attendance_date=attendance_date,
+                marked=b"",
+                present=b"",
+                marked_by=marked_by
+            )
+            self.db.add(sheet)
+
+        marked = unpack(sheet.marked)
+        present = unpack(sheet.present)
+        created = updated = 0
+        delta = AttendanceRollupDelta()
+        if insert_only:
+            rows = {student_id: row for student_id, row in rows.items() if positions[student_id] not in marked}
+        for student_id, row in rows.items():
+            position = positions[student_id]
+            is_present = int(row["status"] == AttendanceStatus.PRESENT)
+            if position in marked:
+                updated += 1
+                delta.add(student_id, subject_id, section_id, present=is_present - int(position in present))
+            else:
+                created += 1
+                delta.add(student_id, subject_id, section_id, total=1, present=is_present)
+            marked.add(position)
+            if is_present:
+                present.add(position)
+            else:
+                present.discard(position)
+
+        sheet.marked = pack(marked)
+        sheet.present = pack(present)
+        if not insert_only:
+            sheet.marked_by = marked_by
+        await self.db.flush()
+
+        await self.db.execute(
+            delete(AttendanceSheetRemark)
+            .where(AttendanceSheetRemark.sheet_id == sheet.id)
+            .where(AttendanceSheetRemark.student_id.in_(list(rows)))
+        )
+        remarks = [
+            {"sheet_id": sheet.id, "student_id": student_id, "remarks": row["remarks"]}
+            for student_id, row in rows.items() if row.get("remarks")
+        ]
+        if remarks:
+            await self.db.execute(insert(AttendanceSheetRemark).values(remarks))
+        return created, updated, delta
+
+    async def get_sheet(self, section_id: UUID, subject_id: UUID, attendance_date: date) -> List[dict]:
+        """Marked students of one session, in the shape of AttendanceRepository.get_attendance_for_date."""
+        stmt = (
+            select(
+                AttendanceSheet.id,
+                AttendanceRoster.student_id,
+                User.first_name,
+                User.last_name,
+                User.roll_no,
+                bit_at(AttendanceSheet.present, AttendanceRoster.position).label("is_present"),
+                AttendanceSheetRemark.remarks
+            )
+            .join(AttendanceRoster, AttendanceRoster.section_id == AttendanceSheet.section_id)
+            .join(User, AttendanceRoster.student_id == User.id)
+            .outerjoin(
+                AttendanceSheetRemark,
+                and_(
+                    AttendanceSheetRemark.sheet_id == AttendanceSheet.id,
+                    AttendanceSheetRemark.student_id == AttendanceRoster.student_id
+                )
+            )
+            .where(
+                AttendanceSheet.section_id == section_id,
+                AttendanceSheet.subject_id == subject_id,
+                AttendanceSheet.attendance_date == attendance_date
+            )
+            .where(bit_at(AttendanceSheet.marked, AttendanceRoster.position) == 1)
+            .order_by(User.roll_no)
+        )
+        result = await self.db.execute(stmt)
+        return [
+            {
+                "id": str(row.id),
+                "student_id": str(row.student_id),
+                "first_name": row.first_name,
+                "last_name": row.last_name,
+                "roll_number": row.roll_no,
+                "status": (AttendanceStatus.PRESENT if row.is_present else AttendanceStatus.ABSENT).value,
+                "remarks": row.remarks
+            }
+            for row in result
+        ]
+
+    def history_query(self, section_id: UUID, subject_id: UUID):
+        """Per-session totals by popcount of the bitmaps."""
+        total = func.bit_count(AttendanceSheet.marked)
+        present = func.bit_count(AttendanceSheet.present)
+        return (
+            select(
+                AttendanceSheet.attendance_date,
+                total.label("total"),
+                present.label("present"),
+                (total - present).label("absent")
+            )
+            .where(AttendanceSheet.section_id == section_id)
+            .where(AttendanceSheet.subject_id == subject_id)
+        )
+
+    def student_records_query(self, student_id: UUID):
+        """A student's sessions with the columns AttendanceRepository pages over."""
+        return (
+            select(
+                AttendanceSheet.id,
+                AttendanceSheet.attendance_date,
+                AttendanceSheet.subject_id,
+                AttendanceSheet.section_id,
+                Subject.name.label("subject_name"),
+                (bit_at(AttendanceSheet.present, AttendanceRoster.position) == 1).label("is_present"),
+                AttendanceSheetRemark.remarks
+            )
+            .join(
+                AttendanceRoster,
+                and_(
+                    AttendanceRoster.section_id == AttendanceSheet.section_id,
+                    AttendanceRoster.student_id == student_id
+                )
+            )
+            .join(Subject, AttendanceSheet.subject_id == Subject.id)
+            .outerjoin(
+                AttendanceSheetRemark,
+                and_(
+                    AttendanceSheetRemark.sheet_id == AttendanceSheet.id,
+                    AttendanceSheetRemark.student_id == student_id
+                )
+            )
+            .where(bit_at(AttendanceSheet.marked, AttendanceRoster.position) == 1)
+        )
+
+    async def import_rows(self, source: AsyncSession, commit_every: int = 200) -> int:
+        """
+        Copy row-per-student attendance into bitmap sheets, reading `source` through a
+        server-side cursor. Safe to re-run: sheets that already exist are merged.
+        Returns the number of sheets written.
+        """
+        stmt = (
+            select(
+                Attendance.section_id,
+                Attendance.subject_id,
+                Attendance.attendance_date,
+                Attendance.student_id,
+                Attendance.status,
+                Attendance.remarks,
+                Attendance.marked_by
+            )
+            .order_by(Attendance.section_id, Attendance.subject_id, Attendance.attendance_date, Attendance.student_id)
+            .execution_options(yield_per=5000)
+        )
+        sheets = 0
+        key = None
+        rows: Dict[UUID, dict] = {}
+        marked_by = None
+        async for row in await source.stream(stmt):
+            row_key = (row.section_id, row.subject_id, row.attendance_date)
+            if key is not None and row_key != key:
+                await self.write_sheet(*key, rows, marked_by)
+                sheets += 1
+                rows = {}
+                if sheets % commit_every == 0:
+                    await self.db.commit()
+            key = row_key
+            rows[row.student_id] = {"status": row.status, "remarks": row.remarks}
+            marked_by = row.marked_by
+        if key is not None:
+            await self.write_sheet(*key, rows, marked_by)
+            sheets += 1
+        await self.db.commit()
+        return sheets
+
+
+def fresh_bitmap_rollup_query():
+    """Rollup rows computed from the bitmaps, matching fresh_rollup_query for row storage."""
+    total = func.sum(bit_at(AttendanceSheet.marked, AttendanceRoster.position))
+    present = func.sum(bit_at(AttendanceSheet.present, AttendanceRoster.position))
+    return (
+        select(
+            AttendanceRoster.student_id,
+            AttendanceSheet.subject_id,
+            AttendanceSheet.section_id,
+            total.label("total"),
+            present.label("present")
+        )
+        .join(AttendanceRoster, AttendanceRoster.section_id == AttendanceSheet.section_id)
+        .group_by(AttendanceRoster.student_id, AttendanceSheet.subject_id, AttendanceSheet.section_id)
+        .having(total > 0)
+    )
+
+
+def bitmap_register_query(section_id: UUID, subject_id: UUID):
+    """Every marked (student, session) of a section's subject, one row each."""
+    return (
+        select(
+            AttendanceRoster.student_id,
+            AttendanceSheet.attendance_date,
+            (bit_at(AttendanceSheet.present, AttendanceRoster.position) == 1).label("is_present"),
+            AttendanceSheetRemark.remarks
+        )
+        .join(AttendanceRoster, AttendanceRoster.section_id == AttendanceSheet.section_id)
+        .outerjoin(
+            AttendanceSheetRemark,
+            and_(
+                AttendanceSheetRemark.sheet_id == AttendanceSheet.id,
+                AttendanceSheetRemark.student_id == AttendanceRoster.student_id
+            )
+        )
+        .where(AttendanceSheet.section_id == section_id)
+        .where(AttendanceSheet.subject_id == subject_id)
+        .where(bit_at(AttendanceSheet.marked, AttendanceRoster.position) == 1)
+    )
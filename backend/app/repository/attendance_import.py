@@ -0,0 +1,249 @@
+from collections import defaultdict
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.attendance import AttendanceStatus
+from .attendance_bitmap import AttendanceBitmapRepository
+from .attendance_partition import AttendancePartitionRepository
+from .attendance_rollup import AttendanceRollupRepository
+
+# (student_id, section_id, subject_id, attendance_date, status, remarks, marked_by)
+ImportRecord = Tuple[UUID, UUID, UUID, date, AttendanceStatus, Optional[str], UUID]
+# (section_id, subject_id, attendance_date) -> created/updated counts
+SessionCounts = Dict[Tuple[UUID, UUID, date], Dict[str, int]]
+
+STAGING_TABLE = "attendance_import_staging"
+STAGING_COLUMNS = ["student_id", "section_id", "subject_id", "attendance_date", "status", "remarks", "marked_by"]
+# Batches at least this large are staged with COPY; smaller ones are sent as arrays in the statement
+COPY_THRESHOLD = 1000
+# Records sent per COPY call; progress is reported after each
+COPY_CHUNK = 50000
+
+# Small batches skip the temporary table
+_UNNEST_SOURCE = """
+SELECT * FROM unnest(
+    CAST(:student_ids AS uuid[]), CAST(:section_ids AS uuid[]), CAST(:subject_ids AS uuid[]),
+    CAST(:dates AS date[]), CAST(:statuses AS text[]), CAST(:remarks AS text[]), CAST(:marked_by AS uuid[])
+) AS s(student_id, section_id, subject_id, attendance_date, status, remarks, marked_by)
+"""
+
+# Existing marks take the staged status, remarks and marker
+_OVERWRITE = """
+    ON CONFLICT ON CONSTRAINT uq_attendance_student_subject_section_date
+    DO UPDATE SET status = excluded.status, remarks = excluded.remarks, marked_by = excluded.marked_by
+"""
+# Existing marks are left as they are (self check-in must not override a teacher's mark)
+_INSERT_ONLY = """
+    ON CONFLICT ON CONSTRAINT uq_attendance_student_subject_section_date DO NOTHING
+"""
+
+# Row storage: upsert the staged rows and fold the status changes into both rollups in one statement
+_MERGE_ROWS = """
+WITH staged AS (
+    {source}
+),
+previous AS (
+    SELECT a.student_id, a.subject_id, a.section_id, a.attendance_date, a.status
+    FROM attendance a
+    JOIN staged s
+      ON a.student_id = s.student_id
+     AND a.subject_id = s.subject_id
+     AND a.section_id = s.section_id
+     AND a.attendance_date = s.attendance_date
+),
+written AS (
+    INSERT INTO attendance (id, student_id, section_id, subject_id, attendance_date, status, remarks, marked_by, created_at)
+    SELECT gen_random_uuid(), student_id, section_id, subject_id, attendance_date,
+           status::attendancestatus, remarks, marked_by, timezone('utc', now())
+    FROM staged
+    {on_conflict}
+    RETURNING student_id, subject_id, section_id, attendance_date, status
+),
+changes AS (
+    SELECT w.student_id,
+           w.subject_id,
+           w.section_id,
+           w.attendance_date,
+           CASE WHEN p.status IS NULL THEN 1 ELSE 0 END AS total,
+           (w.status = 'PRESENT')::int - COALESCE((p.status = 'PRESENT')::int, 0) AS present
+    FROM written w
+    LEFT JOIN previous p USING (student_id, subject_id, section_id, attendance_date)
+),
+student_rollup AS (
+    INSERT INTO attendance_rollup (student_id, subject_id, section_id, total, present, updated_at)
+    SELECT student_id, subject_id, section_id, SUM(total), SUM(present), timezone('utc', now())
+    FROM changes
+    GROUP BY student_id, subject_id, section_id
+    HAVING SUM(total) <> 0 OR SUM(present) <> 0
+    ORDER BY student_id, subject_id, section_id
+    ON CONFLICT (student_id, subject_id, section_id) DO UPDATE
+    SET total = attendance_rollup.total + excluded.total,
+        present = attendance_rollup.present + excluded.present,
+        updated_at = excluded.updated_at
+),
+daily_rollup AS (
+    INSERT INTO attendance_daily_rollup (section_id, subject_id, attendance_date, total, present, updated_at)
+    SELECT section_id, subject_id, attendance_date, SUM(total), SUM(present), timezone('utc', now())
+    FROM changes
+    GROUP BY section_id, subject_id, attendance_date
+    HAVING SUM(total) <> 0 OR SUM(present) <> 0
+    ORDER BY section_id, subject_id, attendance_date
+    ON CONFLICT (section_id, subject_id, attendance_date) DO UPDATE
+    SET total = attendance_daily_rollup.total + excluded.total,
+        present = attendance_daily_rollup.present + excluded.present,
+        updated_at = excluded.updated_at
+)
+SELECT section_id,
+       subject_id,
+       attendance_date,
+       COUNT(*) FILTER (WHERE total = 1) AS created,
+       COUNT(*) FILTER (WHERE total = 0) AS updated
+FROM changes
+GROUP BY section_id, subject_id, attendance_date
+"""
+
+# Same keys as AttendanceRepository.bulk_mark_attendance, taken in a fixed order
+_LOCK_SESSIONS = """
+SELECT pg_advisory_xact_lock(hashtextextended(
+    'attendance:' || section_id || ':' || subject_id || ':' || to_char(attendance_date, 'YYYY-MM-DD'), 0
+))
+FROM (
+    SELECT DISTINCT section_id, subject_id, attendance_date
+    FROM ({source}) staged
+    ORDER BY section_id, subject_id, attendance_date
+) sessions
+"""
+
+
+class AttendanceImportRepository:
+    """
+    Set-based attendance writes for imports, batch sync and check-in.
+
+    Records are staged (COPY into a temporary table for large batches,
+    arrays for small ones) and merged with a single statement, instead of
+    going through bulk_mark_attendance one class session at a time.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def import_records(
+        self, records: List[ImportRecord],
+        on_progress: Optional[Callable[[int], None]] = None
+    ) -> Dict[str, int]:
+        """
+        Write the records in one transaction and commit.
+        Records must be unique per (student, subject, section, date).
+        Returns the number of records created and updated.
+        """
+        sessions = await self.merge(records, on_progress)
+        await self.db.commit()
+        return {
+            "created": sum(counts["created"] for counts in sessions.values()),
+            "updated": sum(counts["updated"] for counts in sessions.values())
+        }
+
+    async def merge(
+        self, records: List[ImportRecord],
+        on_progress: Optional[Callable[[int], None]] = None,
+        insert_only: bool = False
+    ) -> SessionCounts:
+        """
+        Write the records and update both rollups. Does not commit.
+        With insert_only, students already marked for a session are left untouched.
+        Raises ArchivedAttendanceError if any record falls in a detached month.
+        Returns created/updated counts per class session.
+        """
+        if not records:
+            return {}
+        await AttendancePartitionRepository(self.db).ensure_writable(record[3] for record in records)
+        if settings.ATTENDANCE_STORAGE == "bitmap":
+            return await self._merge_sheets(records, on_progress, insert_only)
+        if len(records) >= COPY_THRESHOLD:
+            await self._stage(records, on_progress)
+            return await self._merge_rows(f"SELECT * FROM {STAGING_TABLE}", {}, insert_only)
+
+        student_ids, section_ids, subject_ids, dates, statuses, remarks, marked_by = map(list, zip(*records))
+        counts = await self._merge_rows(_UNNEST_SOURCE, {
+            "student_ids": student_ids,
+            "section_ids": section_ids,
+            "subject_ids": subject_ids,
+            "dates": dates,
+            "statuses": [status.name for status in statuses],
+            "remarks": remarks,
+            "marked_by": marked_by,
+        }, insert_only)
+        if on_progress:
+            on_progress(len(records))
+        return counts
+
+    async def _stage(self, records: List[ImportRecord], on_progress: Optional[Callable[[int], None]]):
+        """
+        COPY the records into a temporary table dropped at commit. A later merge
+        in the same transaction reuses the table after emptying it.
+        """
+        await self.db.execute(text(
+            f"CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} "
+            "(student_id uuid, section_id uuid, subject_id uuid, attendance_date date, "
+            "status text, remarks text, marked_by uuid) "
+            "ON COMMIT DROP"
+        ))
+        await self.db.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+        # COPY goes through the driver connection that owns the session's transaction
+        connection = await self.db.connection()
+        raw = await connection.get_raw_connection()
+        for offset in range(0, len(records), COPY_CHUNK):
+            chunk = records[offset:offset + COPY_CHUNK]
+            await raw.driver_connection.copy_records_to_table(
+                STAGING_TABLE,
+                records=[(*record[:4], record[4].name, *record[5:]) for record in chunk],
+                columns=STAGING_COLUMNS
+            )
+            if on_progress:
+                on_progress(len(chunk))
+        await self.db.execute(text(f"ANALYZE {STAGING_TABLE}"))
+
+    async def _merge_rows(self, source: str, params: dict, insert_only: bool = False) -> SessionCounts:
+        await self.db.execute(text(_LOCK_SESSIONS.format(source=source)), params)
+        on_conflict = _INSERT_ONLY if insert_only else _OVERWRITE
+        result = await self.db.execute(text(_MERGE_ROWS.format(source=source, on_conflict=on_conflict)), params)
+        return {
+            (row.section_id, row.subject_id, row.attendance_date): {"created": row.created, "updated": row.updated}
+            for row in result
+        }
+
+    async def _merge_sheets(
+        self, records: List[ImportRecord],
+        on_progress: Optional[Callable[[int], None]],
+        insert_only: bool = False
+    ) -> SessionCounts:
+        """Bitmap storage keeps one row per class session, so records are merged per sheet."""
+        sessions = defaultdict(dict)
+        marked_by = {}
+        for student_id, section_id, subject_id, attendance_date, status, remarks, marker in records:
+            key = (section_id, subject_id, attendance_date)
+            sessions[key][student_id] = {"status": status, "remarks": remarks}
+            # A sheet records a single marker; the last record's wins
+            marked_by[key] = marker
+
+        bitmap = AttendanceBitmapRepository(self.db)
+        rollup_repo = AttendanceRollupRepository(self.db)
+        counts: SessionCounts = {}
+        for key in sorted(sessions):
+            section_id, subject_id, attendance_date = key
+            rows = sessions[key]
+            sheet_key = f"attendance:{section_id}:{subject_id}:{attendance_date.isoformat()}"
+            await self.db.execute(select(func.pg_advisory_xact_lock(func.hashtextextended(sheet_key, 0))))
+            created, updated, delta = await bitmap.write_sheet(
+                section_id, subject_id, attendance_date, rows, marked_by[key], insert_only
+            )
+            await rollup_repo.apply(delta)
+            await rollup_repo.apply_daily(section_id, subject_id, attendance_date, delta)
+            counts[key] = {"created": created, "updated": updated}
+            if on_progress:
+                on_progress(len(rows))
+        return counts
@@ -0,0 +1,153 @@
+import re
+from datetime import date
+from typing import Iterable, List, Optional
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.attendance_archive import AttendanceArchive
+
+DEFAULT_PARTITION = "attendance_default"
+_PARTITION_NAME = re.compile(r"^attendance_p(\d{4})_(\d{2})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Monthly partitions are named attendance_pYYYY_MM."""
+    return f"attendance_p{month:%Y_%m}"
+
+
+class ArchivedAttendanceError(ValueError):
+    """Attendance was written for a date whose partition has been detached."""
+
+
+class AttendancePartitionRepository:
+    """
+    Maintains the monthly range partitions of the attendance table.
+
+    Rows whose month has no partition land in attendance_default; creating the
+    month's partition later moves them out of it.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def list_partitions(self) -> List[str]:
+        result = await self.db.execute(text("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'attendance'::regclass
+            ORDER BY c.relname
+        """))
+        return [row.relname for row in result]
+
+    async def create_month(self, month: date) -> bool:
+        """Create the partition for `month` if missing. Returns True if it was created."""
+        month = month_start(month)
+        name = partition_name(month)
+        if name in await self.list_partitions():
+            return False
+
+        bounds = {"start": month, "end": add_months(month, 1)}
+        create = text(
+            f"CREATE TABLE {name} PARTITION OF attendance "
+            f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+        )
+        stranded = await self.db.scalar(
+            text(
+                f"SELECT COUNT(*) FROM {DEFAULT_PARTITION} "
+                "WHERE attendance_date >= :start AND attendance_date < :end"
+            ),
+            bounds
+        )
+        if not stranded:
+            await self.db.execute(create)
+        else:
+            # The default partition may not hold rows of a new range, so move them across
+            await self.db.execute(text(f"ALTER TABLE attendance DETACH PARTITION {DEFAULT_PARTITION}"))
+            await self.db.execute(create)
+            await self.db.execute(
+                text(
+                    f"INSERT INTO attendance SELECT * FROM {DEFAULT_PARTITION} "
+                    "WHERE attendance_date >= :start AND attendance_date < :end"
+                ),
+                bounds
+            )
+            await self.db.execute(
+                text(
+                    f"DELETE FROM {DEFAULT_PARTITION} "
+                    "WHERE attendance_date >= :start AND attendance_date < :end"
+                ),
+                bounds
+            )
+            await self.db.execute(text(f"ALTER TABLE attendance ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+        await self.db.commit()
+        return True
+
+    async def ensure_months(self, months_ahead: int = 3) -> List[str]:
+        """Create partitions from the current month through `months_ahead` months ahead."""
+        created = []
+        current = month_start(date.today())
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if await self.create_month(month):
+                created.append(partition_name(month))
+        return created
+
+    async def archive_cutoff(self) -> Optional[date]:
+        """First date still held by the attendance table, or None if nothing was detached."""
+        return await self.db.scalar(select(func.max(AttendanceArchive.ends_on)))
+
+    async def ensure_writable(self, dates: Iterable[date]):
+        """
+        Raise ArchivedAttendanceError if any date falls in a detached month.
+        Only row storage is partitioned, so bitmap storage is always writable.
+        """
+        if settings.ATTENDANCE_STORAGE == "bitmap":
+            return
+        earliest = min(dates, default=None)
+        cutoff = await self.archive_cutoff() if earliest else None
+        if cutoff and earliest < cutoff:
+            raise ArchivedAttendanceError(
+                f"Attendance before {cutoff.isoformat()} is archived and can no longer be changed"
+            )
+
+    async def detach_before(self, cutoff: date) -> List[str]:
+        """
+        Detach monthly partitions that end on or before `cutoff`.
+
+        Detached partitions stay as ordinary tables for archiving; their rows
+        no longer appear in attendance queries. Their totals are recorded in
+        attendance_archived_rollup so the rollups keep counting them and
+        verify/rebuild still agree, and their dates stop accepting writes.
+        """
+        detached = []
+        for name in await self.list_partitions():
+            match = _PARTITION_NAME.match(name)
+            if not match:
+                continue
+            month = date(int(match.group(1)), int(match.group(2)), 1)
+            if add_months(month, 1) <= cutoff:
+                await self.db.execute(text(f"""
+                    INSERT INTO attendance_archived_rollup (student_id, subject_id, section_id, total, present)
+                    SELECT student_id, subject_id, section_id, COUNT(*), COUNT(*) FILTER (WHERE status = 'PRESENT')
+                    FROM {name}
+                    GROUP BY student_id, subject_id, section_id
+                    ON CONFLICT (student_id, subject_id, section_id) DO UPDATE
+                    SET total = attendance_archived_rollup.total + excluded.total,
+                        present = attendance_archived_rollup.present + excluded.present
+                """))
+                self.db.add(AttendanceArchive(partition_name=name, starts_on=month, ends_on=add_months(month, 1)))
+                await self.db.execute(text(f"ALTER TABLE attendance DETACH PARTITION {name}"))
+                detached.append(name)
+        await self.db.commit()
+        return detached
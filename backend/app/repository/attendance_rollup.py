@@ -0,0 +1,274 @@
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Tuple
+from uuid import UUID
+from sqlalchemy import select, delete, func, and_, or_, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.attendance import Attendance, AttendanceStatus
+from app.models.attendance_archive import AttendanceArchivedRollup
+from app.models.attendance_rollup import AttendanceRollup, AttendanceDailyRollup
+
+RollupKey = Tuple[UUID, UUID, UUID]  # (student_id, subject_id, section_id)
+
+
+class AttendanceRollupDelta:
+    """Accumulates (total, present) changes per rollup row while attendance is being written."""
+
+    def __init__(self):
+        self._changes: Dict[RollupKey, List[int]] = defaultdict(lambda: [0, 0])
+
+    def add(self, student_id: UUID, subject_id: UUID, section_id: UUID, total: int = 0, present: int = 0):
+        change = self._changes[(UUID(str(student_id)), UUID(str(subject_id)), UUID(str(section_id)))]
+        change[0] += total
+        change[1] += present
+
+    def totals(self) -> Tuple[int, int]:
+        """Net (total, present) change across all rows."""
+        return (
+            sum(total for total, _ in self._changes.values()),
+            sum(present for _, present in self._changes.values())
+        )
+
+    def rows(self) -> List[dict]:
+        """
+        Non-zero changes in (student_id, subject_id, section_id) order, so concurrent
+        writers lock the rollup rows they share in the same order and cannot deadlock.
+        """
+        return [
+            {"student_id": key[0], "subject_id": key[1], "section_id": key[2], "total": total, "present": present}
+            for key, (total, present) in sorted(self._changes.items())
+            if total or present
+        ]
+
+
+def fresh_rollup_query():
+    """
+    Rollup rows computed directly from attendance in the configured storage.
+    With row storage, totals of detached partitions are added back from
+    attendance_archived_rollup.
+    """
+    if settings.ATTENDANCE_STORAGE == "bitmap":
+        from .attendance_bitmap import fresh_bitmap_rollup_query
+        return fresh_bitmap_rollup_query()
+    live = (
+        select(
+            Attendance.student_id,
+            Attendance.subject_id,
+            Attendance.section_id,
+            func.count(Attendance.id).label("total"),
+            func.count(Attendance.id).filter(Attendance.status == AttendanceStatus.PRESENT).label("present")
+        )
+        .group_by(Attendance.student_id, Attendance.subject_id, Attendance.section_id)
+    )
+    archived = select(
+        AttendanceArchivedRollup.student_id,
+        AttendanceArchivedRollup.subject_id,
+        AttendanceArchivedRollup.section_id,
+        AttendanceArchivedRollup.total,
+        AttendanceArchivedRollup.present
+    )
+    combined = union_all(live, archived).subquery()
+    return (
+        select(
+            combined.c.student_id,
+            combined.c.subject_id,
+            combined.c.section_id,
+            func.sum(combined.c.total).label("total"),
+            func.sum(combined.c.present).label("present")
+        )
+        .group_by(combined.c.student_id, combined.c.subject_id, combined.c.section_id)
+    )
+
+
+def fresh_daily_rollup_query():
+    """Per-session totals computed directly from attendance in the configured storage."""
+    if settings.ATTENDANCE_STORAGE == "bitmap":
+        from app.models.attendance_sheet import AttendanceSheet
+        return select(
+            AttendanceSheet.section_id,
+            AttendanceSheet.subject_id,
+            AttendanceSheet.attendance_date,
+            func.bit_count(AttendanceSheet.marked).label("total"),
+            func.bit_count(AttendanceSheet.present).label("present")
+        )
+    return (
+        select(
+            Attendance.section_id,
+            Attendance.subject_id,
+            Attendance.attendance_date,
+            func.count(Attendance.id).label("total"),
+            func.count(Attendance.id).filter(Attendance.status == AttendanceStatus.PRESENT).label("present")
+        )
+        .group_by(Attendance.section_id, Attendance.subject_id, Attendance.attendance_date)
+    )
+
+
+class AttendanceRollupRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def apply(self, delta: AttendanceRollupDelta):
+        """
+        Add the accumulated changes to the rollup in one statement.
+        Does not commit; runs inside the caller's transaction.
+        """
+        rows = delta.rows()
+        if not rows:
+            return
+        stmt = insert(AttendanceRollup).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AttendanceRollup.student_id, AttendanceRollup.subject_id, AttendanceRollup.section_id],
+            set_={
+                "total": AttendanceRollup.total + stmt.excluded.total,
+                "present": AttendanceRollup.present + stmt.excluded.present,
+                "updated_at": func.now(),
+            },
+        )
+        await self.db.execute(stmt)
+
+    async def apply_daily(self, section_id: UUID, subject_id: UUID, attendance_date: date, delta: AttendanceRollupDelta):
+        """
+        Add one session's net change to the daily rollup.
+        Does not commit; runs inside the caller's transaction.
+        """
+        total, present = delta.totals()
+        if not total and not present:
+            return
+        stmt = insert(AttendanceDailyRollup).values(
+            section_id=section_id, subject_id=subject_id, attendance_date=attendance_date,
+            total=total, present=present
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AttendanceDailyRollup.section_id, AttendanceDailyRollup.subject_id, AttendanceDailyRollup.attendance_date],
+            set_={
+                "total": AttendanceDailyRollup.total + stmt.excluded.total,
+                "present": AttendanceDailyRollup.present + stmt.excluded.present,
+                "updated_at": func.now(),
+            },
+        )
+        await self.db.execute(stmt)
+
+    async def _archive_cutoff(self):
+        if settings.ATTENDANCE_STORAGE == "bitmap":
+            return None
+        from .attendance_partition import AttendancePartitionRepository
+        return await AttendancePartitionRepository(self.db).archive_cutoff()
+
+    async def rebuild(self) -> int:
+        """
+        Recompute the student and daily rollups from attendance.
+        Daily rows of detached months have nothing left to recompute from and are kept.
+        Returns the number of student rollup rows written.
+        """
+        await self.db.execute(delete(AttendanceRollup))
+        result = await self.db.execute(
+            insert(AttendanceRollup).from_select(
+                ["student_id", "subject_id", "section_id", "total", "present"],
+                fresh_rollup_query()
+            )
+        )
+        cutoff = await self._archive_cutoff()
+        fresh_daily = fresh_daily_rollup_query().subquery()
+        stale = delete(AttendanceDailyRollup)
+        source = select(fresh_daily)
+        if cutoff:
+            stale = stale.where(AttendanceDailyRollup.attendance_date >= cutoff)
+            source = source.where(fresh_daily.c.attendance_date >= cutoff)
+        await self.db.execute(stale)
+        await self.db.execute(
+            insert(AttendanceDailyRollup).from_select(
+                ["section_id", "subject_id", "attendance_date", "total", "present"],
+                source
+            )
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def verify(self) -> List[dict]:
+        """
+        Compare the rollup with a fresh aggregate of attendance.
+        Returns one entry per drifted row; an empty list means they agree.
+        """
+        fresh = fresh_rollup_query().subquery()
+        stmt = (
+            select(
+                func.coalesce(fresh.c.student_id, AttendanceRollup.student_id).label("student_id"),
+                func.coalesce(fresh.c.subject_id, AttendanceRollup.subject_id).label("subject_id"),
+                func.coalesce(fresh.c.section_id, AttendanceRollup.section_id).label("section_id"),
+                fresh.c.total.label("expected_total"),
+                fresh.c.present.label("expected_present"),
+                AttendanceRollup.total.label("rollup_total"),
+                AttendanceRollup.present.label("rollup_present")
+            )
+            .select_from(fresh)
+            .join(
+                AttendanceRollup,
+                and_(
+                    fresh.c.student_id == AttendanceRollup.student_id,
+                    fresh.c.subject_id == AttendanceRollup.subject_id,
+                    fresh.c.section_id == AttendanceRollup.section_id
+                ),
+                full=True
+            )
+            .where(
+                or_(
+                    fresh.c.total.is_distinct_from(AttendanceRollup.total),
+                    fresh.c.present.is_distinct_from(AttendanceRollup.present)
+                )
+            )
+        )
+        result = await self.db.execute(stmt)
+        # A rollup row with zero classes and no attendance behind it is not drift
+        return [
+            dict(row._mapping) for row in result
+            if (row.expected_total or 0, row.expected_present or 0) != (row.rollup_total or 0, row.rollup_present or 0)
+        ]
+
+    async def verify_daily(self) -> List[dict]:
+        """
+        Compare the daily rollup with fresh per-session totals of attendance.
+        Sessions in detached months are skipped.
+        Returns one entry per drifted session; an empty list means they agree.
+        """
+        fresh = fresh_daily_rollup_query().subquery()
+        cutoff = await self._archive_cutoff()
+        stmt = (
+            select(
+                func.coalesce(fresh.c.section_id, AttendanceDailyRollup.section_id).label("section_id"),
+                func.coalesce(fresh.c.subject_id, AttendanceDailyRollup.subject_id).label("subject_id"),
+                func.coalesce(fresh.c.attendance_date, AttendanceDailyRollup.attendance_date).label("attendance_date"),
+                fresh.c.total.label("expected_total"),
+                fresh.c.present.label("expected_present"),
+                AttendanceDailyRollup.total.label("rollup_total"),
+                AttendanceDailyRollup.present.label("rollup_present")
+            )
+            .select_from(fresh)
+            .join(
+                AttendanceDailyRollup,
+                and_(
+                    fresh.c.section_id == AttendanceDailyRollup.section_id,
+                    fresh.c.subject_id == AttendanceDailyRollup.subject_id,
+                    fresh.c.attendance_date == AttendanceDailyRollup.attendance_date
+                ),
+                full=True
+            )
+            .where(
+                or_(
+                    fresh.c.total.is_distinct_from(AttendanceDailyRollup.total),
+                    fresh.c.present.is_distinct_from(AttendanceDailyRollup.present)
+                )
+            )
+        )
+        if cutoff:
+            stmt = stmt.where(
+                func.coalesce(fresh.c.attendance_date, AttendanceDailyRollup.attendance_date) >= cutoff
+            )
+        result = await self.db.execute(stmt)
+        # An empty session (every mark removed) is not drift
+        return [
+            dict(row._mapping) for row in result
+            if (row.expected_total or 0, row.expected_present or 0) != (row.rollup_total or 0, row.rollup_present or 0)
+        ]
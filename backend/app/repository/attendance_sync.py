@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+from typing import Dict, List
+from uuid import UUID
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import invalidate_students
+from app.models.attendance import AttendanceStatus
+from app.models.attendance_sync import AttendanceSyncKey
+from .attendance_import import AttendanceImportRepository, ImportRecord
+
+
+class AttendanceSyncRepository:
+    """Applies batches of offline-marked attendance sheets, each at most once per idempotency key."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def sync(self, sheets: List[dict], submitted_by: UUID) -> List[dict]:
+        """
+        Apply the sheets in one transaction and commit.
+
+        Each sheet is a dict with idempotency_key, section_id, subject_id,
+        attendance_date and entries. Keys and class sessions must be unique
+        within the batch. Returns one result per sheet, in order.
+        """
+        # Claiming the keys first makes a concurrent replay of the same batch wait, then skip
+        claim = (
+            insert(AttendanceSyncKey)
+            .values([
+                {
+                    "submitted_by": submitted_by,
+                    "key": sheet["idempotency_key"],
+                    "section_id": sheet["section_id"],
+                    "subject_id": sheet["subject_id"],
+                    "attendance_date": sheet["attendance_date"],
+                }
+                for sheet in sheets
+            ])
+            .on_conflict_do_nothing()
+            .returning(AttendanceSyncKey.key)
+        )
+        claimed = set((await self.db.execute(claim)).scalars().all())
+
+        applied: Dict[str, AttendanceSyncKey] = {}
+        replayed = [sheet["idempotency_key"] for sheet in sheets if sheet["idempotency_key"] not in claimed]
+        if replayed:
+            result = await self.db.execute(
+                select(AttendanceSyncKey)
+                .where(AttendanceSyncKey.submitted_by == submitted_by)
+                .where(AttendanceSyncKey.key.in_(replayed))
+            )
+            applied = {row.key: row for row in result.scalars()}
+
+        records: List[ImportRecord] = []
+        for sheet in sheets:
+            if sheet["idempotency_key"] not in claimed:
+                continue
+            # One entry per student; a later entry for the same student wins
+            entries = {UUID(str(entry["student_id"])): entry for entry in sheet["entries"]}
+            records.extend(
+                (
+                    student_id, sheet["section_id"], sheet["subject_id"], sheet["attendance_date"],
+                    AttendanceStatus(entry["status"]), entry.get("remarks"), submitted_by
+                )
+                for student_id, entry in entries.items()
+            )
+        counts = await AttendanceImportRepository(self.db).merge(records)
+
+        results = []
+        recorded = []
+        for sheet in sheets:
+            key = sheet["idempotency_key"]
+            session = (sheet["section_id"], sheet["subject_id"], sheet["attendance_date"])
+            if key in claimed:
+                session_counts = counts.get(session, {"created": 0, "updated": 0})
+                recorded.append({"submitted_by": submitted_by, "key": key, **session_counts})
+                results.append({"idempotency_key": key, "status": "applied", **session_counts})
+                continue
+            previous = applied[key]
+            if (previous.section_id, previous.subject_id, previous.attendance_date) != session:
+                # The key was already used for a different sheet; nothing is written for this one
+                results.append({"idempotency_key": key, "status": "key_conflict", "created": 0, "updated": 0})
+            else:
+                results.append({
+                    "idempotency_key": key, "status": "already_applied",
+                    "created": previous.created, "updated": previous.updated
+                })
+        if recorded:
+            await self.db.execute(update(AttendanceSyncKey), recorded)
+        await self.db.commit()
+        await invalidate_students({record[0] for record in records})
+        return results
+
+    async def prune(self, older_than_days: int) -> int:
+        """Forget keys older than the given age; clients must not replay sheets past it."""
+        result = await self.db.execute(
+            delete(AttendanceSyncKey)
+            .where(AttendanceSyncKey.created_at < datetime.utcnow() - timedelta(days=older_than_days))
+        )
+        await self.db.commit()
+        return result.rowcount
@@ -5,14 +5,30 @@ from sqlalchemy import select, update, delete
 from sqlalchemy.sql.expression import Select
 
 from app.core.database import Base
+from app.repository.entity_counter import EntityCounterRepository
 
 ModelType = TypeVar("ModelType", bound=Base)
 
 class BaseRepository(Generic[ModelType]):
+    # entity_counters key adjusted on create/delete (None = not counted)
+    counter_key: Optional[str] = None
+
     def __init__(self, model: Type[ModelType], db: AsyncSession):
         self.model = model
         self.db = db
 
+    def _counter_key(self, db_obj: ModelType) -> Optional[str]:
+        return self.counter_key
+
+    async def _adjust_counter(self, db_obj: ModelType, delta: int):
+        key = self._counter_key(db_obj)
+        if key:
+            await EntityCounterRepository(self.db).increment(key, delta)
+
+    async def _after_write(self, db_obj: ModelType):
+        """Called after create/update/delete commit; override to drop derived caches."""
+        pass
+
     async def get_by_id(self, id: UUID) -> Optional[ModelType]:
         query = select(self.model).where(self.model.id == id)
         result = await self.db.execute(query)
@@ -35,8 +51,10 @@ class BaseRepository(Generic[ModelType]):
     async def create(self, obj_in: dict[str, Any]) -> ModelType:
         db_obj = self.model(**obj_in)
         self.db.add(db_obj)
+        await self._adjust_counter(db_obj, 1)
         await self.db.commit()
         await self.db.refresh(db_obj)
+        await self._after_write(db_obj)
         return db_obj
 
     async def update(self, db_obj: ModelType, obj_in: dict[str, Any]) -> ModelType:
@@ -44,10 +62,16 @@ class BaseRepository(Generic[ModelType]):
             setattr(db_obj, field, value)
         await self.db.commit()
         await self.db.refresh(db_obj)
+        await self._after_write(db_obj)
         return db_obj
 
     async def delete(self, id: UUID) -> bool:
-        query = delete(self.model).where(self.model.id == id)
-        await self.db.execute(query)
+        query = delete(self.model).where(self.model.id == id).returning(self.model)
+        result = await self.db.execute(query)
+        deleted = result.scalar_one_or_none()
+        if deleted is not None:
+            await self._adjust_counter(deleted, -1)
         await self.db.commit()
+        if deleted is not None:
+            await self._after_write(deleted)
         return True
@@ -1,11 +1,17 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import invalidate_branches
 from app.repository.base import BaseRepository
 from app.models.branch import Branch
 
 class BranchRepository(BaseRepository[Branch]):
+    counter_key = "branches"
+
     def __init__(self, db: AsyncSession):
         super().__init__(Branch, db)
 
+    async def _after_write(self, branch: Branch):
+        await invalidate_branches([branch.id])
+
     async def get_by_code(self, code: str) -> Branch | None:
         from sqlalchemy import select
         query = select(self.model).where(self.model.code == code)
@@ -0,0 +1,147 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.branch import Branch
+from app.models.branch_performance_rollup import BranchPerformanceRollup
+from app.models.exam import Exam
+from app.models.exam_marks import ExamMarks, MarkStatus
+from app.models.user import User, Role
+
+
+def mark_percentage(marks_obtained: Optional[int], total_marks: Optional[int], status: MarkStatus) -> Optional[float]:
+    """Percentage a mark contributes to the rollup, or None if it is not counted."""
+    if marks_obtained is None or not total_marks or status == MarkStatus.REJECTED:
+        return None
+    return marks_obtained * 100.0 / total_marks
+
+
+class BranchPerformanceDelta:
+    """Accumulates rollup changes per branch while marks are being written."""
+
+    def __init__(self):
+        self._changes: Dict[UUID, List[float]] = defaultdict(lambda: [0.0, 0])
+
+    def add(self, branch_id: Optional[UUID], pct: Optional[float]):
+        if branch_id is None or pct is None:
+            return
+        self._changes[branch_id][0] += pct
+        self._changes[branch_id][1] += 1
+
+    def remove(self, branch_id: Optional[UUID], pct: Optional[float]):
+        if branch_id is None or pct is None:
+            return
+        self._changes[branch_id][0] -= pct
+        self._changes[branch_id][1] -= 1
+
+    def items(self) -> Iterable[Tuple[UUID, float, int]]:
+        # Branch order, so concurrent writers lock shared rollup rows in the same order
+        for branch_id, (pct_sum, count) in sorted(self._changes.items()):
+            if count or pct_sum:
+                yield branch_id, pct_sum, count
+
+
+class BranchPerformanceRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_branch_ids(self, student_ids: List[UUID]) -> Dict[UUID, Optional[UUID]]:
+        """Map student id -> branch id for a batch of students in one query."""
+        if not student_ids:
+            return {}
+        stmt = (
+            select(User.id, User.branch_id)
+            .where(User.id.in_(student_ids))
+            .where(User.role == Role.STUDENT)
+        )
+        result = await self.db.execute(stmt)
+        return {row.id: row.branch_id for row in result}
+
+    async def apply(self, delta: BranchPerformanceDelta):
+        """
+        Add the accumulated changes to the rollup rows.
+        Does not commit; runs inside the caller's transaction.
+        """
+        rows = [
+            {"branch_id": branch_id, "pct_sum": pct_sum, "mark_count": count}
+            for branch_id, pct_sum, count in delta.items()
+        ]
+        if not rows:
+            return
+        stmt = insert(BranchPerformanceRollup).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[BranchPerformanceRollup.branch_id],
+            set_={
+                "pct_sum": BranchPerformanceRollup.pct_sum + stmt.excluded.pct_sum,
+                "mark_count": BranchPerformanceRollup.mark_count + stmt.excluded.mark_count,
+                "updated_at": func.now(),
+            },
+        )
+        await self.db.execute(stmt)
+
+    async def rescale_exam(self, exam_id: UUID, old_total: Optional[int], new_total: Optional[int]):
+        """
+        Move one exam's marks in the rollup from its old total marks to the new one.
+        Does not commit; the caller holds the exam's lock so its marks do not change meanwhile.
+        """
+        result = await self.db.execute(
+            select(User.branch_id, ExamMarks.marks_obtained, ExamMarks.status)
+            .join(User, ExamMarks.student_id == User.id)
+            .where(ExamMarks.exam_id == exam_id)
+            .where(User.role == Role.STUDENT)
+        )
+        delta = BranchPerformanceDelta()
+        for row in result:
+            delta.remove(row.branch_id, mark_percentage(row.marks_obtained, old_total, row.status))
+            delta.add(row.branch_id, mark_percentage(row.marks_obtained, new_total, row.status))
+        await self.apply(delta)
+
+    async def get_active_branches(self) -> List[dict]:
+        """Average percentage for every active branch, read from the rollup."""
+        stmt = (
+            select(Branch.name, Branch.code, BranchPerformanceRollup.pct_sum, BranchPerformanceRollup.mark_count)
+            .outerjoin(BranchPerformanceRollup, BranchPerformanceRollup.branch_id == Branch.id)
+            .where(Branch.is_active == True)
+        )
+        result = await self.db.execute(stmt)
+        return [
+            {
+                "name": row.name,
+                "code": row.code,
+                "average": round(row.pct_sum / row.mark_count, 1) if row.mark_count else 0
+            }
+            for row in result
+        ]
+
+    async def rebuild(self) -> int:
+        """
+        Recompute the whole rollup from exam_marks in one grouped statement.
+        Returns the number of branch rows written.
+        """
+        source = (
+            select(
+                User.branch_id,
+                func.sum(ExamMarks.marks_obtained * 100.0 / Exam.total_marks),
+                func.count(ExamMarks.marks_obtained),
+            )
+            .select_from(ExamMarks)
+            .join(Exam, ExamMarks.exam_id == Exam.id)
+            .join(User, ExamMarks.student_id == User.id)
+            .where(User.role == Role.STUDENT)
+            .where(User.branch_id.is_not(None))
+            .where(ExamMarks.status != MarkStatus.REJECTED)
+            .where(ExamMarks.marks_obtained.is_not(None))
+            .where(Exam.total_marks > 0)
+            .group_by(User.branch_id)
+        )
+        await self.db.execute(delete(BranchPerformanceRollup))
+        result = await self.db.execute(
+            insert(BranchPerformanceRollup).from_select(
+                ["branch_id", "pct_sum", "mark_count"], source
+            )
+        )
+        await self.db.commit()
+        return result.rowcount
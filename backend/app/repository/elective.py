@@ -2,6 +2,7 @@ from typing import List
 from uuid import UUID
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import invalidate_students
 from app.models.student_elective import StudentElective
 from app.models.subject import Subject
 
@@ -48,6 +49,7 @@ class ElectiveRepository(BaseRepository[StudentElective]):
         self.db.add(new_selection)
         await self.db.commit()
         await self.db.refresh(new_selection)
+        await invalidate_students([student_id])
         return new_selection
 
     async def bulk_select_electives(self, student_id: UUID, subject_ids: List[UUID]) -> bool:
@@ -66,6 +68,7 @@ class ElectiveRepository(BaseRepository[StudentElective]):
                 self.db.add(StudentElective(student_id=student_id, subject_id=sub_id))
             
             await self.db.commit()
+            await invalidate_students([student_id])
             return True
         except Exception as e:
             await self.db.rollback()
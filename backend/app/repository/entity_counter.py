@@ -0,0 +1,93 @@
+from datetime import date
+from typing import Dict, List
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.branch import Branch
+from app.models.entity_counter import EntityCounter
+from app.models.exam import Exam
+from app.models.leave_application import LeaveApplication, LeaveStatus
+from app.models.section import Section
+from app.models.semester import Semester
+from app.models.user import User, Role
+
+# Counter key for each role whose active users are counted
+ROLE_COUNTER_KEYS = {
+    Role.STUDENT: "students",
+    Role.TEACHER: "teachers",
+}
+
+PENDING_LEAVES_KEY = "pending_leaves"
+
+
+def counter_sources() -> Dict[str, object]:
+    """COUNT(*) statement backing each maintained counter."""
+    return {
+        "students": select(func.count()).select_from(User).where(User.role == Role.STUDENT, User.is_active == True),
+        "teachers": select(func.count()).select_from(User).where(User.role == Role.TEACHER, User.is_active == True),
+        "branches": select(func.count()).select_from(Branch),
+        "sections": select(func.count()).select_from(Section),
+        "semesters": select(func.count()).select_from(Semester),
+        PENDING_LEAVES_KEY: (
+            select(func.count())
+            .select_from(LeaveApplication)
+            .where(LeaveApplication.status == LeaveStatus.PENDING)
+        ),
+    }
+
+
+def active_exams_source():
+    """Upcoming exams depend on today's date, so they are never stored as a counter."""
+    return select(func.count()).select_from(Exam).where(Exam.exam_date >= date.today())
+
+
+class EntityCounterRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ENTITY_COUNTERS_ENABLED
+
+    async def increment(self, key: str, delta: int = 1):
+        """
+        Atomically adjust a counter. Does not commit; runs inside the caller's transaction.
+        No-op when counters are disabled.
+        """
+        if not self.enabled or not key or not delta:
+            return
+        stmt = insert(EntityCounter).values(key=key, value=delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[EntityCounter.key],
+            set_={"value": EntityCounter.value + delta, "updated_at": func.now()},
+        )
+        await self.db.execute(stmt)
+
+    async def get_many(self, keys: List[str]) -> Dict[str, int]:
+        result = await self.db.execute(
+            select(EntityCounter.key, EntityCounter.value).where(EntityCounter.key.in_(keys))
+        )
+        counts = {key: 0 for key in keys}
+        counts.update({row.key: row.value for row in result})
+        return counts
+
+    async def count_all(self) -> Dict[str, int]:
+        """Compute every counter plus active exams from source tables in one statement."""
+        sources = counter_sources()
+        sources["active_exams"] = active_exams_source()
+        stmt = select(*[query.scalar_subquery().label(key) for key, query in sources.items()])
+        row = (await self.db.execute(stmt)).one()
+        return dict(row._mapping)
+
+    async def rebuild(self) -> Dict[str, int]:
+        """Recompute all counters from the source tables."""
+        counts = await self.count_all()
+        counts.pop("active_exams")
+        await self.db.execute(delete(EntityCounter))
+        await self.db.execute(
+            insert(EntityCounter).values([{"key": key, "value": value} for key, value in counts.items()])
+        )
+        await self.db.commit()
+        return counts
@@ -3,13 +3,32 @@ from uuid import UUID
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
+from app.core.cache import invalidate_exams, invalidate_sections
 from app.models.exam import Exam
 
 from app.repository.base import BaseRepository
+from app.repository.branch_performance import BranchPerformanceRepository
 
 class ExamRepository(BaseRepository[Exam]):
     def __init__(self, db):
         super().__init__(Exam, db)
+
+    async def _after_write(self, exam: Exam):
+        # Trend charts and students' upcoming exams are derived from the section's exams
+        await invalidate_exams([exam.id])
+        await invalidate_sections([exam.section_id])
+
+    async def update(self, db_obj: Exam, obj_in: dict) -> Exam:
+        new_total = obj_in.get("total_marks")
+        if new_total is None or new_total == db_obj.total_marks:
+            return await super().update(db_obj, obj_in)
+        from app.repository.exam_marks import ExamMarksRepository
+        # Mark writers for this exam wait until the new total is committed
+        await ExamMarksRepository(self.db).lock_exams([db_obj.id])
+        old_total = await self.db.scalar(select(Exam.total_marks).where(Exam.id == db_obj.id))
+        # Every percentage of this exam moved, so swap its share of the branch rollup
+        await BranchPerformanceRepository(self.db).rescale_exam(db_obj.id, old_total, new_total)
+        return await super().update(db_obj, obj_in)
         
     async def get_by_subject(self, subject_id: UUID) -> List[Exam]:
         query = (
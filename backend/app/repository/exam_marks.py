@@ -1,83 +1,241 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterable, List, Optional
 from uuid import UUID
-from sqlalchemy import select, update, delete
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, update, delete, func, Row
+from sqlalchemy.dialects.postgresql import insert
+from app.core.cache import invalidate_exams, invalidate_students
+from app.models.exam import Exam
 from app.models.exam_marks import ExamMarks, MarkStatus
-from app.models.user import User
+from app.models.subject import Subject
+from app.models.user import User, Role
 from app.repository.base import BaseRepository
+from app.repository.branch_performance import BranchPerformanceRepository, BranchPerformanceDelta, mark_percentage
+from app.repository.transcript import TranscriptRepository
 
 
 class ExamMarksRepository(BaseRepository[ExamMarks]):
     def __init__(self, db):
         super().__init__(ExamMarks, db)
 
-    async def get_marks_for_exam(self, exam_id: UUID) -> List[ExamMarks]:
-        """Get all marks for an exam, including student details."""
+    async def get_marks_for_exam(self, exam_id: UUID) -> List[Row]:
+        """
+        Get all marks for an exam with the student's name, in the shape of ExamMarkResponse.
+        Only the response columns are selected, so no User entities are loaded.
+        """
         query = (
-            select(self.model)
+            select(
+                self.model.id,
+                self.model.exam_id,
+                self.model.student_id,
+                func.concat_ws(" ", User.first_name, User.last_name).label("student_name"),
+                self.model.marks_obtained,
+                self.model.is_absent,
+                self.model.status,
+                self.model.submitted_by,
+                self.model.approved_by,
+                self.model.created_at,
+                self.model.updated_at
+            )
+            .join(User, self.model.student_id == User.id)
             .where(self.model.exam_id == exam_id)
-            .options(selectinload(self.model.student))
+            .order_by(User.roll_no)
         )
         result = await self.db.execute(query)
-        return result.scalars().all()
+        return result.all()
+
+    async def lock_exams(self, exam_ids: Iterable[UUID]):
+        """Transaction-scoped advisory lock per exam, in sorted order to avoid deadlocks."""
+        for exam_id in sorted(set(exam_ids), key=str):
+            await self.db.execute(select(func.pg_advisory_xact_lock(func.hashtextextended(f"exam_marks:{exam_id}", 0))))
 
     async def bulk_upsert_marks(
         self, 
         exam_id: UUID, 
         marks_data: List[dict], 
         submitted_by: UUID
-    ) -> List[ExamMarks]:
+    ) -> List[dict]:
         """
-        Bulk create or update marks for an exam.
+        Bulk create or update marks for an exam in one statement.
         Sets status to PENDING for all entries.
+        Returns the written marks with the student's name, in the shape of ExamMarkResponse.
         """
-        results = []
+        # One mark per student; a later entry for the same student wins
+        rows = {}
         for mark_in in marks_data:
-            student_id = mark_in["student_id"]
-            
-            # Check if mark exists
-            query = select(self.model).where(
-                self.model.exam_id == exam_id,
-                self.model.student_id == student_id
+            student_id = UUID(str(mark_in["student_id"]))
+            rows[student_id] = {
+                "exam_id": exam_id,
+                "student_id": student_id,
+                "marks_obtained": mark_in.get("marks_obtained"),
+                "is_absent": mark_in.get("is_absent", False),
+                "status": MarkStatus.PENDING,
+                "submitted_by": submitted_by,
+            }
+        if not rows:
+            return []
+
+        # Serialise writers of the exam's marks so each previous mark/status reaches the rollup once
+        await self.lock_exams([exam_id])
+        total_marks = await self.db.scalar(select(Exam.total_marks).where(Exam.id == exam_id))
+        previous = (
+            select(self.model.student_id, self.model.marks_obtained, self.model.status)
+            .where(self.model.exam_id == exam_id)
+            .where(self.model.student_id.in_(list(rows)))
+            .cte("previous")
+        )
+        upsert = insert(self.model).values(list(rows.values()))
+        upsert = upsert.on_conflict_do_update(
+            constraint="uq_exam_marks_exam_student",
+            set_={
+                "marks_obtained": upsert.excluded.marks_obtained,
+                "is_absent": upsert.excluded.is_absent,
+                "status": upsert.excluded.status,
+                "submitted_by": upsert.excluded.submitted_by,
+                "updated_at": datetime.utcnow(),
+            },
+        )
+        written = upsert.returning(
+            self.model.id, self.model.exam_id, self.model.student_id, self.model.marks_obtained,
+            self.model.is_absent, self.model.status, self.model.submitted_by, self.model.approved_by,
+            self.model.created_at, self.model.updated_at
+        ).cte("written")
+        result = await self.db.execute(
+            select(
+                written,
+                previous.c.marks_obtained.label("previous_marks"),
+                previous.c.status.label("previous_status"),
+                User.first_name,
+                User.last_name,
+                User.role,
+                User.branch_id
             )
-            res = await self.db.execute(query)
-            existing_mark = res.scalar_one_or_none()
-            
-            if existing_mark:
-                # Update
-                existing_mark.marks_obtained = mark_in.get("marks_obtained")
-                existing_mark.is_absent = mark_in.get("is_absent", False)
-                existing_mark.status = MarkStatus.PENDING
-                existing_mark.submitted_by = submitted_by
-                results.append(existing_mark)
-            else:
-                # Create
-                new_mark = self.model(
-                    exam_id=exam_id,
-                    student_id=student_id,
-                    marks_obtained=mark_in.get("marks_obtained"),
-                    is_absent=mark_in.get("is_absent", False),
-                    status=MarkStatus.PENDING,
-                    submitted_by=submitted_by
-                )
-                self.db.add(new_mark)
-                results.append(new_mark)
-        
+            .select_from(written)
+            .join(User, written.c.student_id == User.id)
+            .outerjoin(previous, written.c.student_id == previous.c.student_id)
+            .order_by(User.roll_no)
+        )
+
+        # Marks feed the branch rollup; only students' marks count
+        delta = BranchPerformanceDelta()
+        marks = []
+        unpublished = []
+        for row in result:
+            branch_id = row.branch_id if row.role == Role.STUDENT else None
+            if row.previous_status is not None:
+                delta.remove(branch_id, mark_percentage(row.previous_marks, total_marks, row.previous_status))
+            delta.add(branch_id, mark_percentage(row.marks_obtained, total_marks, row.status))
+            if row.previous_status == MarkStatus.APPROVED:
+                unpublished.append(row.id)
+            marks.append({
+                "id": row.id,
+                "exam_id": row.exam_id,
+                "student_id": row.student_id,
+                "student_name": f"{row.first_name} {row.last_name}",
+                "marks_obtained": row.marks_obtained,
+                "is_absent": row.is_absent,
+                "status": row.status,
+                "submitted_by": row.submitted_by,
+                "approved_by": row.approved_by,
+                "created_at": row.created_at,
+                "updated_at": row.updated_at
+            })
+
+        await BranchPerformanceRepository(self.db).apply(delta)
+        # Resubmitted marks go back to PENDING and leave the transcript until approved again
+        await TranscriptRepository(self.db).retract(unpublished)
         await self.db.commit()
-        return results
+        await invalidate_exams([exam_id])
+        await invalidate_students(rows)
+        return marks
 
     async def update_status(
         self, 
         mark_ids: List[UUID], 
         status: MarkStatus, 
         approved_by: UUID
-    ) -> bool:
-        """Update the status of multiple mark entries (Admin action)."""
+    ) -> List[UUID]:
+        """
+        Update the status of multiple mark entries (Admin action).
+        Returns the ids of the students' marks whose status changed.
+        """
+        # Same per-exam locks as bulk_upsert_marks, taken in a fixed order
+        exam_ids = await self.db.scalars(
+            select(self.model.exam_id).where(self.model.id.in_(mark_ids)).distinct()
+        )
+        await self.lock_exams(exam_ids)
+
+        # Marks whose status changes feed the branch rollup and the cached exam trends
+        current_stmt = (
+            select(
+                self.model.id, self.model.exam_id, self.model.student_id, self.model.status, self.model.marks_obtained,
+                Exam.total_marks, User.branch_id
+            )
+            .join(Exam, self.model.exam_id == Exam.id)
+            .join(User, self.model.student_id == User.id)
+            .where(self.model.id.in_(mark_ids))
+            .where(self.model.status != status)
+            .where(User.role == Role.STUDENT)
+            .with_for_update(of=self.model)
+        )
+        delta = BranchPerformanceDelta()
+        changed_exams = set()
+        changed_students = set()
+        changed_marks = []
+        for row in await self.db.execute(current_stmt):
+            delta.remove(row.branch_id, mark_percentage(row.marks_obtained, row.total_marks, row.status))
+            delta.add(row.branch_id, mark_percentage(row.marks_obtained, row.total_marks, status))
+            changed_exams.add(row.exam_id)
+            changed_students.add(row.student_id)
+            changed_marks.append(row.id)
+        await BranchPerformanceRepository(self.db).apply(delta)
+
         stmt = (
             update(self.model)
             .where(self.model.id.in_(mark_ids))
             .values(status=status, approved_by=approved_by)
         )
         await self.db.execute(stmt)
+
+        transcripts = TranscriptRepository(self.db)
+        if status == MarkStatus.APPROVED:
+            await transcripts.publish(changed_marks)
+        else:
+            await transcripts.retract(changed_marks)
         await self.db.commit()
-        return True
+        await invalidate_exams(changed_exams)
+        await invalidate_students(changed_students)
+        return changed_marks
+
+    async def get_publication_details(self, mark_ids: List[UUID]) -> List[dict]:
+        """Everything a result notification needs for approved marks, in one joined query."""
+        if not mark_ids:
+            return []
+        stmt = (
+            select(
+                self.model.id,
+                self.model.marks_obtained,
+                self.model.is_absent,
+                Exam.exam_name,
+                Exam.total_marks,
+                Subject.name.label("subject_name"),
+                User.email
+            )
+            .join(Exam, self.model.exam_id == Exam.id)
+            .join(Subject, Exam.subject_id == Subject.id)
+            .join(User, self.model.student_id == User.id)
+            .where(self.model.id.in_(mark_ids))
+            .where(self.model.status == MarkStatus.APPROVED)
+            .where(User.role == Role.STUDENT)
+            .where(User.is_active == True)
+        )
+        result = await self.db.execute(stmt)
+        return [
+            {
+                "mark_id": row.id,
+                "email": row.email,
+                "exam_title": row.exam_name,
+                "subject_name": row.subject_name,
+                "marks_obtained": "Absent" if row.is_absent else f"{row.marks_obtained}/{row.total_marks}"
+            }
+            for row in result
+        ]
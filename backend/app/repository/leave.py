@@ -3,12 +3,23 @@ from uuid import UUID
 from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
 
+from app.core.cache import invalidate_students
 from app.models.leave_application import LeaveApplication, LeaveStatus
 from app.repository.base import BaseRepository
+from app.repository.entity_counter import EntityCounterRepository, PENDING_LEAVES_KEY
 
 class LeaveRepository(BaseRepository[LeaveApplication]):
     def __init__(self, db):
         super().__init__(LeaveApplication, db)
+
+    def _counter_key(self, db_obj: LeaveApplication) -> Optional[str]:
+        # Only pending applications are counted; status is unset until flush on create
+        if db_obj.status in (None, LeaveStatus.PENDING):
+            return PENDING_LEAVES_KEY
+        return None
+
+    async def _after_write(self, leave: LeaveApplication):
+        await invalidate_students([leave.student_id])
         
     async def get_by_student(self, student_id: UUID) -> List[LeaveApplication]:
         query = select(self.model).options(selectinload(self.model.student)).where(self.model.student_id == student_id)
@@ -54,10 +65,20 @@ class LeaveRepository(BaseRepository[LeaveApplication]):
         return result.scalar_one_or_none()
 
     async def update(self, db_obj: LeaveApplication, obj_in: dict) -> LeaveApplication:
+        # Read the stored status under a row lock so concurrent reviews count the change once
+        stored_status = await self.db.scalar(
+            select(self.model.status).where(self.model.id == db_obj.id).with_for_update()
+        )
+        was_pending = stored_status == LeaveStatus.PENDING
         for field, value in obj_in.items():
             setattr(db_obj, field, value)
+        is_pending = db_obj.status == LeaveStatus.PENDING
+        if was_pending != is_pending:
+            await EntityCounterRepository(self.db).increment(PENDING_LEAVES_KEY, 1 if is_pending else -1)
         await self.db.commit()
         
+        await self._after_write(db_obj)
+        
         # Re-fetch with student relationship to ensure it's loaded for response schema
         query = select(self.model).options(selectinload(self.model.student)).where(self.model.id == db_obj.id)
         result = await self.db.execute(query)
@@ -1,11 +1,18 @@
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import invalidate_sections
 from app.repository.base import BaseRepository
 from app.models.section import Section
 
 class SectionRepository(BaseRepository[Section]):
+    counter_key = "sections"
+
     def __init__(self, db: AsyncSession):
         super().__init__(Section, db)
+
+    async def _after_write(self, section: Section):
+        await invalidate_sections([section.id])
+
     async def get_by_id(self, id: UUID) -> Section | None:
         from sqlalchemy.orm import selectinload
         from sqlalchemy import select
@@ -64,7 +71,7 @@ class SectionRepository(BaseRepository[Section]):
         from app.models.subject import Subject
         from app.models.exam_marks import ExamMarks
         from app.models.exam import Exam
-        from app.models.attendance import Attendance, AttendanceStatus
+        from app.models.attendance_rollup import AttendanceRollup
         
         # 1. Student Count
         student_count = await self.db.scalar(
@@ -98,20 +105,14 @@ class SectionRepository(BaseRepository[Section]):
         # 4. Defaulters (Attendance < 75%)
         # Calculate attendance per student in this section
         att_stmt = (
-            select(
-                Attendance.student_id,
-                func.count(Attendance.id).label("total"),
-                func.count(Attendance.id).filter(Attendance.status == AttendanceStatus.PRESENT).label("present")
-            )
-            .where(Attendance.section_id == section_id)
-            .group_by(Attendance.student_id)
+            select(AttendanceRollup.student_id)
+            .where(AttendanceRollup.section_id == section_id)
+            .group_by(AttendanceRollup.student_id)
+            .having(func.sum(AttendanceRollup.present) < func.sum(AttendanceRollup.total) * 0.75)
         )
-        att_res = await self.db.execute(att_stmt)
-        defaulters_count = 0
-        for row in att_res:
-            if row.total > 0:
-                if (row.present / row.total) < 0.75:
-                    defaulters_count += 1
+        defaulters_count = await self.db.scalar(
+            select(func.count()).select_from(att_stmt.subquery())
+        ) or 0
 
         return {
             "student_count": student_count,
@@ -3,6 +3,8 @@ from app.repository.base import BaseRepository
 from app.models.semester import Semester
 
 class SemesterRepository(BaseRepository[Semester]):
+    counter_key = "semesters"
+
     def __init__(self, db: AsyncSession):
         super().__init__(Semester, db)
     async def get_all(self, skip: int = 0, limit: int = 100, search: str = None) -> tuple[list[Semester], int]:
@@ -1,10 +1,29 @@
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import invalidate_students
 from app.repository.base import BaseRepository
 from app.models.subject import Subject
 
+# Transcript rows copy the subject's name and code
+TRANSCRIPT_FIELDS = {"name", "code"}
+
 class SubjectRepository(BaseRepository[Subject]):
     def __init__(self, db: AsyncSession):
         super().__init__(Subject, db)
+
+    async def update(self, db_obj: Subject, obj_in: dict) -> Subject:
+        if not TRANSCRIPT_FIELDS & obj_in.keys():
+            return await super().update(db_obj, obj_in)
+        from app.repository.transcript import TranscriptRepository
+        for field, value in obj_in.items():
+            setattr(db_obj, field, value)
+        await self.db.flush()
+        # Rewritten in the same transaction, so transcripts never show the old name
+        student_ids = await TranscriptRepository(self.db).refresh_subjects([db_obj.id])
+        await self.db.commit()
+        await self.db.refresh(db_obj)
+        await self._after_write(db_obj)
+        await invalidate_students(student_ids)
+        return db_obj
     async def get_all(self, skip: int = 0, limit: int = 100, search: str = None) -> tuple[list[Subject], int]:
         from sqlalchemy import select, func, or_
         from sqlalchemy.orm import joinedload
@@ -3,12 +3,16 @@ from uuid import UUID
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
+from app.core.cache import invalidate_sections
 from app.models.timetable import Timetable
 from app.repository.base import BaseRepository
 
 class TimetableRepository(BaseRepository[Timetable]):
     def __init__(self, db):
         super().__init__(Timetable, db)
+
+    async def _after_write(self, entry: Timetable):
+        await invalidate_sections([entry.section_id])
         
     async def get_by_section(self, section_id: UUID) -> List[Timetable]:
         query = (
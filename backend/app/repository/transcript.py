@@ -0,0 +1,127 @@
+from typing import Iterable, List, Optional
+from uuid import UUID
+from sqlalchemy import select, func, case, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.exam import Exam
+from app.models.exam_marks import ExamMarks, MarkStatus
+from app.models.section import Section
+from app.models.semester import Semester
+from app.models.subject import Subject
+from app.models.transcript_entry import TranscriptEntry
+from app.models.user import User, Role
+from app.services.grading_service import GradeScale
+
+TRANSCRIPT_COLUMNS = [
+    "student_id", "exam_id", "mark_id", "exam_name", "exam_date", "subject_id", "subject_name", "subject_code",
+    "section_id", "semester_id", "semester_number", "marks_obtained", "total_marks", "is_absent",
+    "percentage", "grade", "grade_point", "published_at",
+]
+
+
+class TranscriptRepository:
+    """
+    Keeps transcript_entries in step with approved exam marks.
+
+    Writes run inside the caller's transaction and do not commit, except
+    rebuild(), which replaces the whole table.
+    """
+
+    def __init__(self, db: AsyncSession, scale: Optional[GradeScale] = None):
+        self.db = db
+        self.scale = scale or GradeScale()
+
+    def _source(self):
+        """Approved students' marks with every transcript field joined in and graded."""
+        pct = case(
+            (Exam.total_marks > 0, func.coalesce(ExamMarks.marks_obtained, 0) * 100.0 / Exam.total_marks),
+            else_=0.0
+        )
+        return (
+            select(
+                ExamMarks.student_id,
+                ExamMarks.exam_id,
+                ExamMarks.id,
+                Exam.exam_name,
+                Exam.exam_date,
+                Exam.subject_id,
+                Subject.name,
+                Subject.code,
+                Exam.section_id,
+                Section.semester_id,
+                Semester.number,
+                ExamMarks.marks_obtained,
+                Exam.total_marks,
+                ExamMarks.is_absent,
+                pct,
+                self.scale.grade_expr(pct),
+                self.scale.grade_point_expr(pct),
+                func.timezone("utc", func.now()),
+            )
+            .join(Exam, ExamMarks.exam_id == Exam.id)
+            .join(Subject, Exam.subject_id == Subject.id)
+            .join(Section, Exam.section_id == Section.id)
+            .join(Semester, Section.semester_id == Semester.id)
+            .join(User, ExamMarks.student_id == User.id)
+            .where(ExamMarks.status == MarkStatus.APPROVED)
+            .where(User.role == Role.STUDENT)
+        )
+
+    async def _write(self, source) -> List[UUID]:
+        stmt = insert(TranscriptEntry).from_select(TRANSCRIPT_COLUMNS, source)
+        # A refreshed row keeps the time it was first published
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TranscriptEntry.student_id, TranscriptEntry.exam_id],
+            set_={column: stmt.excluded[column] for column in TRANSCRIPT_COLUMNS[2:] if column != "published_at"}
+        ).returning(TranscriptEntry.student_id)
+        result = await self.db.execute(stmt)
+        return result.scalars().all()
+
+    async def publish(self, mark_ids: Iterable[UUID]) -> List[UUID]:
+        """Write transcript rows for the given marks that are approved. Returns their students."""
+        mark_ids = list(mark_ids)
+        if not mark_ids:
+            return []
+        return await self._write(self._source().where(ExamMarks.id.in_(mark_ids)))
+
+    async def retract(self, mark_ids: Iterable[UUID]):
+        """Remove the transcript rows of marks that are no longer approved."""
+        mark_ids = list(mark_ids)
+        if mark_ids:
+            await self.db.execute(delete(TranscriptEntry).where(TranscriptEntry.mark_id.in_(mark_ids)))
+
+    async def refresh_exams(self, exam_ids: Iterable[UUID]) -> List[UUID]:
+        """Rewrite the rows of exams whose name, date or total marks changed. Returns their students."""
+        exam_ids = list(exam_ids)
+        if not exam_ids:
+            return []
+        return await self._write(self._source().where(ExamMarks.exam_id.in_(exam_ids)))
+
+    async def refresh_subjects(self, subject_ids: Iterable[UUID]) -> List[UUID]:
+        """Rewrite the rows of subjects whose name or code changed. Returns their students."""
+        subject_ids = list(subject_ids)
+        if not subject_ids:
+            return []
+        return await self._write(self._source().where(Exam.subject_id.in_(subject_ids)))
+
+    async def rebuild(self) -> int:
+        """
+        Recompute every transcript row from exam_marks, e.g. after a backfill
+        or a change to GRADE_BOUNDARIES. Returns the number of rows written.
+        """
+        await self.db.execute(delete(TranscriptEntry))
+        result = await self.db.execute(
+            insert(TranscriptEntry).from_select(TRANSCRIPT_COLUMNS, self._source())
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def get_for_student(self, student_id: UUID) -> List[TranscriptEntry]:
+        """A student's transcript, newest semester and exam first."""
+        result = await self.db.execute(
+            select(TranscriptEntry)
+            .where(TranscriptEntry.student_id == student_id)
+            .order_by(TranscriptEntry.semester_number.desc(), TranscriptEntry.exam_date.desc())
+        )
+        return result.scalars().all()
@@ -10,14 +10,17 @@
 # 4. Single place to modify if database queries need to change
 # =============================================================================
 
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User, Role
 from app.models.section import Section
+from app.core.cache import invalidate_students, invalidate_sections
 from app.core.security import hash_password
+from app.repository.entity_counter import EntityCounterRepository, ROLE_COUNTER_KEYS
 
 
 class UserRepository:
@@ -201,10 +204,26 @@ class UserRepository:
         
         # Add to session and flush to get the ID
         self.db.add(user)
+        if user.is_active is not False:
+            await EntityCounterRepository(self.db).increment(ROLE_COUNTER_KEYS.get(role))
         await self.db.commit()  # Commit the transaction to persist data
         await self.db.refresh(user)  # Reload the object with DB-generated values
         
         return user
+
+    async def insert_many(self, role: Role, users: List[dict]) -> List[str]:
+        """
+        Insert users with already hashed passwords in multi-row statements.
+        Rows whose email or roll number is taken in the meantime are skipped.
+        Does not commit. Returns the emails of the users inserted.
+        """
+        if not users:
+            return []
+        stmt = insert(User).on_conflict_do_nothing().returning(User.email)
+        result = await self.db.execute(stmt, [{**user, "role": role} for user in users])
+        inserted = result.scalars().all()
+        await EntityCounterRepository(self.db).increment(ROLE_COUNTER_KEYS.get(role), len(inserted))
+        return inserted
     
     # -------------------------------------------------------------------------
     # UPDATE Operations
@@ -257,6 +276,9 @@ class UserRepository:
         if not update_data:
             return await self.get_by_id(user_id)
         
+        if "is_active" in update_data:
+            await self._count_activation_change(user_id, update_data["is_active"])
+        
         query = (
             update(User)
             .where(User.id == user_id)
@@ -265,6 +287,10 @@ class UserRepository:
         
         await self.db.execute(query)
         await self.db.commit()
+        await invalidate_students([user_id])
+        if "section_id" in update_data:
+            # The student's new section lists them in its class performance
+            await invalidate_sections([update_data["section_id"]])
         return await self.get_by_id(user_id)
     
     async def deactivate_user(self, user_id: UUID) -> bool:
@@ -277,6 +303,8 @@ class UserRepository:
         Returns:
             True if deactivated, False if user not found
         """
+        await self._count_activation_change(user_id, False)
+        
         query = (
             update(User)
             .where(User.id == user_id)
@@ -285,8 +313,25 @@ class UserRepository:
         
         result = await self.db.execute(query)
         await self.db.commit()
+        await invalidate_students([user_id])
         return result.rowcount > 0
     
+    async def _count_activation_change(self, user_id: UUID, is_active: bool):
+        """
+        Adjust the active-user counter if this update flips is_active.
+        Locks the user row so concurrent (de)activations are counted once.
+        """
+        counters = EntityCounterRepository(self.db)
+        if not counters.enabled:
+            return
+        result = await self.db.execute(
+            select(User.role, User.is_active).where(User.id == user_id).with_for_update()
+        )
+        row = result.one_or_none()
+        if row is None or row.is_active == is_active:
+            return
+        await counters.increment(ROLE_COUNTER_KEYS.get(row.role), 1 if is_active else -1)
+    
     # -------------------------------------------------------------------------
     # STATS Operations
     # -------------------------------------------------------------------------
@@ -296,17 +341,17 @@ class UserRepository:
         Get overall attendance and performance stats for a student.
         """
         from sqlalchemy import func, select
-        from app.models.attendance import Attendance, AttendanceStatus
+        from app.models.attendance_rollup import AttendanceRollup
         from app.models.exam_marks import ExamMarks
         from app.models.exam import Exam
 
         # 1. Overall Attendance
         att_stmt = (
             select(
-                func.count(Attendance.id).label("total"),
-                func.count(Attendance.id).filter(Attendance.status == AttendanceStatus.PRESENT).label("present")
+                func.coalesce(func.sum(AttendanceRollup.total), 0).label("total"),
+                func.coalesce(func.sum(AttendanceRollup.present), 0).label("present")
             )
-            .where(Attendance.student_id == student_id)
+            .where(AttendanceRollup.student_id == student_id)
         )
         att_res = await self.db.execute(att_stmt)
         att_row = att_res.one()
@@ -85,6 +85,38 @@ class BulkAttendanceCreate(BaseModel):
     )
 
 
+class AttendanceSyncSheet(BulkAttendanceCreate):
+    """A bulk attendance sheet marked offline, tagged with a client-generated key."""
+    idempotency_key: str = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Unique per sheet for the submitting user; replays with the same key are skipped"
+    )
+
+
+class AttendanceSyncRequest(BaseModel):
+    """
+    Several offline-marked sheets submitted together.
+    
+    All sheets are applied in one transaction.
+    """
+    sheets: List[AttendanceSyncSheet] = Field(..., min_length=1, max_length=100)
+
+
+class CheckInSessionCreate(BaseModel):
+    """Open a short-lived code students use to check themselves in to a class."""
+    section_id: UUID = Field(..., description="Section UUID")
+    subject_id: UUID = Field(..., description="Subject UUID")
+    attendance_date: Optional[date] = Field(None, description="Date of the class; defaults to today")
+    duration_minutes: int = Field(5, ge=1, le=60, description="How long the code accepts check-ins")
+
+
+class CheckInRequest(BaseModel):
+    """A student's check-in with the code shown in class."""
+    code: str = Field(..., min_length=4, max_length=12)
+
+
 # =============================================================================
 # Attendance Response Schemas
 # =============================================================================
@@ -0,0 +1,185 @@
+import asyncio
+import secrets
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.core.cache import TTLCache, invalidate_students
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.attendance import AttendanceStatus
+from app.repository.attendance_import import AttendanceImportRepository, ImportRecord
+from app.repository.attendance_partition import ArchivedAttendanceError
+
+# Open check-in sessions by code; shared between workers when CACHE_BACKEND=redis
+checkin_sessions = TTLCache("checkin_sessions", ttl=300, max_entries=4096)
+
+CODE_ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+CODE_LENGTH = 6
+
+CheckInKey = Tuple[UUID, UUID, UUID, date]  # (student_id, section_id, subject_id, attendance_date)
+
+# Failures a single check-in can cause; a batch failing with one is split to find it
+RECORD_ERRORS = (IntegrityError, DataError, ArchivedAttendanceError)
+
+
+class CheckInBuffer:
+    """
+    Group commit for student check-ins.
+
+    Check-ins wait in an in-process buffer and are written together by one
+    flusher task: after the first arrival it waits `flush_interval` seconds
+    (or until `max_batch` are waiting), then upserts the whole batch in a
+    single transaction. Check-ins arriving during a flush go into the next
+    batch. Each caller is released only after its batch has committed. When
+    one bad check-in fails a batch, the batch is bisected so only that
+    check-in's callers see the error.
+
+    A check-in never overrides an existing mark: students a teacher has
+    already marked for the session keep their status, remarks and marker.
+    """
+
+    def __init__(self, flush_interval: float, max_batch: int):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending: List[Tuple[ImportRecord, asyncio.Future]] = []
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.written = 0
+
+    async def submit(self, record: ImportRecord):
+        """Queue a check-in and wait until it is durable. Raises if its batch failed."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((record, future))
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        await future
+
+    async def drain(self):
+        """Flush whatever is still buffered without waiting out the interval."""
+        if self._task is not None and not self._task.done():
+            self._full.set()
+            await self._task
+
+    async def _run(self):
+        # Exits once the buffer is empty; the next submit starts a new flusher
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            if len(self._pending) < self.max_batch:
+                self._full.clear()
+            await self._flush(batch)
+
+    async def _write(self, records: List[ImportRecord], failed: Dict[CheckInKey, Exception]) -> List[ImportRecord]:
+        """
+        Commit the records in one transaction. If a record-level error fails it,
+        retry each half on its own, down to single records, whose errors are
+        collected in `failed`. Returns the records committed.
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                await AttendanceImportRepository(db).merge(records, insert_only=True)
+                await db.commit()
+            return records
+        except RECORD_ERRORS as e:
+            if len(records) == 1:
+                failed[records[0][:4]] = e
+                return []
+        except Exception as e:
+            # Connection trouble and the like would fail every half as well
+            for record in records:
+                failed[record[:4]] = e
+            return []
+        middle = len(records) // 2
+        return await self._write(records[:middle], failed) + await self._write(records[middle:], failed)
+
+    async def _flush(self, batch: List[Tuple[ImportRecord, asyncio.Future]]):
+        # The same student checking in twice for a session is written once
+        records: Dict[CheckInKey, ImportRecord] = {}
+        waiting: Dict[CheckInKey, List[asyncio.Future]] = defaultdict(list)
+        for record, future in batch:
+            records[record[:4]] = record
+            waiting[record[:4]].append(future)
+        failed: Dict[CheckInKey, Exception] = {}
+        written = await self._write(list(records.values()), failed)
+        if written:
+            self.batches += 1
+            self.written += len(written)
+            await invalidate_students({record[0] for record in written})
+        for key, futures in waiting.items():
+            for future in futures:
+                if future.done():
+                    continue
+                if key in failed:
+                    future.set_exception(failed[key])
+                else:
+                    future.set_result(None)
+
+
+# Created by the app's lifespan handler so its event and flusher belong to the serving loop
+checkin_buffer: Optional[CheckInBuffer] = None
+
+
+def start_checkin_buffer() -> CheckInBuffer:
+    global checkin_buffer
+    checkin_buffer = CheckInBuffer(
+        flush_interval=settings.CHECKIN_FLUSH_INTERVAL_MS / 1000,
+        max_batch=settings.CHECKIN_MAX_BATCH
+    )
+    return checkin_buffer
+
+
+async def stop_checkin_buffer():
+    """Write out buffered check-ins before the app shuts down."""
+    if checkin_buffer is not None:
+        await checkin_buffer.drain()
+
+
+class AttendanceCheckInService:
+    @staticmethod
+    async def open_session(
+        section_id: UUID, subject_id: UUID, attendance_date: date, opened_by: UUID, duration_minutes: int
+    ) -> dict:
+        """Start accepting check-ins for a class under a new short code."""
+        code = "".join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+        while await checkin_sessions.get(code) is not None:
+            code = "".join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+        session = {
+            "code": code,
+            "section_id": section_id,
+            "subject_id": subject_id,
+            "attendance_date": attendance_date,
+            "opened_by": opened_by,
+            "expires_at": datetime.utcnow() + timedelta(minutes=duration_minutes),
+        }
+        await checkin_sessions.set(code, session, ttl=duration_minutes * 60)
+        return session
+
+    @staticmethod
+    async def get_session(code: str) -> Optional[dict]:
+        return await checkin_sessions.get(code.strip().upper())
+
+    @staticmethod
+    async def close_session(code: str):
+        await checkin_sessions.delete(code.strip().upper())
+
+    @staticmethod
+    async def check_in(session: dict, student_id: UUID):
+        """
+        Mark the student present for the session's class once the write is durable.
+        Students already marked for the class are left as they are.
+        """
+        if checkin_buffer is None:
+            raise RuntimeError("Check-in buffer is not running; start_checkin_buffer() runs in the app's lifespan")
+        await checkin_buffer.submit((
+            student_id, session["section_id"], session["subject_id"], session["attendance_date"],
+            AttendanceStatus.PRESENT, None, session["opened_by"]
+        ))
@@ -0,0 +1,217 @@
+import csv
+import io
+import importlib.util
+import tempfile
+from datetime import date
+from typing import Any, AsyncIterator, List, Optional, Sequence
+from uuid import UUID
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.attendance import Attendance, AttendanceStatus
+from app.models.user import User
+from app.repository.attendance_bitmap import bitmap_register_query
+
+# format -> (media type, file extension, optional package it needs)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv", None),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx", "openpyxl"),
+    "parquet": ("application/vnd.apache.parquet", "parquet", "pyarrow"),
+}
+
+EXPORT_LAYOUTS = ("long", "pivot")
+
+# Rows fetched per round trip from the server-side cursor
+FETCH_SIZE = 1000
+# Bytes buffered (CSV) or read (XLSX) per chunk sent
+CHUNK_BYTES = 64 * 1024
+# Rows handed to the XLSX or Parquet writer at once, in a worker thread off the event loop
+WRITE_BATCH_ROWS = 5000
+
+
+def missing_dependency(fmt: str) -> Optional[str]:
+    """Name of the optional package `fmt` needs if it is not installed."""
+    package = EXPORT_FORMATS[fmt][2]
+    if package and importlib.util.find_spec(package) is None:
+        return package
+    return None
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file that hands back what was written so far, keeping the true offset for Parquet."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class AttendanceExportService:
+    @staticmethod
+    async def iter_table(
+        section_id: UUID, subject_id: UUID, start_date: Optional[date] = None,
+        end_date: Optional[date] = None, layout: str = "long"
+    ) -> AsyncIterator[Sequence[Any]]:
+        """
+        Header followed by data rows, read through a server-side cursor.
+
+        The long layout has one row per attendance record. The pivot layout has
+        one row per student and one column per class date; rows arrive ordered
+        by student, so only the current student's row is held in memory.
+        """
+        if settings.ATTENDANCE_STORAGE == "bitmap":
+            source = bitmap_register_query(section_id, subject_id)
+        else:
+            source = (
+                select(
+                    Attendance.student_id,
+                    Attendance.attendance_date,
+                    (Attendance.status == AttendanceStatus.PRESENT).label("is_present"),
+                    Attendance.remarks
+                )
+                .where(Attendance.section_id == section_id, Attendance.subject_id == subject_id)
+            )
+        register = source.subquery()
+        filters = []
+        if start_date:
+            filters.append(register.c.attendance_date >= start_date)
+        if end_date:
+            filters.append(register.c.attendance_date <= end_date)
+
+        stmt = (
+            select(register, User.roll_no, User.first_name, User.last_name)
+            .join(User, register.c.student_id == User.id)
+            .where(*filters)
+            .order_by(User.roll_no, register.c.student_id, register.c.attendance_date)
+            .execution_options(yield_per=FETCH_SIZE)
+        )
+
+        # A dedicated session: the response body is produced after the request's session is gone
+        async with AsyncSessionLocal() as session:
+            if layout == "long":
+                yield ["Roll No", "Name", "Date", "Status", "Remarks"]
+                async for row in await session.stream(stmt):
+                    yield [
+                        row.roll_no, f"{row.first_name} {row.last_name}",
+                        row.attendance_date.isoformat(), "present" if row.is_present else "absent", row.remarks or ""
+                    ]
+                return
+
+            dates = (await session.execute(
+                select(register.c.attendance_date).where(*filters).distinct().order_by(register.c.attendance_date)
+            )).scalars().all()
+            yield ["Roll No", "Name", *(day.isoformat() for day in dates), "Present", "Total", "Percentage"]
+
+            current = None
+            marks = {}
+
+            def student_row():
+                present = sum(1 for is_present in marks.values() if is_present)
+                total = len(marks)
+                cells = [("P" if marks[day] else "A") if day in marks else "" for day in dates]
+                pct = round(present / total * 100, 1) if total else 0
+                return [current.roll_no, f"{current.first_name} {current.last_name}", *cells, present, total, pct]
+
+            async for row in await session.stream(stmt):
+                if current is not None and row.student_id != current.student_id:
+                    yield student_row()
+                    marks = {}
+                current = row
+                marks[row.attendance_date] = row.is_present
+            if current is not None:
+                yield student_row()
+
+    @staticmethod
+    async def _csv(table: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        async for row in table:
+            writer.writerow(row)
+            if buffer.tell() >= CHUNK_BYTES:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode()
+
+    @staticmethod
+    async def _xlsx(table: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+        from openpyxl import Workbook
+
+        # Write-only workbooks spool rows to disk instead of keeping cells in memory
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Attendance")
+
+        def append(batch):
+            for row in batch:
+                sheet.append(list(row))
+
+        batch = []
+        async for row in table:
+            batch.append(row)
+            if len(batch) >= WRITE_BATCH_ROWS:
+                await run_in_threadpool(append, batch)
+                batch = []
+        await run_in_threadpool(append, batch)
+        # Saving zips the spooled sheet, so it and the reads run in a worker thread
+        with tempfile.TemporaryFile() as file:
+            await run_in_threadpool(workbook.save, file)
+            file.seek(0)
+            while chunk := await run_in_threadpool(file.read, CHUNK_BYTES):
+                yield chunk
+
+    @staticmethod
+    async def _parquet(table: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        header = await table.__anext__()
+        schema = pa.schema([(str(name), pa.string()) for name in header])
+        sink = _DrainableSink()
+        writer = await run_in_threadpool(pq.ParquetWriter, sink, schema)
+
+        def write(batch):
+            columns = [pa.array([None if v is None else str(v) for v in column], pa.string()) for column in zip(*batch)]
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+
+        batch = []
+        async for row in table:
+            batch.append(row)
+            if len(batch) >= WRITE_BATCH_ROWS:
+                await run_in_threadpool(write, batch)
+                batch = []
+                yield sink.drain()
+        if batch:
+            await run_in_threadpool(write, batch)
+        await run_in_threadpool(writer.close)
+        yield sink.drain()
+
+    @staticmethod
+    def stream(
+        fmt: str, section_id: UUID, subject_id: UUID, start_date: Optional[date] = None,
+        end_date: Optional[date] = None, layout: str = "long"
+    ) -> AsyncIterator[bytes]:
+        """Encoded export body for a StreamingResponse."""
+        table = AttendanceExportService.iter_table(section_id, subject_id, start_date, end_date, layout)
+        writers = {
+            "csv": AttendanceExportService._csv,
+            "xlsx": AttendanceExportService._xlsx,
+            "parquet": AttendanceExportService._parquet,
+        }
+        return writers[fmt](table)
@@ -0,0 +1,125 @@
+import csv
+import io
+from datetime import date
+from typing import Dict, Iterable, List, Tuple
+from uuid import UUID
+from sqlalchemy import select, any_, literal, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import invalidate_students
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.jobs import Job
+from app.models.attendance import AttendanceStatus
+from app.models.subject import Subject
+from app.models.user import User, Role
+from app.repository.attendance_import import AttendanceImportRepository, ImportRecord
+from app.repository.attendance_partition import AttendancePartitionRepository
+
+IMPORT_HEADERS = {"roll_no", "subject_code", "date", "status"}
+
+# Accepted spellings of a status, beyond the enum values themselves
+STATUS_ALIASES = {"p": AttendanceStatus.PRESENT, "a": AttendanceStatus.ABSENT}
+
+
+def parse_status(value: str) -> AttendanceStatus:
+    value = value.strip().lower()
+    if value in STATUS_ALIASES:
+        return STATUS_ALIASES[value]
+    return AttendanceStatus(value)
+
+
+class AttendanceImportService:
+    @staticmethod
+    def missing_headers(content: bytes) -> List[str]:
+        reader = csv.reader(io.StringIO(content.decode("utf-8-sig")))
+        header = next(reader, [])
+        return sorted(IMPORT_HEADERS - {name.strip() for name in header})
+
+    @staticmethod
+    async def _prefetch(
+        db: AsyncSession, roll_nos: Iterable[str], subject_codes: Iterable[str]
+    ) -> Tuple[Dict[str, Tuple[UUID, UUID]], Dict[str, UUID]]:
+        """
+        Resolve every roll number and subject code in the file with one query each.
+        The values are bound as one array each, so file size is not limited by bind parameters.
+        """
+        students = await db.execute(
+            select(User.roll_no, User.id, User.section_id)
+            .where(User.role == Role.STUDENT)
+            .where(User.roll_no == any_(literal(list(roll_nos), ARRAY(String))))
+        )
+        subjects = await db.execute(
+            select(Subject.code, Subject.id).where(Subject.code == any_(literal(list(subject_codes), ARRAY(String))))
+        )
+        return (
+            {row.roll_no: (row.id, row.section_id) for row in students},
+            {row.code: row.id for row in subjects}
+        )
+
+    @staticmethod
+    async def run(job: Job, content: bytes, marked_by: UUID):
+        """
+        Import a CSV of (roll_no, subject_code, date, status) into attendance,
+        with an optional remarks column.
+
+        Rows that cannot be resolved or parsed are reported on the job and
+        skipped; a later row for the same student, subject and date wins.
+        """
+        try:
+            rows = list(csv.DictReader(io.StringIO(content.decode("utf-8-sig"))))
+            job.start("resolving", total=len(rows))
+            async with AsyncSessionLocal() as db:
+                students, subjects = await AttendanceImportService._prefetch(
+                    db,
+                    {(row.get("roll_no") or "").strip() for row in rows},
+                    {(row.get("subject_code") or "").strip() for row in rows}
+                )
+
+                cutoff = None
+                if settings.ATTENDANCE_STORAGE != "bitmap":
+                    cutoff = await AttendancePartitionRepository(db).archive_cutoff()
+
+                records: Dict[Tuple[UUID, UUID, UUID, date], ImportRecord] = {}
+                for line, row in enumerate(rows, start=2):  # Header is line 1
+                    roll_no = (row.get("roll_no") or "").strip()
+                    subject_code = (row.get("subject_code") or "").strip()
+                    student = students.get(roll_no)
+                    if student is None:
+                        job.error(f"Row {line}: Student with roll number {roll_no!r} not found")
+                        continue
+                    student_id, section_id = student
+                    if section_id is None:
+                        job.error(f"Row {line}: Student {roll_no} is not assigned to a section")
+                        continue
+                    subject_id = subjects.get(subject_code)
+                    if subject_id is None:
+                        job.error(f"Row {line}: Subject code {subject_code!r} not found")
+                        continue
+                    try:
+                        attendance_date = date.fromisoformat((row.get("date") or "").strip())
+                    except ValueError:
+                        job.error(f"Row {line}: Invalid date {row.get('date')!r}, expected YYYY-MM-DD")
+                        continue
+                    try:
+                        status = parse_status(row.get("status") or "")
+                    except ValueError:
+                        job.error(f"Row {line}: Invalid status {row.get('status')!r}, expected present or absent")
+                        continue
+                    if cutoff and attendance_date < cutoff:
+                        job.error(f"Row {line}: Attendance before {cutoff.isoformat()} is archived")
+                        continue
+                    key = (student_id, subject_id, section_id, attendance_date)
+                    remarks = (row.get("remarks") or "").strip()[:255] or None
+                    records[key] = (student_id, section_id, subject_id, attendance_date, status, remarks, marked_by)
+
+                job.start("writing", total=len(records))
+                job.processed = 0
+                counts = await AttendanceImportRepository(db).import_records(
+                    list(records.values()), on_progress=job.advance
+                )
+            await invalidate_students({record[0] for record in records.values()})
+            job.finish(rows=len(rows), skipped=job.error_count, **counts)
+        except Exception as e:
+            job.fail(str(e))
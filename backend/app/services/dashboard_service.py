@@ -3,8 +3,7 @@ import sys
 from typing import List, Dict, Any, Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc, and_
-from sqlalchemy.orm import joinedload
+from sqlalchemy import select, func, desc, and_, case, tuple_
 
 from app.models.user import User, Role
 from app.models.branch import Branch
@@ -13,148 +12,152 @@ from app.models.semester import Semester
 from app.models.exam import Exam
 from app.models.exam_marks import ExamMarks, MarkStatus
 from app.models.leave_application import LeaveApplication, LeaveStatus
-from app.models.attendance import Attendance, AttendanceStatus
+from app.models.attendance_rollup import AttendanceRollup
 from app.models.timetable import Timetable
 from app.models.subject import Subject, SubjectType
 from app.models.student_elective import StudentElective
 from app.models.teacher_assignment import TeacherAssignment
+from app.models.transcript_entry import TranscriptEntry
+from app.core.pagination import encode_cursor, decode_cursor
+from app.core.cache import dashboard_cache, cached, tag
 from app.repository.user import UserRepository
 from app.repository.attendance import AttendanceRepository
+from app.repository.branch_performance import BranchPerformanceRepository
+from app.repository.transcript import TranscriptRepository
+from app.repository.entity_counter import EntityCounterRepository, counter_sources, active_exams_source
+from app.services.grading_service import GradeScale, GradingService
 
 class DashboardService:
     @staticmethod
+    @cached(dashboard_cache, key=lambda db: (), tags=lambda result, db: [tag("branch"), tag("exam")])
     async def get_performance_stats(db: AsyncSession) -> List[Dict[str, Any]]:
-        try:
-            branches = await db.execute(select(Branch).where(Branch.is_active == True))
-            branches = branches.scalars().all()
-            
-            data = []
-            for branch in branches:
-                stmt = (
-                    select(func.avg(ExamMarks.marks_obtained * 100.0 / Exam.total_marks))
-                    .select_from(ExamMarks)
-                    .join(Exam, ExamMarks.exam_id == Exam.id)
-                    .join(User, ExamMarks.student_id == User.id)
-                    .where(User.branch_id == branch.id)
-                    .where(User.role == Role.STUDENT)
-                )
-                result = await db.execute(stmt)
-                avg_score = result.scalar()
-                
-                data.append({
-                    "name": branch.name,
-                    "code": branch.code,
-                    "average": round(float(avg_score), 1) if avg_score else 0
-                })
-            return data
-        except Exception as e:
-            print(f"Error in get_performance_stats: {e}")
-            return []
+        # Averages are maintained incrementally by ExamMarksRepository
+        return await BranchPerformanceRepository(db).get_active_branches()
 
     @staticmethod
-    async def get_defaulters(db: AsyncSession, threshold: float = 75.0) -> List[Dict[str, Any]]:
-        try:
-            stmt = (
-                select(
-                    Attendance.student_id,
-                    Subject.name.label("subject_name"),
-                    func.count(Attendance.id).label("total_classes"),
-                    func.count(Attendance.id).filter(Attendance.status == AttendanceStatus.PRESENT).label("present_classes")
-                )
-                .join(Subject, Attendance.subject_id == Subject.id)
-                .group_by(Attendance.student_id, Subject.id, Subject.name)
+    @cached(
+        dashboard_cache,
+        key=lambda db, threshold=75.0, branch_id=None, semester_id=None, section_id=None, cursor=None, limit=50: (
+            threshold, branch_id, semester_id, section_id, cursor, limit
+        ),
+        tags=lambda result, *args, **kwargs: [tag("student"), tag("section"), tag("branch")]
+    )
+    async def get_defaulters(
+        db: AsyncSession,
+        threshold: float = 75.0,
+        branch_id: Optional[UUID] = None,
+        semester_id: Optional[UUID] = None,
+        section_id: Optional[UUID] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Students whose attendance in any subject is below the threshold, worst first.
+
+        Each student appears once, with the subject where their attendance is lowest.
+        Pages are keyed on (attendance_pct, student_id); pass back `next_cursor`
+        to continue. Raises ValueError for a malformed cursor.
+        """
+        after = None
+        if cursor:
+            cursor_pct, cursor_id = decode_cursor(cursor, 2)
+            after = (float(cursor_pct), UUID(cursor_id))
+
+        # Per-subject totals come from the maintained rollup instead of scanning attendance
+        total_col = func.sum(AttendanceRollup.total)
+        present_col = func.sum(AttendanceRollup.present)
+        per_subject = (
+            select(
+                AttendanceRollup.student_id,
+                AttendanceRollup.subject_id,
+                total_col.label("total"),
+                present_col.label("present"),
+                (present_col * 100.0 / total_col).label("pct")
             )
-            
-            results = await db.execute(stmt)
-            defaulters_map = {}
-            
-            for row in results:
-                s_id = row.student_id
-                subject_name = row.subject_name
-                total = row.total_classes
-                present = row.present_classes
-                
-                if total > 0:
-                    pct = (present / total) * 100
-                    if pct < threshold:
-                        if s_id in defaulters_map:
-                            if pct < defaulters_map[s_id]["percentage"]:
-                                defaulters_map[s_id] = {
-                                    "percentage": round(pct, 1),
-                                    "subject_cause": subject_name,
-                                    "total": total,
-                                    "present": present
-                                }
-                        else:
-                            defaulters_map[s_id] = {
-                                "percentage": round(pct, 1),
-                                "subject_cause": subject_name,
-                                "total": total,
-                                "present": present
-                            }
-
-            student_ids = list(defaulters_map.keys())
-            if not student_ids:
-                return []
-                
-            users_query = (
-                select(User)
-                .options(
-                    joinedload(User.branch),
-                    joinedload(User.section).joinedload(Section.semester)
-                )
-                .where(User.id.in_(student_ids))
+            .join(User, AttendanceRollup.student_id == User.id)
+            .group_by(AttendanceRollup.student_id, AttendanceRollup.subject_id)
+            .having(present_col * 100.0 < total_col * threshold)
+        )
+        if branch_id:
+            per_subject = per_subject.where(User.branch_id == branch_id)
+        if section_id:
+            per_subject = per_subject.where(User.section_id == section_id)
+        if semester_id:
+            per_subject = per_subject.where(User.section.has(Section.semester_id == semester_id))
+        per_subject = per_subject.subquery()
+
+        # Keep only each student's worst subject
+        worst = (
+            select(per_subject)
+            .distinct(per_subject.c.student_id)
+            .order_by(per_subject.c.student_id, per_subject.c.pct, per_subject.c.subject_id)
+            .subquery()
+        )
+        # Total is counted before the cursor filter so every page reports the full size
+        ranked = select(worst, func.count().over().label("total_defaulters")).subquery()
+
+        stmt = (
+            select(
+                ranked,
+                User.first_name,
+                User.last_name,
+                User.roll_no,
+                Branch.code.label("branch_code"),
+                Section.name.label("section_name"),
+                Semester.number.label("semester_number"),
+                Subject.name.label("subject_name")
             )
-            users_res = await db.execute(users_query)
-            students = users_res.scalars().all()
+            .select_from(ranked)
+            .join(User, ranked.c.student_id == User.id)
+            .join(Subject, ranked.c.subject_id == Subject.id)
+            .outerjoin(Branch, User.branch_id == Branch.id)
+            .outerjoin(Section, User.section_id == Section.id)
+            .outerjoin(Semester, Section.semester_id == Semester.id)
+            .order_by(ranked.c.pct, ranked.c.student_id)
+            .limit(limit + 1)
+        )
+        if after:
+            stmt = stmt.where(tuple_(ranked.c.pct, ranked.c.student_id) > tuple_(*after))
+
+        rows = (await db.execute(stmt)).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        defaulters = []
+        for row in rows:
+            semester = f"Sem {row.semester_number}" if row.semester_number is not None else "N/A"
+            section = row.section_name or "N/A"
+            class_info = f"{semester} - {section}"
+            if row.subject_name:
+                class_info += f" ({row.subject_name})"
             
-            defaulters = []
-            for student in students:
-                if student.id not in defaulters_map:
-                    continue
-                stat = defaulters_map[student.id]
-                branch_code = student.branch.code if student.branch else "N/A"
-                semester = f"Sem {student.section.semester.number}" if (student.section and student.section.semester) else "N/A"
-                section = student.section.name if student.section else "N/A"
-                class_info = f"{semester} - {section}"
-                if stat["subject_cause"]:
-                    class_info += f" ({stat['subject_cause']})"
-                
-                defaulters.append({
-                    "id": str(student.id),
-                    "name": f"{student.first_name} {student.last_name}",
-                    "roll_no": student.roll_no,
-                    "branch": branch_code,
-                    "class_info": class_info,
-                    "attendance_pct": stat["percentage"],
-                    "classes_attended": f"{stat['present']}/{stat['total']}"
-                })
-                
-            defaulters.sort(key=lambda x: x["attendance_pct"])
-            return defaulters
-        except Exception as e:
-            print(f"Error fetching defaulters: {e}")
-            return []
+            defaulters.append({
+                "id": str(row.student_id),
+                "name": f"{row.first_name} {row.last_name}",
+                "roll_no": row.roll_no,
+                "branch": row.branch_code or "N/A",
+                "class_info": class_info,
+                "attendance_pct": round(float(row.pct), 1),
+                "classes_attended": f"{row.present}/{row.total}"
+            })
+
+        return {
+            "items": defaulters,
+            "total": rows[0].total_defaulters if rows else 0,
+            "next_cursor": encode_cursor(rows[-1].pct, rows[-1].student_id) if has_more else None,
+            "limit": limit
+        }
 
     @staticmethod
     async def get_admin_stats(db: AsyncSession) -> Dict[str, Any]:
-        students = await db.scalar(select(func.count()).select_from(User).where(User.role == Role.STUDENT))
-        teachers = await db.scalar(select(func.count()).select_from(User).where(User.role == Role.TEACHER))
-        branches = await db.scalar(select(func.count()).select_from(Branch))
-        sections = await db.scalar(select(func.count()).select_from(Section))
-        semesters = await db.scalar(select(func.count()).select_from(Semester))
-        
-        pending_leaves = await db.scalar(
-            select(func.count())
-            .select_from(LeaveApplication)
-            .where(LeaveApplication.status == LeaveStatus.PENDING)
-        )
-        
-        active_exams = await db.scalar(
-            select(func.count())
-            .select_from(Exam)
-            .where(Exam.exam_date >= date.today())
-        )
+        counter_repo = EntityCounterRepository(db)
+        if counter_repo.enabled:
+            counts = await counter_repo.get_many(list(counter_sources().keys()))
+            counts["active_exams"] = await db.scalar(active_exams_source())
+        else:
+            # All counts in a single round trip
+            counts = await counter_repo.count_all()
         
         stmt = (
             select(LeaveApplication, User)
@@ -185,13 +188,13 @@ class DashboardService:
 
         return {
             "counts": {
-                "students": students,
-                "teachers": teachers,
-                "branches": branches,
-                "sections": sections,
-                "semesters": semesters,
-                "pending_leaves": pending_leaves,
-                "active_exams": active_exams
+                "students": counts["students"],
+                "teachers": counts["teachers"],
+                "branches": counts["branches"],
+                "sections": counts["sections"],
+                "semesters": counts["semesters"],
+                "pending_leaves": counts["pending_leaves"],
+                "active_exams": counts["active_exams"]
             },
             "recent_activity": activity_log,
             "exam_performance": exam_performance
@@ -199,18 +202,36 @@ class DashboardService:
 
     @staticmethod
     async def get_student_dashboard_stats(db: AsyncSession, user_id: UUID) -> Dict[str, Any]:
+        # Snapshots are per day because today's classes and upcoming exams depend on the date
+        cache_key = ("student_dashboard", str(user_id), date.today().isoformat())
+        snapshot = await dashboard_cache.get(cache_key)
+        if snapshot is not None:
+            return snapshot
+
+        generation = await dashboard_cache.generation()
         user_repo = UserRepository(db)
         student = await user_repo.get_with_details(user_id)
         if not student:
             return {"error": "Student not found"}
 
+        snapshot = await DashboardService._build_student_dashboard(db, student)
+        tags = [tag("student", student.id)]
+        if student.section_id:
+            tags.append(tag("section", student.section_id))
+        await dashboard_cache.set(cache_key, snapshot, ttl=600, tags=tags, generation=generation)
+        return snapshot
+
+    @staticmethod
+    async def _build_student_dashboard(db: AsyncSession, student: User) -> Dict[str, Any]:
         # 1. Overall Attendance
-        total_classes = await db.scalar(select(func.count(Attendance.id)).where(Attendance.student_id == student.id)) or 0
-        present_classes = await db.scalar(
-            select(func.count(Attendance.id))
-            .where(Attendance.student_id == student.id)
-            .where(Attendance.status == AttendanceStatus.PRESENT)
-        ) or 0
+        overall = (await db.execute(
+            select(
+                func.coalesce(func.sum(AttendanceRollup.total), 0).label("total"),
+                func.coalesce(func.sum(AttendanceRollup.present), 0).label("present")
+            )
+            .where(AttendanceRollup.student_id == student.id)
+        )).one()
+        total_classes, present_classes = overall.total, overall.present
         attendance_pct = (present_classes / total_classes * 100) if total_classes > 0 else 0
 
         # 2. Today's Classes
@@ -306,11 +327,11 @@ class DashboardService:
             select(
                 Subject.id,
                 Subject.name,
-                func.count(Attendance.id).label("total"),
-                func.count(Attendance.id).filter(Attendance.status == AttendanceStatus.PRESENT).label("present")
+                func.sum(AttendanceRollup.total).label("total"),
+                func.sum(AttendanceRollup.present).label("present")
             )
-            .join(Attendance, Subject.id == Attendance.subject_id)
-            .where(Attendance.student_id == student.id)
+            .join(AttendanceRollup, Subject.id == AttendanceRollup.subject_id)
+            .where(AttendanceRollup.student_id == student.id)
             .group_by(Subject.id, Subject.name)
         )
         prog_res = await db.execute(prog_stmt)
@@ -331,48 +352,45 @@ class DashboardService:
                 "present": data["present"]
             })
 
-        # 5. Full Performance History
+        # 5. Full Performance History, read from the student's transcript rows
+        scale = GradeScale()
         performance = {}
-        perf_stmt = (
-            select(ExamMarks, Exam, Subject, Semester)
-            .join(Exam, ExamMarks.exam_id == Exam.id)
-            .join(Subject, Exam.subject_id == Subject.id)
-            .join(Section, Exam.section_id == Section.id)
-            .join(Semester, Section.semester_id == Semester.id)
-            .where(ExamMarks.student_id == student.id)
-            .where(ExamMarks.status == "APPROVED")
-            .order_by(Semester.number.desc(), Exam.exam_date.desc())
-        )
-        perf_res = await db.execute(perf_stmt)
+        entries = await TranscriptRepository(db).get_for_student(student.id)
         
-        for marks, exam, subj, sem in perf_res:
-            sem_key = f"Semester {sem.number}"
+        for entry in entries:
+            sem_key = f"Semester {entry.semester_number}"
             if sem_key not in performance:
-                performance[sem_key] = {"exams": {}, "total_pct": 0, "exam_count": 0}
+                performance[sem_key] = {"exams": {}, "total_pct": 0, "sgpa": 0, "exam_count": 0}
                 
-            if exam.exam_name not in performance[sem_key]["exams"]:
-                performance[sem_key]["exams"][exam.exam_name] = {
-                    "date": exam.exam_date.isoformat(),
+            if entry.exam_name not in performance[sem_key]["exams"]:
+                performance[sem_key]["exams"][entry.exam_name] = {
+                    "date": entry.exam_date.isoformat(),
                     "subjects": [],
                     "avg": 0
                 }
                 performance[sem_key]["exam_count"] += 1
                 
-            pct = (marks.marks_obtained / exam.total_marks * 100) if exam.total_marks > 0 else 0
-            performance[sem_key]["exams"][exam.exam_name]["subjects"].append({
-                "name": subj.name,
-                "marks": marks.marks_obtained,
-                "total": exam.total_marks,
-                "pct": round(pct, 1)
+            performance[sem_key]["exams"][entry.exam_name]["subjects"].append({
+                "name": entry.subject_name,
+                "marks": entry.marks_obtained,
+                "total": entry.total_marks,
+                "pct": round(entry.percentage, 1),
+                "grade": entry.grade
             })
 
         for sem in performance.values():
-            total_sem_pct = 0
             for exam in sem["exams"].values():
                 exam_avg = sum(s["pct"] for s in exam["subjects"]) / len(exam["subjects"]) if exam["subjects"] else 0
                 exam["avg"] = round(exam_avg, 1)
-                total_sem_pct += exam_avg
-            sem["total_pct"] = round(total_sem_pct / sem["exam_count"], 1) if sem["exam_count"] > 0 else 0
+
+        # Semester totals and GPAs pool the same rows the way published results do
+        summary = GradingService.summarize_transcript(entries, scale)
+        cgpa = summary["cgpa"]
+        for sem_result in summary["semesters"]:
+            sem = performance.get(f"Semester {sem_result['semester']}")
+            if sem:
+                sem["total_pct"] = sem_result["percentage"]
+                sem["sgpa"] = sem_result["sgpa"]
 
         # 6. Weekly Timetable Summary
         weekly_summary = []
@@ -402,6 +420,7 @@ class DashboardService:
             "course_progress": course_progress,
             "semester": semester_info,
             "performance_history": performance,
+            "cgpa": cgpa,
             "weekly_summary": weekly_summary
         }
 
@@ -501,33 +520,56 @@ class DashboardService:
         }
 
     @staticmethod
+    @cached(
+        dashboard_cache,
+        key=lambda db, section_id, subject_id: (section_id, subject_id),
+        tags=lambda result, db, section_id, subject_id: (
+            [tag("section", section_id)] + [tag("student", row["id"]) for row in result]
+        )
+    )
     async def get_class_performance(db: AsyncSession, section_id: str, subject_id: str) -> List[Dict[str, Any]]:
         att_repo = AttendanceRepository(db)
         students = await att_repo.get_students_for_section(section_id)
-        performance_data = []
+        if not students:
+            return []
+        student_ids = [student["id"] for student in students]
 
-        for student in students:
-            student_id = student["id"]
-            
-            total_classes = await db.scalar(
-                select(func.count(Attendance.id))
-                .where(Attendance.student_id == student_id)
-                .where(Attendance.subject_id == subject_id)
-            )
-            present_classes = await db.scalar(
-                select(func.count(Attendance.id))
-                .where(Attendance.student_id == student_id)
-                .where(Attendance.subject_id == subject_id)
-                .where(Attendance.status == AttendanceStatus.PRESENT)
+        # Attendance and exam averages for the whole section, one grouped query each
+        att_stmt = (
+            select(
+                AttendanceRollup.student_id,
+                func.sum(AttendanceRollup.total).label("total"),
+                func.sum(AttendanceRollup.present).label("present")
             )
-            att_pct = (present_classes / total_classes * 100) if total_classes and total_classes > 0 else 0
-            
-            exam_avg = await db.scalar(
-                select(func.avg((ExamMarks.marks_obtained / Exam.total_marks) * 100))
-                .join(Exam, ExamMarks.exam_id == Exam.id)
-                .where(ExamMarks.student_id == student_id)
-                .where(Exam.subject_id == subject_id)
+            .where(AttendanceRollup.student_id.in_(student_ids))
+            .where(AttendanceRollup.subject_id == subject_id)
+            .group_by(AttendanceRollup.student_id)
+        )
+        att_res = await db.execute(att_stmt)
+        attendance = {str(row.student_id): (row.total, row.present) for row in att_res}
+
+        exam_stmt = (
+            select(
+                ExamMarks.student_id,
+                func.avg(ExamMarks.marks_obtained * 100.0 / Exam.total_marks).label("average")
             )
+            .join(Exam, ExamMarks.exam_id == Exam.id)
+            .where(ExamMarks.student_id.in_(student_ids))
+            .where(Exam.subject_id == subject_id)
+            .group_by(ExamMarks.student_id)
+        )
+        exam_res = await db.execute(exam_stmt)
+        exam_averages = {
+            str(row.student_id): float(row.average)
+            for row in exam_res if row.average is not None
+        }
+
+        performance_data = []
+        for student in students:
+            student_id = student["id"]
+            total_classes, present_classes = attendance.get(student_id, (0, 0))
+            att_pct = (present_classes / total_classes * 100) if total_classes > 0 else 0
+            exam_avg = exam_averages.get(student_id)
             
             status = "Good"
             if att_pct < 75:
@@ -550,6 +592,11 @@ class DashboardService:
         return performance_data
 
     @staticmethod
+    @cached(
+        dashboard_cache,
+        key=lambda db, user_id: (user_id,),
+        tags=lambda result, db, user_id: [tag("student", user_id), tag("section")]
+    )
     async def get_student_timetable(db: AsyncSession, user_id: UUID) -> List[Dict[str, Any]]:
         user_repo = UserRepository(db)
         student = await user_repo.get_with_details(user_id)
@@ -581,37 +628,30 @@ class DashboardService:
         return timetable_data
 
     @staticmethod
+    @cached(
+        dashboard_cache,
+        key=lambda db, user_id: (user_id,),
+        tags=lambda result, db, user_id: [tag("student", user_id)]
+    )
     async def get_student_results(db: AsyncSession, user_id: UUID) -> List[Dict[str, Any]]:
         stmt = (
-            select(ExamMarks, Exam, Subject)
-            .join(Exam, ExamMarks.exam_id == Exam.id)
-            .join(Subject, Exam.subject_id == Subject.id)
-            .where(ExamMarks.student_id == user_id)
-            .where(ExamMarks.status == "APPROVED")
-            .order_by(desc(Exam.exam_date))
+            select(TranscriptEntry)
+            .where(TranscriptEntry.student_id == user_id)
+            .order_by(desc(TranscriptEntry.exam_date))
         )
         result = await db.execute(stmt)
         
         results_data = []
-        for marks, exam, subj in result:
-            pct = (marks.marks_obtained / exam.total_marks) * 100 if exam.total_marks > 0 else 0
-            grade = "F"
-            if pct >= 90: grade = "O"
-            elif pct >= 80: grade = "A+"
-            elif pct >= 70: grade = "A"
-            elif pct >= 60: grade = "B+"
-            elif pct >= 50: grade = "B"
-            elif pct >= 40: grade = "C"
-            
+        for entry in result.scalars():
             results_data.append({
-                "id": str(marks.id),
-                "exam_name": exam.exam_name,
-                "subject": subj.name,
-                "date": exam.exam_date.isoformat(),
-                "score": marks.marks_obtained,
-                "total": exam.total_marks,
-                "grade": grade,
-                "is_absent": marks.is_absent
+                "id": str(entry.mark_id),
+                "exam_name": entry.exam_name,
+                "subject": entry.subject_name,
+                "date": entry.exam_date.isoformat(),
+                "score": entry.marks_obtained,
+                "total": entry.total_marks,
+                "grade": entry.grade,
+                "is_absent": entry.is_absent
             })
         return results_data
     
@@ -640,42 +680,50 @@ class DashboardService:
         return timetable_data
 
     @staticmethod
+    @cached(
+        dashboard_cache,
+        key=lambda db, section_id, subject_id: (section_id, subject_id),
+        tags=lambda result, db, section_id, subject_id: (
+            [tag("section", section_id)] + [tag("exam", row["exam_id"]) for row in result]
+        )
+    )
     async def get_teacher_exam_performance(db: AsyncSession, section_id: UUID, subject_id: UUID) -> List[Dict[str, Any]]:
-        stmt_exams = (
-            select(Exam)
+        # Only approved marks feed the score statistics; counts cover every submission
+        approved_marks = case((ExamMarks.status == MarkStatus.APPROVED, ExamMarks.marks_obtained))
+        stmt = (
+            select(
+                Exam.id,
+                Exam.exam_name,
+                Exam.exam_date,
+                func.avg(approved_marks).label("average"),
+                func.min(approved_marks).label("min"),
+                func.max(approved_marks).label("max"),
+                func.percentile_cont(0.5).within_group(approved_marks).label("median"),
+                func.stddev_pop(approved_marks).label("std_dev"),
+                func.count(ExamMarks.id).label("total_students"),
+                func.count(ExamMarks.id).filter(ExamMarks.marks_obtained < Exam.total_marks * 0.4).label("fail_count")
+            )
+            .outerjoin(ExamMarks, ExamMarks.exam_id == Exam.id)
             .where(Exam.section_id == section_id, Exam.subject_id == subject_id)
+            .group_by(Exam.id)
             .order_by(Exam.exam_date.asc())
         )
-        result_exams = await db.execute(stmt_exams)
-        exams = result_exams.scalars().all()
+        result = await db.execute(stmt)
 
         performance_data = []
-        for exam in exams:
-            stmt_marks = (
-                select(func.avg(ExamMarks.marks_obtained), func.min(ExamMarks.marks_obtained), func.max(ExamMarks.marks_obtained))
-                .where(ExamMarks.exam_id == exam.id, ExamMarks.status == MarkStatus.APPROVED)
-            )
-            res_marks = await db.execute(stmt_marks)
-            avg_marks, min_marks, max_marks = res_marks.fetchone()
-
-            stmt_count = select(func.count(ExamMarks.id)).where(ExamMarks.exam_id == exam.id)
-            total_count = (await db.execute(stmt_count)).scalar_one()
-
-            stmt_fail = select(func.count(ExamMarks.id)).where(
-                ExamMarks.exam_id == exam.id, 
-                ExamMarks.marks_obtained < (exam.total_marks * 0.4)
-            )
-            fail_count = (await db.execute(stmt_fail)).scalar_one()
-
+        for row in result:
+            total_count = row.total_students
             performance_data.append({
-                "exam_id": str(exam.id),
-                "exam_name": exam.exam_name,
-                "date": exam.exam_date.isoformat(),
-                "average": float(avg_marks) if avg_marks is not None else 0,
-                "min": min_marks if min_marks is not None else 0,
-                "max": max_marks if max_marks is not None else 0,
+                "exam_id": str(row.id),
+                "exam_name": row.exam_name,
+                "date": row.exam_date.isoformat(),
+                "average": float(row.average) if row.average is not None else 0,
+                "min": row.min if row.min is not None else 0,
+                "max": row.max if row.max is not None else 0,
+                "median": float(row.median) if row.median is not None else 0,
+                "std_dev": round(float(row.std_dev), 2) if row.std_dev is not None else 0,
                 "total_students": total_count,
-                "pass_percentage": round(((total_count - fail_count) / total_count * 100), 1) if total_count > 0 else 0
+                "pass_percentage": round(((total_count - row.fail_count) / total_count * 100), 1) if total_count > 0 else 0
             })
-            
+
         return performance_data
@@ -0,0 +1,98 @@
+from typing import Any, Dict, Optional
+from uuid import UUID
+from sqlalchemy import select, func, case, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cached, dashboard_cache, tag
+from app.models.exam import Exam
+from app.models.exam_marks import ExamMarks, MarkStatus
+
+
+def _number(value, digits: int = 2):
+    return round(float(value), digits) if value is not None else None
+
+
+class ExamStatisticsService:
+    @staticmethod
+    @cached(
+        dashboard_cache,
+        key=lambda db, exam_id, bins=10: (exam_id, bins),
+        tags=lambda result, db, exam_id, bins=10: [tag("exam", exam_id)]
+    )
+    async def get_exam_statistics(db: AsyncSession, exam_id: UUID, bins: int = 10) -> Optional[Dict[str, Any]]:
+        """
+        Score distribution of an exam: mean, quartiles, standard deviation,
+        a histogram of `bins` equal-width ranges and the pass rate against
+        Exam.passing_marks. Returns None if the exam does not exist.
+
+        Only approved, non-absent marks are scored; the counts cover every
+        submission. Everything is aggregated by the database in one statement.
+        """
+        exam = (await db.execute(
+            select(Exam.id, Exam.exam_name, Exam.total_marks, Exam.passing_marks).where(Exam.id == exam_id)
+        )).one_or_none()
+        if exam is None:
+            return None
+
+        scored = case(
+            (and_(ExamMarks.status == MarkStatus.APPROVED, ExamMarks.is_absent == False), ExamMarks.marks_obtained)
+        )
+        # Full marks fall into the last bin rather than one past it
+        bucket = func.least(func.width_bucket(scored, 0.0, float(exam.total_marks or 1), bins), bins)
+        histogram = (
+            select(bucket.label("bucket"), func.count().label("count"))
+            .where(ExamMarks.exam_id == exam_id)
+            .where(scored.is_not(None))
+            .group_by(bucket)
+            .correlate(None)
+            .subquery()
+        )
+        stmt = (
+            select(
+                func.count(ExamMarks.id).label("submitted"),
+                func.count(scored).label("graded"),
+                func.count(ExamMarks.id).filter(ExamMarks.is_absent == True).label("absent"),
+                func.count(ExamMarks.id).filter(ExamMarks.status == MarkStatus.PENDING).label("pending"),
+                func.avg(scored).label("mean"),
+                func.stddev_pop(scored).label("std_dev"),
+                func.min(scored).label("min"),
+                func.max(scored).label("max"),
+                func.percentile_cont(0.25).within_group(scored).label("q1"),
+                func.percentile_cont(0.5).within_group(scored).label("median"),
+                func.percentile_cont(0.75).within_group(scored).label("q3"),
+                func.count(scored).filter(scored >= exam.passing_marks).label("passed"),
+                select(func.json_object_agg(histogram.c.bucket, histogram.c.count)).correlate(None).scalar_subquery().label("histogram")
+            )
+            .where(ExamMarks.exam_id == exam_id)
+        )
+        row = (await db.execute(stmt)).one()
+
+        counts = {int(bucket): count for bucket, count in (row.histogram or {}).items()}
+        width = (exam.total_marks or 0) / bins
+        return {
+            "exam_id": str(exam.id),
+            "exam_name": exam.exam_name,
+            "total_marks": exam.total_marks,
+            "passing_marks": exam.passing_marks,
+            "submitted": row.submitted,
+            "graded": row.graded,
+            "absent": row.absent,
+            "pending": row.pending,
+            "mean": _number(row.mean),
+            "median": _number(row.median),
+            "q1": _number(row.q1),
+            "q3": _number(row.q3),
+            "std_dev": _number(row.std_dev),
+            "min": row.min,
+            "max": row.max,
+            "passed": row.passed,
+            "pass_rate": round(row.passed / row.graded * 100, 1) if row.graded else 0,
+            "histogram": [
+                {
+                    "min": round(width * (index - 1), 2),
+                    "max": round(width * index, 2),
+                    "count": counts.get(index, 0)
+                }
+                for index in range(1, bins + 1)
+            ]
+        }
@@ -0,0 +1,195 @@
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, case
+
+from app.core.config import settings
+from app.models.user import User, Role
+from app.models.section import Section
+from app.models.semester import Semester
+from app.models.subject import Subject
+from app.models.exam import Exam
+from app.models.exam_marks import ExamMarks, MarkStatus
+
+
+class GradeScale:
+    """
+    Grade boundaries as (min_percentage, grade, grade_point), e.g. (90, "O", 10).
+
+    Percentages below the lowest boundary get the fail grade. The same scale
+    grades one percentage in Python or a whole column in SQL, so single-student
+    pages and section-wide transcripts always agree.
+    """
+
+    def __init__(self, boundaries: Optional[Sequence[Tuple[float, str, float]]] = None, fail: Tuple[str, float] = ("F", 0)):
+        ordered = sorted(boundaries if boundaries is not None else settings.GRADE_BOUNDARIES)
+        self._mins = [float(minimum) for minimum, _, _ in ordered]
+        self._grades = [(grade, float(point)) for _, grade, point in ordered]
+        self.fail = (fail[0], float(fail[1]))
+
+    def _lookup(self, pct: float) -> Tuple[str, float]:
+        index = bisect_right(self._mins, pct)
+        return self._grades[index - 1] if index else self.fail
+
+    def grade(self, pct: float) -> str:
+        return self._lookup(pct)[0]
+
+    def grade_point(self, pct: float) -> float:
+        return self._lookup(pct)[1]
+
+    def _case(self, pct_col, pick: int, default):
+        whens = [
+            (pct_col >= minimum, grade[pick])
+            for minimum, grade in zip(reversed(self._mins), reversed(self._grades))
+        ]
+        return case(*whens, else_=default)
+
+    def grade_expr(self, pct_col):
+        """SQL CASE assigning the grade for a percentage column."""
+        return self._case(pct_col, 0, self.fail[0])
+
+    def grade_point_expr(self, pct_col):
+        """SQL CASE assigning the grade point for a percentage column."""
+        return self._case(pct_col, 1, self.fail[1])
+
+
+class GradingService:
+    @staticmethod
+    def summarize_transcript(entries: Sequence[Any], scale: Optional[GradeScale] = None) -> Dict[str, Any]:
+        """
+        SGPA per semester and CGPA from one student's transcript entries, pooled
+        the same way as compute_results: a subject's percentage is its total
+        marks over the total of its exams, graded once.
+        """
+        scale = scale or GradeScale()
+        subjects: Dict[Tuple[int, UUID], List[int]] = {}
+        for entry in entries:
+            if entry.total_marks <= 0:
+                continue
+            pooled = subjects.setdefault((entry.semester_number, entry.subject_id), [0, 0])
+            pooled[0] += entry.marks_obtained or 0
+            pooled[1] += entry.total_marks
+
+        semesters: Dict[int, List[float]] = {}
+        for (semester, _), (obtained, total) in subjects.items():
+            semesters.setdefault(semester, []).append(obtained * 100.0 / total)
+        points = [scale.grade_point(pct) for pcts in semesters.values() for pct in pcts]
+        return {
+            "cgpa": round(sum(points) / len(points), 2) if points else 0,
+            "semesters": [
+                {
+                    "semester": semester,
+                    "sgpa": round(sum(scale.grade_point(pct) for pct in pcts) / len(pcts), 2),
+                    "percentage": round(sum(pcts) / len(pcts), 1)
+                }
+                for semester, pcts in sorted(semesters.items())
+            ]
+        }
+
+    @staticmethod
+    async def compute_results(
+        db: AsyncSession,
+        section_id: Optional[UUID] = None,
+        semester_id: Optional[UUID] = None,
+        student_ids: Optional[List[UUID]] = None,
+        scale: Optional[GradeScale] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Subject grades, SGPA and CGPA for every selected student in one query.
+
+        Students are selected by their current section, by the semester of their
+        current section (a whole batch), or explicitly. A subject's percentage
+        pools all approved marks across its exams (absent counts as zero); SGPA
+        is the mean grade point of a semester's subjects and CGPA the mean over
+        all graded subjects.
+        """
+        scale = scale or GradeScale()
+
+        marks = func.coalesce(ExamMarks.marks_obtained, 0)
+        per_subject = (
+            select(
+                ExamMarks.student_id,
+                Section.semester_id,
+                Exam.subject_id,
+                (func.sum(marks) * 100.0 / func.sum(Exam.total_marks)).label("percentage")
+            )
+            .join(Exam, ExamMarks.exam_id == Exam.id)
+            .join(Section, Exam.section_id == Section.id)
+            .join(User, ExamMarks.student_id == User.id)
+            .where(ExamMarks.status == MarkStatus.APPROVED)
+            .where(Exam.total_marks > 0)
+            .where(User.role == Role.STUDENT)
+            .group_by(ExamMarks.student_id, Section.semester_id, Exam.subject_id)
+        )
+        if section_id:
+            per_subject = per_subject.where(User.section_id == section_id)
+        if semester_id:
+            per_subject = per_subject.where(
+                User.section_id.in_(select(Section.id).where(Section.semester_id == semester_id))
+            )
+        if student_ids is not None:
+            per_subject = per_subject.where(ExamMarks.student_id.in_(student_ids))
+        per_subject = per_subject.subquery()
+
+        grade_point = scale.grade_point_expr(per_subject.c.percentage)
+        graded = select(
+            per_subject,
+            scale.grade_expr(per_subject.c.percentage).label("grade"),
+            grade_point.label("grade_point")
+        ).subquery()
+
+        stmt = (
+            select(
+                graded,
+                func.avg(graded.c.grade_point).over(
+                    partition_by=[graded.c.student_id, graded.c.semester_id]
+                ).label("sgpa"),
+                func.avg(graded.c.percentage).over(
+                    partition_by=[graded.c.student_id, graded.c.semester_id]
+                ).label("semester_percentage"),
+                func.avg(graded.c.grade_point).over(partition_by=graded.c.student_id).label("cgpa"),
+                User.first_name,
+                User.last_name,
+                User.roll_no,
+                Semester.number.label("semester_number"),
+                Subject.name.label("subject_name"),
+                Subject.code.label("subject_code")
+            )
+            .select_from(graded)
+            .join(User, graded.c.student_id == User.id)
+            .join(Semester, graded.c.semester_id == Semester.id)
+            .join(Subject, graded.c.subject_id == Subject.id)
+            .order_by(User.roll_no, graded.c.student_id, Semester.number, Subject.code)
+        )
+        result = await db.execute(stmt)
+
+        students: Dict[UUID, Dict[str, Any]] = {}
+        for row in result:
+            student = students.get(row.student_id)
+            if student is None:
+                student = students[row.student_id] = {
+                    "student_id": str(row.student_id),
+                    "name": f"{row.first_name} {row.last_name}",
+                    "roll_no": row.roll_no,
+                    "cgpa": round(float(row.cgpa), 2),
+                    "semesters": []
+                }
+            semesters = student["semesters"]
+            if not semesters or semesters[-1]["semester_id"] != str(row.semester_id):
+                semesters.append({
+                    "semester_id": str(row.semester_id),
+                    "semester": row.semester_number,
+                    "sgpa": round(float(row.sgpa), 2),
+                    "percentage": round(float(row.semester_percentage), 1),
+                    "subjects": []
+                })
+            semesters[-1]["subjects"].append({
+                "subject_id": str(row.subject_id),
+                "code": row.subject_code,
+                "name": row.subject_name,
+                "percentage": round(float(row.percentage), 1),
+                "grade": row.grade,
+                "grade_point": float(row.grade_point)
+            })
+        return list(students.values())
@@ -0,0 +1,49 @@
+import asyncio
+from typing import List
+from uuid import UUID
+
+from app.core.database import AsyncSessionLocal
+from app.core.email import email_service
+from app.core.jobs import Job
+from app.repository.exam_marks import ExamMarksRepository
+
+# Messages sent over one SMTP connection, and connections open at once
+NOTIFY_BATCH_SIZE = 50
+NOTIFY_CONCURRENCY = 4
+
+
+class ResultNotificationService:
+    @staticmethod
+    async def publish(job: Job, mark_ids: List[UUID]):
+        """
+        Email each student whose mark was approved.
+
+        Details for every mark are loaded with one query, then messages go out
+        in batches that each reuse an SMTP connection, a few batches at a time.
+        """
+        try:
+            job.start("loading", total=len(mark_ids))
+            async with AsyncSessionLocal() as db:
+                results = await ExamMarksRepository(db).get_publication_details(mark_ids)
+
+            job.start("sending", total=len(results))
+            messages = [
+                email_service.report_card_published_message(result["email"], result)
+                for result in results
+            ]
+            batches = [messages[i:i + NOTIFY_BATCH_SIZE] for i in range(0, len(messages), NOTIFY_BATCH_SIZE)]
+            semaphore = asyncio.Semaphore(NOTIFY_CONCURRENCY)
+
+            async def send(batch):
+                async with semaphore:
+                    sent = await email_service.send_bulk(batch)
+                for (to_email, _, _), ok in zip(batch, sent):
+                    if not ok:
+                        job.error(f"Could not notify {to_email}")
+                job.advance(len(batch))
+                return sum(sent)
+
+            delivered = sum(await asyncio.gather(*(send(batch) for batch in batches)))
+            job.finish(notified=delivered, failed=len(messages) - delivered)
+        except Exception as e:
+            job.fail(str(e))
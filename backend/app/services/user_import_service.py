@@ -0,0 +1,270 @@
+import asyncio
+import csv
+import io
+import secrets
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from uuid import UUID
+from sqlalchemy import select, any_, literal, String
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import invalidate_sections
+from app.core.database import AsyncSessionLocal
+from app.core.email import email_service
+from app.core.jobs import Job
+from app.core.security import hash_passwords
+from app.models.branch import Branch
+from app.models.section import Section
+from app.models.user import User, Role
+from app.repository.user import UserRepository
+
+STUDENT_HEADERS = {"email", "first_name", "last_name", "phone_number", "roll_no", "branch_code", "section_name"}
+TEACHER_HEADERS = {"email", "first_name", "last_name", "phone_number", "designation", "department"}
+
+# Users hashed, inserted and committed together
+IMPORT_CHUNK = 500
+# Passwords per hashing task; a chunk is spread over the pool's processes
+HASH_SLICE = 50
+# Welcome emails sent over one SMTP connection
+WELCOME_BATCH_SIZE = 50
+
+_hash_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _password_pool() -> ProcessPoolExecutor:
+    """bcrypt is CPU-bound, so bulk hashing runs in worker processes, started on first use."""
+    global _hash_pool
+    if _hash_pool is None:
+        _hash_pool = ProcessPoolExecutor()
+    return _hash_pool
+
+
+def shutdown_password_pool():
+    """Stop the hashing processes, if any were started; called on application shutdown."""
+    global _hash_pool
+    if _hash_pool is not None:
+        _hash_pool.shutdown(cancel_futures=True)
+        _hash_pool = None
+
+
+def _clean(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip()
+    return value or None
+
+
+class UserImportService:
+    @staticmethod
+    def missing_headers(content: bytes, role: Role) -> List[str]:
+        reader = csv.reader(io.StringIO(content.decode("utf-8-sig")))
+        header = next(reader, [])
+        required = STUDENT_HEADERS if role == Role.STUDENT else TEACHER_HEADERS
+        return sorted(required - {name.strip() for name in header})
+
+    @staticmethod
+    async def _prefetch(
+        db: AsyncSession, emails: Iterable[str], roll_nos: Iterable[str], branch_codes: Iterable[str]
+    ) -> Tuple[Set[str], Set[str], Dict[str, UUID], Dict[Tuple[UUID, str], UUID]]:
+        """
+        Everything the rows are checked against, with one query each: emails and
+        roll numbers already taken, branches by code, and sections by (branch, name).
+        Each list is bound as one array, so file size is not limited by bind parameters.
+        """
+        taken_emails = await db.execute(
+            select(User.email).where(User.email == any_(literal(list(emails), ARRAY(String))))
+        )
+        taken_roll_nos = await db.execute(
+            select(User.roll_no).where(User.roll_no == any_(literal(list(roll_nos), ARRAY(String))))
+        )
+        branches = {
+            row.code: row.id
+            for row in await db.execute(
+                select(Branch.code, Branch.id).where(Branch.code == any_(literal(list(branch_codes), ARRAY(String))))
+            )
+        }
+        sections: Dict[Tuple[UUID, str], UUID] = {}
+        if branches:
+            result = await db.execute(
+                select(Section.branch_id, Section.name, Section.id)
+                .where(Section.branch_id == any_(literal(list(branches.values()), ARRAY(PG_UUID(as_uuid=True)))))
+            )
+            for row in result:
+                # Like get_first_by_name_and_branch, the first match wins
+                sections.setdefault((row.branch_id, row.name), row.id)
+        return set(taken_emails.scalars()), set(taken_roll_nos.scalars()), branches, sections
+
+    @staticmethod
+    def _parse(
+        job: Job, rows: List[dict], role: Role,
+        taken_emails: Set[str], taken_roll_nos: Set[str],
+        branches: Dict[str, UUID], sections: Dict[Tuple[UUID, str], UUID]
+    ) -> List[dict]:
+        """Validate the rows against the prefetched data; failures are reported on the job."""
+        users = []
+        for line, row in enumerate(rows, start=2):  # Header is line 1
+            email = _clean(row.get("email"))
+            first_name = _clean(row.get("first_name"))
+            if not email or not first_name:
+                job.error(f"Row {line}: Missing required fields (email, first_name)")
+                continue
+            if email in taken_emails:
+                job.error(f"Row {line}: Email {email} already exists")
+                continue
+
+            user = {
+                "id": uuid.uuid4(),
+                "email": email,
+                "password": secrets.token_urlsafe(10),
+                "first_name": first_name,
+                "last_name": _clean(row.get("last_name")) or "",
+                "phone_number": _clean(row.get("phone_number")),
+                "roll_no": None,
+                "branch_id": None,
+                "section_id": None,
+                "designation": None,
+                "department": None,
+                "is_first_login": True,
+            }
+            if role == Role.STUDENT:
+                roll_no = _clean(row.get("roll_no"))
+                if not roll_no:
+                    job.error(f"Row {line}: Missing roll_no for student")
+                    continue
+                if roll_no in taken_roll_nos:
+                    job.error(f"Row {line}: Roll number {roll_no} already exists")
+                    continue
+                user["roll_no"] = roll_no
+
+                branch_code = _clean(row.get("branch_code"))
+                section_name = _clean(row.get("section_name"))
+                if branch_code:
+                    branch_id = branches.get(branch_code)
+                    if branch_id is None:
+                        job.error(f"Row {line}: Branch code {branch_code} not found")
+                        continue
+                    user["branch_id"] = branch_id
+                    if section_name:
+                        section_id = sections.get((branch_id, section_name))
+                        if section_id is None:
+                            job.error(f"Row {line}: Section {section_name} not found in branch {branch_code}")
+                            continue
+                        user["section_id"] = section_id
+                taken_roll_nos.add(roll_no)
+            else:
+                user["designation"] = row.get("designation", "Lecturer")
+                user["department"] = _clean(row.get("department"))
+
+            # A later row with the same email or roll number is reported as a duplicate
+            taken_emails.add(email)
+            users.append(user)
+        return users
+
+    @staticmethod
+    async def _hash(users: List[dict]) -> List[dict]:
+        """Replace each user's generated password with its hash, using the process pool."""
+        loop = asyncio.get_running_loop()
+        slices = [users[i:i + HASH_SLICE] for i in range(0, len(users), HASH_SLICE)]
+        hashed = await asyncio.gather(*(
+            loop.run_in_executor(_password_pool(), hash_passwords, [user["password"] for user in part])
+            for part in slices
+        ))
+        return [
+            {**{key: value for key, value in user.items() if key != "password"}, "password_hash": password_hash}
+            for part, hashes in zip(slices, hashed)
+            for user, password_hash in zip(part, hashes)
+        ]
+
+    @staticmethod
+    def _welcome_message(role: Role, user: dict) -> Tuple[str, str, str]:
+        if role == Role.STUDENT:
+            return email_service.student_welcome_message(
+                user["email"], user["first_name"], user["password"], user["roll_no"]
+            )
+        return email_service.teacher_welcome_message(
+            user["email"], user["first_name"], user["password"], user["designation"], user["department"]
+        )
+
+    @staticmethod
+    async def _send_welcome_emails(job: Job, queue: asyncio.Queue) -> int:
+        """
+        Drain welcome emails from the queue while the import keeps writing,
+        sending whatever has queued up (up to a batch) over one SMTP connection.
+        Stops at the None sentinel. Returns the number delivered.
+        """
+        delivered = 0
+        finished = False
+        while not finished:
+            batch = [await queue.get()]
+            while len(batch) < WELCOME_BATCH_SIZE and not queue.empty():
+                batch.append(queue.get_nowait())
+            if batch[-1] is None:
+                finished = True
+                batch.pop()
+            if not batch:
+                continue
+            sent = await email_service.send_bulk(batch)
+            for (to_email, _, _), ok in zip(batch, sent):
+                if not ok:
+                    job.error(f"Could not send welcome email to {to_email}")
+            delivered += sum(sent)
+        return delivered
+
+    @staticmethod
+    async def run(job: Job, content: bytes, role: Role):
+        """
+        Create students or teachers from a CSV and email each their credentials.
+
+        Rows are validated against data prefetched in a few queries. Valid users
+        are written in chunks: hashed in worker processes, inserted with
+        multi-row statements and committed. Each committed chunk's welcome
+        emails go to a queue that a sender drains alongside the writes.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        sender = asyncio.create_task(UserImportService._send_welcome_emails(job, queue))
+        rows: List[dict] = []
+        created = 0
+        try:
+            rows = list(csv.DictReader(io.StringIO(content.decode("utf-8-sig"))))
+            job.start("resolving", total=len(rows))
+            section_ids = set()
+            async with AsyncSessionLocal() as db:
+                prefetched = await UserImportService._prefetch(
+                    db,
+                    {_clean(row.get("email")) for row in rows} - {None},
+                    {_clean(row.get("roll_no")) for row in rows} - {None},
+                    {_clean(row.get("branch_code")) for row in rows} - {None}
+                )
+                users = UserImportService._parse(job, rows, role, *prefetched)
+
+                job.start("writing", total=len(users))
+                job.processed = 0
+                user_repo = UserRepository(db)
+                for offset in range(0, len(users), IMPORT_CHUNK):
+                    chunk = users[offset:offset + IMPORT_CHUNK]
+                    inserted = set(await user_repo.insert_many(role, await UserImportService._hash(chunk)))
+                    await db.commit()
+                    for user in chunk:
+                        if user["email"] not in inserted:
+                            job.error(f"User {user['email']} was created by someone else during the import")
+                            continue
+                        if user["section_id"]:
+                            section_ids.add(user["section_id"])
+                        queue.put_nowait(UserImportService._welcome_message(role, user))
+                    created += len(inserted)
+                    job.advance(len(chunk))
+
+            # New students appear in their sections' class lists
+            await invalidate_sections(section_ids)
+        except Exception as e:
+            job.fail(str(e))
+
+        # Users committed before a failure still get their credentials
+        queue.put_nowait(None)
+        if job.status != "failed":
+            job.start("emailing")
+        emailed = await sender
+        if job.status != "failed":
+            job.finish(rows=len(rows), created=created, skipped=len(rows) - created, emailed=emailed)
+        else:
+            job.result.update(created=created, emailed=emailed)
@@ -0,0 +1,115 @@
+"""
+Storage and latency comparison of bitmap attendance against row storage.
+
+Seeds a section's attendance as rows, writes the same marks as bitmap sheets,
+then reports the on-disk growth of each layout (heap plus indexes) and the
+latency of the AttendanceRepository reads served from either one.
+
+Everything is written in one transaction that is rolled back at the end.
+Sizes are measured as growth of the tables during the run, so run it on a
+quiet database.
+
+Usage:
+    python -m scripts.bench_attendance_bitmap [--students 60] [--subjects 5] [--days 90] [--repeat 50]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from sqlalchemy import select, text
+
+from app.core.database import AsyncSessionLocal
+from app.models.attendance import Attendance
+from app.repository.attendance import AttendanceRepository
+from app.repository.attendance_bitmap import AttendanceBitmapRepository
+from scripts.seed import seed_attendance, seed_section
+import app.models
+
+FIRST_DAY = date(2030, 1, 7)
+
+ROW_STORAGE_SIZE = text("""
+    SELECT COALESCE(SUM(pg_total_relation_size(relid)), 0)
+    FROM pg_partition_tree('attendance') WHERE isleaf
+""")
+BITMAP_STORAGE_SIZE = text("""
+    SELECT pg_total_relation_size('attendance_sheets')
+         + pg_total_relation_size('attendance_sheet_remarks')
+         + pg_total_relation_size('attendance_roster')
+""")
+
+
+async def timed(repeat: int, call) -> float:
+    """Median milliseconds of `repeat` calls, after one warm-up call."""
+    await call()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def run(args):
+    async with AsyncSessionLocal() as db:
+        try:
+            section = await seed_section(db, args.students, args.subjects)
+            rows_before = await db.scalar(ROW_STORAGE_SIZE)
+            await seed_attendance(db, section, args.days, FIRST_DAY)
+            rows_size = await db.scalar(ROW_STORAGE_SIZE) - rows_before
+
+            # Copy the seeded rows into one sheet per class session
+            sheets = defaultdict(dict)
+            result = await db.execute(
+                select(Attendance.subject_id, Attendance.attendance_date, Attendance.student_id, Attendance.status)
+                .where(Attendance.section_id == section.section_id)
+            )
+            for row in result:
+                sheets[(row.subject_id, row.attendance_date)][row.student_id] = {"status": row.status, "remarks": None}
+            bitmap_before = await db.scalar(BITMAP_STORAGE_SIZE)
+            bitmap = AttendanceBitmapRepository(db)
+            for (subject_id, attendance_date), marks in sheets.items():
+                await bitmap.write_sheet(section.section_id, subject_id, attendance_date, marks, section.teacher_id)
+            await db.flush()
+            bitmap_size = await db.scalar(BITMAP_STORAGE_SIZE) - bitmap_before
+
+            marks = args.students * args.subjects * args.days
+            print(f"{marks} marks in {len(sheets)} class sessions")
+            print(f"{'storage':<10}  {'bytes':>12}  {'bytes/mark':>10}")
+            print(f"{'rows':<10}  {rows_size:>12,}  {rows_size / marks:>10.1f}")
+            print(f"{'bitmap':<10}  {bitmap_size:>12,}  {bitmap_size / marks:>10.1f}")
+
+            subject_id = section.subject_ids[0]
+            student_id = section.student_ids[0]
+            middle_day = FIRST_DAY + timedelta(days=args.days // 2)
+            reads = {
+                "attendance for date": lambda repo: repo.get_attendance_for_date(section.section_id, subject_id, middle_day),
+                "section history": lambda repo: repo.get_section_attendance_history(section.section_id, subject_id),
+                "student records": lambda repo: repo.get_student_records(student_id),
+                "bucketed stats": lambda repo: repo.get_bucketed_stats("month", student_id=student_id),
+            }
+            print(f"\n{'read (median ms)':<22}  {'rows':>8}  {'bitmap':>8}")
+            for name, read in reads.items():
+                latencies = []
+                for use_bitmap in (False, True):
+                    repo = AttendanceRepository(db)
+                    repo.bitmap = use_bitmap
+                    latencies.append(await timed(args.repeat, lambda: read(repo)))
+                print(f"{name:<22}  {latencies[0]:>8.2f}  {latencies[1]:>8.2f}")
+        finally:
+            await db.rollback()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m scripts.bench_attendance_bitmap")
+    parser.add_argument("--students", type=int, default=60)
+    parser.add_argument("--subjects", type=int, default=5)
+    parser.add_argument("--days", type=int, default=90, help="Class days per subject")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed calls per read and storage")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
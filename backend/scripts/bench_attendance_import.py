@@ -0,0 +1,85 @@
+"""
+Throughput benchmark for the COPY-based attendance import.
+
+Builds a semester of attendance records for a seeded section and times
+AttendanceImportRepository.merge on them twice: a first pass where every
+record is new, and a re-import of the same file where every record updates
+an existing mark. Each pass reports rows per second. The target is 100k
+rows/s; on a stock PostgreSQL 16 with fsync on, the per-row foreign key
+checks and the seven attendance indexes hold a pass to roughly 10k rows/s,
+so pass --min-rate to turn the target into a failing exit code (e.g. in CI on
+tuned hardware).
+
+Everything is written in one transaction that is rolled back at the end.
+
+Usage:
+    python -m scripts.bench_attendance_import [--students 200] [--subjects 5] [--days 100] [--min-rate ROWS_PER_S]
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from app.core.database import AsyncSessionLocal
+from app.models.attendance import AttendanceStatus
+from app.repository.attendance_import import AttendanceImportRepository
+from scripts.seed import seed_section
+import app.models
+
+FIRST_DAY = date(2030, 1, 7)
+
+
+async def run(args) -> float:
+    slowest = None
+    async with AsyncSessionLocal() as db:
+        try:
+            section = await seed_section(db, args.students, args.subjects)
+            await db.flush()
+            statuses = [AttendanceStatus.PRESENT] * 17 + [AttendanceStatus.ABSENT] * 3
+            records = [
+                (
+                    student_id, section.section_id, subject_id, FIRST_DAY + timedelta(days=day),
+                    random.choice(statuses), None, section.teacher_id
+                )
+                for day in range(args.days)
+                for subject_id in section.subject_ids
+                for student_id in section.student_ids
+            ]
+            print(f"{len(records)} records for {args.students} students, {args.subjects} subjects, {args.days} days")
+
+            repo = AttendanceImportRepository(db)
+            for label in ("insert", "re-import"):
+                started = time.perf_counter()
+                sessions = await repo.merge(records)
+                elapsed = time.perf_counter() - started
+                created = sum(counts["created"] for counts in sessions.values())
+                updated = sum(counts["updated"] for counts in sessions.values())
+                rate = len(records) / elapsed
+                slowest = rate if slowest is None else min(slowest, rate)
+                print(
+                    f"{label:>9}: {elapsed:.2f}s, {rate:,.0f} rows/s "
+                    f"({created} created, {updated} updated, {len(sessions)} class sessions)"
+                )
+        finally:
+            await db.rollback()
+    return slowest
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m scripts.bench_attendance_import")
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--subjects", type=int, default=5)
+    parser.add_argument("--days", type=int, default=100, help="Class days; records = students x subjects x days")
+    parser.add_argument("--min-rate", type=float, help="Exit non-zero below this many rows/s")
+    args = parser.parse_args()
+
+    rate = asyncio.run(run(args))
+    if args.min_rate is not None and rate < args.min_rate:
+        print(f"Below the required {args.min_rate:,.0f} rows/s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
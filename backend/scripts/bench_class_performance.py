@@ -0,0 +1,81 @@
+"""
+Benchmark for the teacher class performance report.
+
+Seeds one section per size with a semester of attendance and a few exams,
+then times DashboardService.get_class_performance (bypassing its cache) and
+counts the statements it sends. With the grouped queries both stay flat as
+the section grows, instead of three queries per student.
+
+Everything is written in one transaction that is rolled back at the end.
+
+Usage:
+    python -m scripts.bench_class_performance [--sizes 30 60 120 240 480] [--days 60] [--repeat 20]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import event
+
+from app.core.database import AsyncSessionLocal, engine
+from app.services.dashboard_service import DashboardService
+from scripts.seed import seed_attendance, seed_exam, seed_section
+import app.models
+
+FIRST_DAY = date(2030, 1, 7)
+EXAMS = 3
+
+
+async def run(args):
+    statements = 0
+
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    # The report without @cached, so every call reaches the database
+    report = DashboardService.get_class_performance.__wrapped__
+    print(f"{'students':>8}  {'median ms':>9}  {'p95 ms':>7}  {'queries':>7}")
+    async with AsyncSessionLocal() as db:
+        try:
+            for size in args.sizes:
+                section = await seed_section(db, size)
+                subject_id = section.subject_ids[0]
+                await seed_attendance(db, section, args.days, FIRST_DAY)
+                for offset in range(EXAMS):
+                    await seed_exam(db, section, subject_id, FIRST_DAY + timedelta(days=30 * offset))
+                await db.flush()
+
+                await report(db, str(section.section_id), str(subject_id))  # Warm up plans and pool
+                timings = []
+                event.listen(engine.sync_engine, "before_cursor_execute", count)
+                statements = 0
+                try:
+                    for _ in range(args.repeat):
+                        started = time.perf_counter()
+                        rows = await report(db, str(section.section_id), str(subject_id))
+                        timings.append((time.perf_counter() - started) * 1000)
+                finally:
+                    event.remove(engine.sync_engine, "before_cursor_execute", count)
+                assert len(rows) == size
+                timings.sort()
+                print(
+                    f"{size:>8}  {statistics.median(timings):>9.2f}  "
+                    f"{timings[int(len(timings) * 0.95) - 1]:>7.2f}  {statements // args.repeat:>7}"
+                )
+        finally:
+            await db.rollback()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m scripts.bench_class_performance")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[30, 60, 120, 240, 480], help="Students per section")
+    parser.add_argument("--days", type=int, default=60, help="Class days of attendance per student")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed calls per section size")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
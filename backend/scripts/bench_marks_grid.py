@@ -0,0 +1,101 @@
+"""
+Memory and latency of loading an exam's marks grid.
+
+Seeds an exam with a mark for every student of a large section and compares
+two ways of producing the ExamMarkResponse list the endpoint returns:
+
+  entities    ExamMarks with selectinload(student), every User column loaded,
+              dicts built by hand (the read path before the projection)
+  projection  ExamMarksRepository.get_marks_for_exam, only the response
+              columns with the name concatenated in SQL
+
+Latency is the median over --repeat calls; memory is the tracemalloc peak of
+one call. The session is emptied before every call so neither path reuses
+loaded objects. Everything is written in one transaction that is rolled back
+at the end.
+
+Usage:
+    python -m scripts.bench_marks_grid [--students 1000] [--repeat 30]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from datetime import date
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.core.database import AsyncSessionLocal
+from app.models.exam_marks import ExamMarks
+from app.repository.exam_marks import ExamMarksRepository
+from app.schemas.exam_marks import ExamMarkResponse
+from scripts.seed import seed_exam, seed_section
+import app.models
+
+
+async def load_entities(db, exam_id):
+    result = await db.execute(
+        select(ExamMarks).where(ExamMarks.exam_id == exam_id).options(selectinload(ExamMarks.student))
+    )
+    return [
+        ExamMarkResponse.model_validate({
+            "id": mark.id,
+            "exam_id": mark.exam_id,
+            "student_id": mark.student_id,
+            "student_name": f"{mark.student.first_name} {mark.student.last_name}",
+            "marks_obtained": mark.marks_obtained,
+            "is_absent": mark.is_absent,
+            "status": mark.status,
+            "submitted_by": mark.submitted_by,
+            "approved_by": mark.approved_by,
+            "created_at": mark.created_at,
+            "updated_at": mark.updated_at
+        })
+        for mark in result.scalars().all()
+    ]
+
+
+async def load_projection(db, exam_id):
+    rows = await ExamMarksRepository(db).get_marks_for_exam(exam_id)
+    return [ExamMarkResponse.model_validate(row) for row in rows]
+
+
+async def run(args):
+    async with AsyncSessionLocal() as db:
+        try:
+            section = await seed_section(db, args.students)
+            exam_id = await seed_exam(db, section, section.subject_ids[0], date(2030, 3, 2))
+            await db.flush()
+
+            print(f"{'path':<12}  {'median ms':>9}  {'peak KiB':>9}  {'marks':>6}")
+            for name, load in (("entities", load_entities), ("projection", load_projection)):
+                db.expunge_all()
+                await load(db, exam_id)  # Warm up statement caches
+                timings = []
+                for _ in range(args.repeat):
+                    db.expunge_all()
+                    started = time.perf_counter()
+                    marks = await load(db, exam_id)
+                    timings.append((time.perf_counter() - started) * 1000)
+
+                db.expunge_all()
+                tracemalloc.start()
+                marks = await load(db, exam_id)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(f"{name:<12}  {statistics.median(timings):>9.2f}  {peak / 1024:>9.0f}  {len(marks):>6}")
+        finally:
+            await db.rollback()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m scripts.bench_marks_grid")
+    parser.add_argument("--students", type=int, default=1000, help="Students in the section, one mark each")
+    parser.add_argument("--repeat", type=int, default=30, help="Timed loads per path")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
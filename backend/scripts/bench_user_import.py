@@ -0,0 +1,112 @@
+"""
+Throughput benchmark for the bulk user import.
+
+Generates a student CSV for a seeded branch and section and runs
+UserImportService.run on it, the same background task the upload endpoint
+starts: validation, bcrypt hashing in the process pool, multi-row inserts
+committed per chunk, and welcome emails (printed instead of sent when SMTP is
+not configured). Reports users per second for the whole job and per phase.
+bcrypt dominates, so the rate scales with the cores the process pool gets.
+
+The import commits as it goes, so the seed is committed too; the created
+users, the seed and the student counter are put back when the run ends.
+
+Usage:
+    python -m scripts.bench_user_import [--students 500] [--min-rate USERS_PER_S]
+"""
+import argparse
+import asyncio
+import contextlib
+import csv
+import io
+import sys
+import time
+
+from sqlalchemy import delete, text
+
+from app.core.database import AsyncSessionLocal
+from app.core.jobs import Job
+from app.models.user import User, Role
+from app.repository.entity_counter import EntityCounterRepository, ROLE_COUNTER_KEYS
+from app.services.user_import_service import UserImportService, shutdown_password_pool
+from scripts.seed import seed_section
+import app.models
+
+
+def student_csv(token: str, students: int) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["email", "first_name", "last_name", "phone_number", "roll_no", "branch_code", "section_name"])
+    for n in range(students):
+        writer.writerow([f"import-{token}-{n}@bench.invalid", "Imported", str(n), "", f"I{token}-{n:06}", f"B{token}", "A"])
+    return out.getvalue().encode()
+
+
+async def cleanup(section):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(delete(User).where(User.section_id == section.section_id, User.role == Role.STUDENT))
+        # Seeded students bypass the counter; imported ones went through insert_many
+        imported = result.rowcount - len(section.student_ids)
+        await EntityCounterRepository(db).increment(ROLE_COUNTER_KEYS.get(Role.STUDENT), -imported)
+        await db.execute(delete(User).where(User.id == section.teacher_id))
+        await db.execute(text("DELETE FROM subjects WHERE branch_id = :branch_id"), {"branch_id": section.branch_id})
+        semester_id = await db.scalar(
+            text("DELETE FROM sections WHERE id = :id RETURNING semester_id"), {"id": section.section_id}
+        )
+        await db.execute(text("DELETE FROM semesters WHERE id = :id"), {"id": semester_id})
+        await db.execute(text("DELETE FROM branches WHERE id = :id"), {"id": section.branch_id})
+        await db.commit()
+
+
+async def run(args) -> float:
+    async with AsyncSessionLocal() as db:
+        section = await seed_section(db, 0, 0)
+        await db.commit()
+    try:
+        content = student_csv(section.token, args.students)
+        job = Job("bench_user_import")
+
+        # Time each phase the job moves through
+        phases = {}
+
+        async def watch():
+            while True:
+                phases.setdefault(job.phase, time.perf_counter())
+                await asyncio.sleep(0.005)
+
+        watcher = asyncio.create_task(watch())
+        started = time.perf_counter()
+        # Welcome emails are printed when SMTP is not configured
+        with contextlib.redirect_stdout(io.StringIO()):
+            await UserImportService.run(job, content, Role.STUDENT)
+        elapsed = time.perf_counter() - started
+        watcher.cancel()
+
+        if job.status != "completed":
+            sys.exit(f"Import {job.status}: {job.result.get('detail')} {job.errors[:5]}")
+        created = job.result["created"]
+        rate = created / elapsed
+        print(f"{created} of {args.students} students created in {elapsed:.2f}s, {rate:,.0f} users/s")
+        marks = sorted((at, phase) for phase, at in phases.items() if phase) + [(started + elapsed, None)]
+        for (at, phase), (until, _) in zip(marks, marks[1:]):
+            print(f"  {phase:<10} {until - at:>7.2f}s")
+        return rate
+    finally:
+        await cleanup(section)
+        shutdown_password_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m scripts.bench_user_import")
+    parser.add_argument("--students", type=int, default=500, help="Rows in the generated CSV")
+    parser.add_argument("--min-rate", type=float, help="Exit non-zero below this many users/s")
+    args = parser.parse_args()
+
+    rate = asyncio.run(run(args))
+    if args.min_rate is not None and rate < args.min_rate:
+        print(f"Below the required {args.min_rate:,.0f} users/s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
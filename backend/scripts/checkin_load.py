@@ -0,0 +1,107 @@
+"""
+Load test for student check-in.
+
+Drives AttendanceCheckInService.check_in from many concurrent clients for a
+fixed time and reports the sustained check-in rate, the batch sizes the
+group commit reached and the latency each client saw. Every client loops
+over the section's students, one class date after another, so each
+check-in inserts a new attendance row.
+
+It writes real attendance (and rollups) from --start-date onwards, so run it
+against a staging database.
+
+Usage:
+    python -m scripts.checkin_load --section-id <uuid> --subject-id <uuid>
+        [--seconds 30] [--clients 2000] [--start-date 2030-01-01] [--min-rate 2000]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import date, timedelta
+from itertools import count
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models.user import User, Role
+from app.services.attendance_checkin_service import (
+    AttendanceCheckInService, start_checkin_buffer, stop_checkin_buffer
+)
+import app.models
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+async def run(args) -> float:
+    async with AsyncSessionLocal() as db:
+        students = (await db.execute(
+            select(User.id).where(User.section_id == args.section_id, User.role == Role.STUDENT)
+        )).scalars().all()
+        opened_by = await db.scalar(
+            select(User.id).where(User.role.in_([Role.TEACHER, Role.ADMIN])).limit(1)
+        )
+    if not students or opened_by is None:
+        sys.exit("The section needs students, and the database a teacher or admin, to check in with")
+
+    def check_ins():
+        for offset in count():
+            session = {
+                "section_id": args.section_id,
+                "subject_id": args.subject_id,
+                "attendance_date": args.start_date + timedelta(days=offset),
+                "opened_by": opened_by,
+            }
+            for student_id in students:
+                yield session, student_id
+
+    buffer = start_checkin_buffer()
+    work = check_ins()
+    latencies = []
+    deadline = time.perf_counter() + args.seconds
+
+    async def client():
+        while time.perf_counter() < deadline:
+            session, student_id = next(work)
+            started = time.perf_counter()
+            await AttendanceCheckInService.check_in(session, student_id)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.clients)))
+    await stop_checkin_buffer()
+    elapsed = time.perf_counter() - started
+
+    rate = len(latencies) / elapsed
+    print(f"{len(latencies)} check-ins in {elapsed:.1f}s: {rate:.0f}/s from {args.clients} clients")
+    print(f"{buffer.batches} batches, {buffer.written / max(buffer.batches, 1):.0f} check-ins per batch")
+    print(
+        f"latency p50={percentile(latencies, 0.5) * 1000:.1f}ms "
+        f"p95={percentile(latencies, 0.95) * 1000:.1f}ms "
+        f"p99={percentile(latencies, 0.99) * 1000:.1f}ms"
+    )
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m scripts.checkin_load")
+    parser.add_argument("--section-id", type=UUID, required=True)
+    parser.add_argument("--subject-id", type=UUID, required=True)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--clients", type=int, default=2000, help="Concurrent clients checking in")
+    parser.add_argument("--start-date", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--min-rate", type=float, default=2000, help="Exit non-zero below this many check-ins/s")
+    args = parser.parse_args()
+
+    rate = asyncio.run(run(args))
+    if rate < args.min_rate:
+        print(f"Below the required {args.min_rate:.0f} check-ins/s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
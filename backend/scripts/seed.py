@@ -0,0 +1,134 @@
+"""
+Synthetic data for the benchmark scripts.
+
+Everything is written with set-based SQL in the caller's transaction and
+nothing is committed, so a benchmark can roll back when it is done and leave
+the database as it found it. Names carry a random token so several runs (or
+real data) never collide on the unique columns.
+"""
+import random
+import secrets
+from datetime import date
+from typing import List
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class SeededSection:
+    def __init__(self, token: str, branch_id: UUID, section_id: UUID, subject_ids: List[UUID],
+                 teacher_id: UUID, student_ids: List[UUID]):
+        self.token = token
+        self.branch_id = branch_id
+        self.section_id = section_id
+        self.subject_ids = subject_ids
+        self.teacher_id = teacher_id
+        self.student_ids = student_ids
+
+
+async def seed_section(db: AsyncSession, students: int, subjects: int = 1) -> SeededSection:
+    """A branch, semester and section with `subjects` subjects, one teacher and `students` students."""
+    token = secrets.token_hex(4)
+    params = {
+        "token": token, "students": students, "subjects": subjects,
+        "code": f"B{token}", "name": f"Benchmark {token}", "teacher_email": f"teacher-{token}@bench.invalid",
+        "number": random.randint(10 ** 6, 2 ** 31 - 1),
+    }
+    branch_id = await db.scalar(text("""
+        INSERT INTO branches (id, code, name, is_active, created_at, updated_at)
+        VALUES (gen_random_uuid(), :code, :name, true, now(), now())
+        RETURNING id
+    """), params)
+    semester_id = await db.scalar(text("""
+        INSERT INTO semesters (id, academic_year, number, is_active, created_at, updated_at)
+        VALUES (gen_random_uuid(), 'bench', :number, true, now(), now())
+        RETURNING id
+    """), params)
+    params.update(branch_id=branch_id, semester_id=semester_id)
+    section_id = await db.scalar(text("""
+        INSERT INTO sections (id, name, max_students, branch_id, semester_id, is_active, created_at, updated_at)
+        VALUES (gen_random_uuid(), 'A', :students, :branch_id, :semester_id, true, now(), now())
+        RETURNING id
+    """), params)
+    params.update(section_id=section_id)
+    subject_ids = (await db.execute(text("""
+        INSERT INTO subjects (id, code, name, subject_type, branch_id, semester_id, is_active, created_at, updated_at)
+        SELECT gen_random_uuid(), format('S%s-%s', CAST(:token AS text), n), format('Subject %s', n), 'CORE',
+               CAST(:branch_id AS uuid), CAST(:semester_id AS uuid), true, now(), now()
+        FROM generate_series(1, CAST(:subjects AS int)) AS n
+        RETURNING id
+    """), params)).scalars().all()
+    teacher_id = await db.scalar(text("""
+        INSERT INTO users (id, email, password_hash, first_name, last_name, role, designation,
+                           is_active, is_first_login, created_at, updated_at)
+        VALUES (gen_random_uuid(), :teacher_email, 'x', 'Bench', 'Teacher', 'TEACHER',
+                'Lecturer', true, false, now(), now())
+        RETURNING id
+    """), params)
+    student_ids = (await db.execute(text("""
+        INSERT INTO users (id, email, password_hash, first_name, last_name, role, roll_no,
+                           branch_id, section_id, is_active, is_first_login, created_at, updated_at)
+        SELECT gen_random_uuid(), format('%s-%s@bench.invalid', CAST(:token AS text), n), 'x', 'Student', n::text, 'STUDENT',
+               format('%s-%s', CAST(:token AS text), lpad(n::text, 5, '0')),
+               CAST(:branch_id AS uuid), CAST(:section_id AS uuid), true, false, now(), now()
+        FROM generate_series(1, CAST(:students AS int)) AS n
+        ORDER BY n
+        RETURNING id
+    """), params)).scalars().all()
+    return SeededSection(token, branch_id, section_id, list(subject_ids), teacher_id, list(student_ids))
+
+
+async def seed_attendance(db: AsyncSession, section: SeededSection, days: int, first_day: date, present_rate: float = 0.85):
+    """One attendance row per student, subject and day, with both rollups filled to match."""
+    params = {
+        "section_id": section.section_id, "teacher_id": section.teacher_id,
+        "days": days, "first_day": first_day, "rate": present_rate,
+    }
+    await db.execute(text("""
+        INSERT INTO attendance (id, student_id, section_id, subject_id, attendance_date, status, marked_by, created_at)
+        SELECT gen_random_uuid(), u.id, u.section_id, s.id, CAST(:first_day AS date) + d,
+               CASE WHEN random() < CAST(:rate AS float8) THEN 'PRESENT'::attendancestatus ELSE 'ABSENT'::attendancestatus END,
+               CAST(:teacher_id AS uuid), now()
+        FROM users u
+        JOIN sections sec ON sec.id = u.section_id
+        JOIN subjects s ON s.branch_id = sec.branch_id AND s.semester_id = sec.semester_id
+        CROSS JOIN generate_series(0, CAST(:days AS int) - 1) AS d
+        WHERE u.section_id = :section_id AND u.role = 'STUDENT'
+    """), params)
+    await db.execute(text("""
+        INSERT INTO attendance_rollup (student_id, subject_id, section_id, total, present, updated_at)
+        SELECT student_id, subject_id, section_id, COUNT(*), COUNT(*) FILTER (WHERE status = 'PRESENT'), now()
+        FROM attendance WHERE section_id = :section_id
+        GROUP BY student_id, subject_id, section_id
+    """), params)
+    await db.execute(text("""
+        INSERT INTO attendance_daily_rollup (section_id, subject_id, attendance_date, total, present, updated_at)
+        SELECT section_id, subject_id, attendance_date, COUNT(*), COUNT(*) FILTER (WHERE status = 'PRESENT'), now()
+        FROM attendance WHERE section_id = :section_id
+        GROUP BY section_id, subject_id, attendance_date
+    """), params)
+
+
+async def seed_exam(db: AsyncSession, section: SeededSection, subject_id: UUID, exam_date: date) -> UUID:
+    """An exam for the section's subject with an approved mark for every student."""
+    params = {
+        "section_id": section.section_id, "subject_id": subject_id,
+        "teacher_id": section.teacher_id, "exam_date": exam_date,
+    }
+    exam_id = await db.scalar(text("""
+        INSERT INTO exams (id, exam_name, subject_id, section_id, exam_date, total_marks, passing_marks,
+                           is_published, created_at, updated_at)
+        VALUES (gen_random_uuid(), 'Benchmark exam', :subject_id, :section_id, :exam_date, 100, 40, true, now(), now())
+        RETURNING id
+    """), params)
+    params["exam_id"] = exam_id
+    await db.execute(text("""
+        INSERT INTO exam_marks (id, exam_id, student_id, marks_obtained, is_absent, status,
+                                submitted_by, approved_by, created_at, updated_at)
+        SELECT gen_random_uuid(), CAST(:exam_id AS uuid), u.id, (random() * 100)::int, false, 'APPROVED',
+               CAST(:teacher_id AS uuid), CAST(:teacher_id AS uuid), now(), now()
+        FROM users u
+        WHERE u.section_id = :section_id AND u.role = 'STUDENT'
+    """), params)
+    return exam_id
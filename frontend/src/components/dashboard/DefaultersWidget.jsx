@@ -5,13 +5,15 @@ import { Badge } from "@/components/ui/badge";
 
 const DefaultersWidget = () => {
     const [defaulters, setDefaulters] = useState([]);
+    const [total, setTotal] = useState(0);
     const [loading, setLoading] = useState(true);
 
     useEffect(() => {
         const fetchDefaulters = async () => {
             try {
                 const res = await dashboard.getDefaulters(75);
-                setDefaulters(res.data);
+                setDefaulters(res.data.items);
+                setTotal(res.data.total);
             } catch (err) {
                 console.error("Failed to fetch defaulters:", err);
             } finally {
@@ -43,7 +45,7 @@ const DefaultersWidget = () => {
                         </CardDescription>
                     </div>
                     <Badge variant="outline" className="bg-slate-50 text-slate-600 border-slate-200">
-                        {defaulters.length} Found
+                        {total} Found
                     </Badge>
                 </div>
             </CardHeader>